@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+
+from Scripts.Retiming.BatchRetime import initialize_standalone
+
+"""
+Using: mayapy, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Compares creating gears one at a time through the polyPipe and extrude commands, with the batch API building the meshes
+through MFnMesh.create, separately and merged into one mesh. Reports the seconds and the number of nodes each way.
+Run from the Plugins folder:
+    mayapy -m Benchmarks.GearBatch --gears 100 500
+"""
+
+
+def build_specs(gear_count, seed=0):
+    """
+    :return: List of (teeth, length, radius, matrix) specs, with the gears spread out on a grid.
+    """
+    generator = random.Random(seed)
+    columns = int(gear_count ** 0.5) + 1
+    specs = []
+
+    for index in range(gear_count):
+        translate = [(index % columns) * 3.0, 0.0, (index // columns) * 3.0]
+        matrix = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0] + translate + [1.0]
+        specs.append((generator.randint(8, 40), generator.uniform(0.1, 0.5), 1.0, matrix))
+
+    return specs
+
+
+def create_with_commands(specs):
+    from Scripts.Modeling.Gear import Gear
+    import maya.cmds as cmds
+
+    for teeth, length, radius, matrix in specs:
+        gear = Gear(teeth, length)
+        gear.create()
+        cmds.xform(gear.transform, matrix=matrix)
+
+
+def create_batch(specs, merge):
+    from Scripts.Modeling.Gear import Gear
+    Gear.create_batch(specs, merge=merge)
+
+
+def measure(function, *args):
+    """
+    Runs the function in a new scene.
+    :return: Tuple of the seconds it took, and the number of nodes it added.
+    """
+    import maya.cmds as cmds
+
+    cmds.file(new=True, force=True)
+    node_count = len(cmds.ls())
+    start_time = time.time()
+    function(*args)
+    return time.time() - start_time, len(cmds.ls()) - node_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark creating gears with commands and with the batch API.")
+    parser.add_argument("--gears", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args(argv)
+
+    initialize_standalone()
+
+    print("{0:>8} {1:>24} {2:>10} {3:>8}".format("gears", "path", "ms", "nodes"))
+    for gear_count in args.gears:
+        specs = build_specs(gear_count)
+        for path, function, function_args in [("commands", create_with_commands, (specs,)),
+                                              ("batch", create_batch, (specs, False)),
+                                              ("batch merged", create_batch, (specs, True))]:
+            seconds, node_count = measure(function, *function_args)
+            print("{0:>8} {1:>24} {2:>10.1f} {3:>8}".format(gear_count, path, seconds * 1000, node_count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from Scripts.Modeling import GearMeshBuilder, GearMeshWriter
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Measures how many gears per second the headless mesh builder makes, and writes to OBJ and glTF. No Maya required.
+Run from the Plugins folder:
+    python -m Benchmarks.GearMeshBuild
+"""
+
+TEETH_COUNTS = [10, 30, 100, 300]
+
+
+def measure_gears_per_second(function, min_seconds):
+    """
+    Calls the function until at least min_seconds have passed.
+    :return: The number of calls per second.
+    """
+    calls = 0
+    start_time = time.time()
+    while True:
+        function()
+        calls += 1
+        seconds = time.time() - start_time
+        if seconds >= min_seconds:
+            return calls / seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark building and writing gear meshes without Maya.")
+    parser.add_argument("--teeth", type=int, nargs="+", default=TEETH_COUNTS)
+    parser.add_argument("--seconds", type=float, default=0.5, help="How long to measure each case.")
+    args = parser.parse_args(argv)
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        print("{0:>8} {1:>10} {2:>14} {3:>14} {4:>14} {5:>14}".format(
+            "teeth", "vertices", "build/s", "points/s", "obj/s", "gltf/s"))
+
+        for teeth in args.teeth:
+            mesh = GearMeshBuilder.build(teeth, 0.3, 1.0)
+            named_mesh = [("gear",) + mesh]
+            obj_path = os.path.join(output_dir, "gear.obj")
+            gltf_path = os.path.join(output_dir, "gear.gltf")
+
+            build_rate = measure_gears_per_second(lambda: GearMeshBuilder.build(teeth, 0.3, 1.0), args.seconds)
+            # Only the points, like the gear node when only the sizes change.
+            points_rate = measure_gears_per_second(lambda: GearMeshBuilder.get_points(teeth, 0.3, 1.0), args.seconds)
+            obj_rate = measure_gears_per_second(lambda: GearMeshWriter.write_obj(obj_path, named_mesh), args.seconds)
+            gltf_rate = measure_gears_per_second(lambda: GearMeshWriter.write_gltf(gltf_path, named_mesh),
+                                                 args.seconds)
+
+            print("{0:>8} {1:>10} {2:>14.0f} {3:>14.0f} {4:>14.0f} {5:>14.0f}".format(
+                teeth, len(mesh[0]) // 3, build_rate, points_rate, obj_rate, gltf_rate))
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import random
+import time
+
+from Scripts.Retiming import TimingEngine
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Shows how planning and mapping a re-time scales with the number of curves, on synthetic curves. No Maya required.
+Run from the Plugins folder:
+    python -m Benchmarks.MultiCurveRetime
+"""
+
+CURVE_COUNTS = [1, 10, 100, 500, 1000]
+KEYS_PER_CURVE = 200
+
+
+def build_curve_key_times(curve_count, keys_per_curve, seed=0):
+    """
+    Builds curves where every curve has its own sparse set of keys, like a full rig.
+    :return: Dictionary of curve name to the list of its key times.
+    """
+    generator = random.Random(seed)
+    frames = range(keys_per_curve * 4)
+    return dict(("curve{0}".format(index), sorted(generator.sample(frames, keys_per_curve)))
+                for index in range(curve_count))
+
+
+def time_plan(curve_key_times, re_time_value=2, time_range=(100, 400)):
+    """
+    :return: Tuple of the seconds spent planning and mapping, and the number of keys to move.
+    """
+    start_time = time.time()
+
+    key_times = set()
+    for times in curve_key_times.values():
+        key_times.update(times)
+    key_times = sorted(key_times)
+    new_key_times = TimingEngine.compute_new_key_times(key_times, time_range[0], time_range[1], re_time_value, True)
+    plan = RetimePlan(curve_key_times, key_times, new_key_times, time_range)
+    plan_seconds = time.time() - start_time
+
+    start_time = time.time()
+    keys_to_move = plan.get_keys_to_move()
+    map_seconds = time.time() - start_time
+
+    return plan_seconds, map_seconds, keys_to_move
+
+
+def main():
+    print("{0:>8} {1:>10} {2:>12} {3:>12} {4:>12}".format("curves", "keys", "plan ms", "map ms", "keys moved"))
+
+    for curve_count in CURVE_COUNTS:
+        curve_key_times = build_curve_key_times(curve_count, KEYS_PER_CURVE)
+        plan_seconds, map_seconds, keys_to_move = time_plan(curve_key_times)
+        print("{0:>8} {1:>10} {2:>12.2f} {3:>12.2f} {4:>12}".format(
+            curve_count, curve_count * KEYS_PER_CURVE, plan_seconds * 1000, map_seconds * 1000, keys_to_move))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import json
+import random
+import time
+
+from Tests import FakeMaya
+from Tests.FakeMaya import FakeAnimCurve, FakeCmds, MFnAnimCurve
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2.7 doesn't have tracemalloc, peak memory is then left out of the results.
+    tracemalloc = None
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Benchmarks ReTimerHelperMethods.re_time_keys on synthetic animation curves, using the recording stand-in for Maya in
+FakeMaya. For each case it counts the calls made to Maya, and measures the wall time and peak memory of a first click
+(nothing cached) and a second click on the same curves.
+Run from the Plugins folder:
+    python -m Benchmarks.RetimeSuite --output results.json
+    python -m Benchmarks.RetimeSuite --compare results.json
+"""
+
+# (number of curves, keys per curve), run with every layout.
+CASES = [(1, 10), (1, 1000), (1, 100000), (10, 1000), (100, 1000), (300, 1000), (1000, 10), (1000, 100)]
+LAYOUTS = ["dense", "sparse", "mocap", "weighted"]
+# How far the mocap keys are from the whole frames, and the grid they are snapped to when re-timed.
+MOCAP_NOISE = 1e-5
+MOCAP_SNAP_GRID = 1.0
+
+
+def build_curves(curve_count, keys_per_curve, layout, seed=0):
+    """
+    :param curve_count: The number of curves.
+    :param keys_per_curve: The number of keys on each curve.
+    :param layout: dense puts a key on every frame of every curve, sparse gives every curve its own random frames.
+    mocap is dense with float noise on the key times, like recorded or scaled animation. weighted is dense with
+    weighted tangents, every other key fixed and the rest auto.
+    :return: List of FakeAnimCurve.
+    """
+    generator = random.Random(seed)
+    curves = []
+
+    for index in range(curve_count):
+        if layout == "dense":
+            times = list(range(1, keys_per_curve + 1))
+        elif layout == "mocap":
+            times = [frame + generator.uniform(-MOCAP_NOISE, MOCAP_NOISE) for frame in range(1, keys_per_curve + 1)]
+        elif layout == "weighted":
+            times = list(range(1, keys_per_curve + 1))
+        else:
+            times = sorted(generator.sample(range(1, keys_per_curve * 4 + 1), keys_per_curve))
+
+        if layout == "weighted":
+            tangent_types = [[MFnAnimCurve.kTangentFixed if key % 2 else MFnAnimCurve.kTangentAuto] * 2
+                             for key in range(keys_per_curve)]
+            curves.append(FakeAnimCurve("curve{0}".format(index), "node{0}".format(index // 10), "tx", times,
+                                        tangent_types=tangent_types, weighted=True))
+        else:
+            curves.append(FakeAnimCurve("curve{0}".format(index), "node{0}".format(index // 10), "tx", times))
+
+    return curves
+
+
+def measure(function):
+    """
+    :return: Tuple of the seconds the function took and its peak memory in bytes, None when it can't be measured.
+    """
+    if tracemalloc:
+        tracemalloc.start()
+    start_time = time.time()
+    function()
+    seconds = time.time() - start_time
+    peak_memory = None
+    if tracemalloc:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak_memory
+
+
+def run_case(cmds, re_timer, key_time_cache, curve_count, keys_per_curve, layout):
+    """
+    Times two clicks of a +1 incremental re-time over the middle third of the keys. The mocap layout is snapped to
+    whole frames, and the weighted layout has its tangents scaled.
+    :return: Dictionary of the results of the case.
+    """
+    curves = build_curves(curve_count, keys_per_curve, layout)
+    cmds.set_curves(curves)
+    last_frame = max(curve.times[-1] for curve in curves)
+    cmds.selected_range = [last_frame / 3.0, last_frame * 2 / 3.0]
+    key_time_cache.remove_callbacks()
+
+    result = {"curves": curve_count, "keys_per_curve": keys_per_curve, "layout": layout,
+              "keys": curve_count * keys_per_curve}
+
+    re_timer.snap_grid = MOCAP_SNAP_GRID if layout == "mocap" else None
+    try:
+        for click in ["first", "second"]:
+            cmds.reset_calls()
+            seconds, peak_memory = measure(lambda: re_timer.re_time_keys(1, True, False, layout == "weighted"))
+            result[click] = {"seconds": seconds, "peak_memory": peak_memory, "calls": cmds.get_total_calls(),
+                             "command_calls": cmds.get_command_calls(), "call_counts": dict(cmds.call_counts)}
+    finally:
+        re_timer.snap_grid = None
+
+    return result
+
+
+def get_case_key(result):
+    return "{0}x{1} {2}".format(result["curves"], result["keys_per_curve"], result["layout"])
+
+
+def run_suite():
+    """
+    :return: List of the results of every case.
+    """
+    cmds = FakeCmds()
+    FakeMaya.install(cmds)
+
+    # Importing the re-timer after the fake is installed, so it uses it in place of Maya.
+    from Scripts.ReTimerHelperMethods import ReTimerHelperMethods
+    from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+
+    return [run_case(cmds, ReTimerHelperMethods, KeyTimeCache, curve_count, keys_per_curve, layout)
+            for curve_count, keys_per_curve in CASES for layout in LAYOUTS]
+
+
+def print_results(results, previous_results=None):
+    """
+    Prints a table of the results, with the change from the previous results when given.
+    """
+    previous = dict((get_case_key(result), result) for result in previous_results or [])
+
+    print("{0:>18} {1:>9} {2:>9} {3:>9} {4:>9} {5:>9} {6:>12}".format(
+        "case", "commands", "api calls", "2nd cmds", "ms", "2nd ms", "vs previous"))
+
+    for result in results:
+        key = get_case_key(result)
+        change = ""
+        if key in previous:
+            change = "{0:+.0%}".format(result["first"]["seconds"] / max(previous[key]["first"]["seconds"], 1e-9) - 1)
+            if result["first"]["calls"] != previous[key]["first"]["calls"]:
+                change += " calls {0:+d}".format(result["first"]["calls"] - previous[key]["first"]["calls"])
+
+        print("{0:>18} {1:>9} {2:>9} {3:>9} {4:>9.1f} {5:>9.1f} {6:>12}".format(
+            key, result["first"]["command_calls"], result["first"]["calls"] - result["first"]["command_calls"],
+            result["second"]["command_calls"], result["first"]["seconds"] * 1000, result["second"]["seconds"] * 1000,
+            change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the re-timer on synthetic curves without Maya.")
+    parser.add_argument("--output", help="Where to write the json results.")
+    parser.add_argument("--compare", help="Json results of an earlier run to compare with.")
+    args = parser.parse_args(argv)
+
+    results = run_suite()
+
+    previous_results = None
+    if args.compare:
+        with open(args.compare) as results_file:
+            previous_results = json.load(results_file)["results"]
+
+    print_results(results, previous_results)
+
+    if args.output:
+        with open(args.output, "w") as results_file:
+            json.dump({"results": results}, results_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import collections
+import importlib
+import json
+import sys
+import time
+
+import maya.cmds as cmds
+import maya.mel as mel
+
+"""
+Using: Maya Commands, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The entry point of the tools. Registering only builds a menu and a shelf, the tools themselves, and Qt with them, are
+imported the first time they are used, so Maya starts as fast as without the tools. Every first import is timed, so a
+slow startup can be measured on every machine.
+
+Registering from userSetup.py, when the Plugins folder is on the Python path:
+    import maya.utils
+    maya.utils.executeDeferred("from Main import ToolLoader; ToolLoader.register()")
+
+Measuring the imports of every tool with mayapy, from the Plugins folder:
+    mayapy -m Main --report import_report.json
+"""
+
+
+class ToolLoader(object):
+
+    MENU_NAME = "pluginToolsMenu"
+    MENU_LABEL = "Plugin Tools"
+    SHELF_NAME = "PluginTools"
+
+    # Dictionary of tool id to its label, the module it is in, the function to call in the module and the tooltip.
+    TOOLS = collections.OrderedDict([
+        ("retimer", ("Retiming Tool", "Scripts.RetimingUi", "RetimingUi.display",
+                     "Re-time the keys of the selection.")),
+        ("gear", ("Create Gear", "Scripts.Modeling.Gear", "Gear.create_node",
+                  "Create a procedural gear.")),
+    ])
+
+    # Dictionary of module name to the seconds its first import took, including the modules it imported, and how many
+    # modules were imported with it.
+    import_times = collections.OrderedDict()
+    # The seconds the menu and shelf took to register.
+    register_seconds = None
+
+    @classmethod
+    def register(cls, shelf=True):
+        """
+        Adds the menu, and the shelf if asked to. Nothing is done in batch mode, where there is no UI.
+        :param shelf: Whether the shelf should be created too.
+        """
+        if cmds.about(batch=True):
+            return
+
+        start_time = time.time()
+        cls.create_menu()
+        if shelf:
+            cls.create_shelf()
+        cls.register_seconds = time.time() - start_time
+
+    @classmethod
+    def unregister(cls):
+        """
+        Removes the menu and the shelf.
+        """
+        if cmds.menu(cls.MENU_NAME, exists=True):
+            cmds.deleteUI(cls.MENU_NAME)
+        if cmds.shelfLayout(cls.SHELF_NAME, exists=True):
+            cmds.deleteUI(cls.SHELF_NAME)
+
+    @classmethod
+    def get_command(cls, tool_id):
+        """
+        The commands are strings instead of functions, so Maya can save the shelf buttons with them.
+        :return: The Python command running the tool.
+        """
+        return 'from Main import ToolLoader; ToolLoader.run_tool("{0}")'.format(tool_id)
+
+    @classmethod
+    def create_menu(cls):
+        # Building the menu again, if the tools are registered more than once.
+        if cmds.menu(cls.MENU_NAME, exists=True):
+            cmds.deleteUI(cls.MENU_NAME)
+
+        cmds.menu(cls.MENU_NAME, label=cls.MENU_LABEL, parent="MayaWindow", tearOff=True)
+        for tool_id, (label, _, _, annotation) in cls.TOOLS.items():
+            cmds.menuItem(label=label, annotation=annotation, command=cls.get_command(tool_id),
+                          sourceType="python")
+
+        cmds.menuItem(divider=True)
+        cmds.menuItem(label="Import Time Report", annotation="Print how long the tools took to import.",
+                      command="from Main import ToolLoader; print(ToolLoader.get_report_text())", sourceType="python")
+
+    @classmethod
+    def create_shelf(cls):
+        # The shelf is made again on every start, so it follows the tools of this version.
+        if cmds.shelfLayout(cls.SHELF_NAME, exists=True):
+            cmds.deleteUI(cls.SHELF_NAME)
+
+        shelf_parent = mel.eval("$tmp = $gShelfTopLevel")
+        cmds.shelfLayout(cls.SHELF_NAME, parent=shelf_parent)
+        for tool_id, (label, _, _, annotation) in cls.TOOLS.items():
+            cmds.shelfButton(parent=cls.SHELF_NAME, label=label, annotation=annotation, image="pythonFamily.png",
+                             imageOverlayLabel=label.split()[-1][:4], command=cls.get_command(tool_id),
+                             sourceType="python")
+
+    @classmethod
+    def import_module(cls, module_name):
+        """
+        Imports a module, timing it if it has not been imported before.
+        :return: The module.
+        """
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        module_count = len(sys.modules)
+        start_time = time.time()
+        module = importlib.import_module(module_name)
+        cls.import_times[module_name] = (time.time() - start_time, len(sys.modules) - module_count)
+        return module
+
+    @classmethod
+    def run_tool(cls, tool_id):
+        """
+        Imports the module of the tool on first use, and calls the function of the tool.
+        :param tool_id: A key of TOOLS.
+        :return: What the function of the tool returns.
+        """
+        _, module_name, function_path, _ = cls.TOOLS[tool_id]
+        function = cls.import_module(module_name)
+        # The function can be inside a class of the module, like RetimingUi.display.
+        for name in function_path.split("."):
+            function = getattr(function, name)
+        return function()
+
+    @classmethod
+    def import_all(cls):
+        """
+        Imports the modules of every tool, timing the ones that have not been imported yet.
+        """
+        for _, module_name, _, _ in cls.TOOLS.values():
+            cls.import_module(module_name)
+
+    @classmethod
+    def get_report(cls):
+        """
+        :return: Dictionary with the seconds registering took, and the seconds and module count of every first import.
+        """
+        return {
+            "register_seconds": cls.register_seconds,
+            "imports": [{"module": module_name, "seconds": seconds, "modules_imported": module_count}
+                        for module_name, (seconds, module_count) in cls.import_times.items()],
+            "total_import_seconds": sum(seconds for seconds, _ in cls.import_times.values()),
+        }
+
+    @classmethod
+    def get_report_text(cls):
+        """
+        :return: The report as readable text, with the slowest import first.
+        """
+        report = cls.get_report()
+        lines = []
+        if report["register_seconds"] is not None:
+            lines.append("Registering took {0:.1f} ms.".format(report["register_seconds"] * 1000))
+
+        if not report["imports"]:
+            lines.append("No tools have been imported yet.")
+            return "\n".join(lines)
+
+        lines.append("{0:<32} {1:>10} {2:>8}".format("module", "ms", "modules"))
+        for entry in sorted(report["imports"], key=lambda entry: entry["seconds"], reverse=True):
+            lines.append("{0:<32} {1:>10.1f} {2:>8}".format(entry["module"], entry["seconds"] * 1000,
+                                                           entry["modules_imported"]))
+        lines.append("Imports took {0:.1f} ms in total.".format(report["total_import_seconds"] * 1000))
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how long the tools take to import, with mayapy.")
+    parser.add_argument("--report", help="A JSON file to write the import times to.")
+    args = parser.parse_args(argv)
+
+    # Starting Maya is not counted, only the imports of the tools after it.
+    from Scripts.Retiming.BatchRetime import initialize_standalone
+    initialize_standalone()
+
+    ToolLoader.import_all()
+    print(ToolLoader.get_report_text())
+
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(ToolLoader.get_report(), report_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
+from Scripts.Modeling import GearMeshBuilder
+from Scripts.Modeling.GearTopologyCache import GearTopologyCache
+
 """
 # Using: Maya API 1.0, Python 2.7.11 
 # Author: Timothy Stoltzner Rasmussen
@@ -11,6 +15,10 @@ class Gear(object):
     standard_length = None
     standard_teeth = None
 
+    SHADING_GROUP = "initialShadingGroup"
+    # The plugin holding the gearNode.
+    PLUGIN_NAME = "gear_plugin.py"
+
     def __init__(self, standard_teeth=10, standard_length=0.3):
         """
         To use the gear class you need to assign the teeth amount and the length.
@@ -44,23 +52,15 @@ class Gear(object):
                 break
 
     def make_teeth(self):
-        # Clearing the selection to ensure, selection is clean.
-        cmds.select(clear=True)
-
-        # Creating a list to select all the faces that will become the teeth.
-        # This will return a list of numbers in the range spans * 2 to spans * 3, with steps of 2.
+        # The faces that will become the teeth, the range spans * 2 to spans * 3, with steps of 2.
         side_faces = self.get_teeth_faces(self.standard_teeth)
 
-        # Looping through the faces in the list of side_faces
-        for face in side_faces:
-            # The '%s.f[%s]' expands to something like pPipe1.f[20]
-            # ADD selecting the wanted faces on the created polygonPipe.
-            cmds.select("{0}.{1}".format(self.transform, face), add=True)
-
+        # Passing every face to the extrude in one call, instead of selecting them one at a time. Each select goes
+        # through the undo queue and the selection changed callbacks, so the cost would grow with the teeth.
         # Instead of returning a value, the extrude note will be stored onto the class
         # as a class variable
-        self.extrude = cmds.polyExtrudeFacet(localTranslateZ=self.standard_length)[0]
-        cmds.select(clear=True)
+        self.extrude = cmds.polyExtrudeFacet(side_faces.get_components(self.transform),
+                                             localTranslateZ=self.standard_length)[0]
 
     def change_length(self, length=standard_length):
         # Because the extrude node is on the class, I can get it directly
@@ -74,22 +74,15 @@ class Gear(object):
         self.modify_extrude(teeth, length)
 
     def get_teeth_faces(self, teeth=standard_teeth):
-
-        spans = teeth * 2
-        # Creating a list to select all the faces that will become the teeth.
-        # This will return a list of numbers in the range spans * 2 to spans * 3, with steps of 2.
-        side_faces = range(spans * 2, spans * 3, 2)
-
-        # The list for collecting the faces
-        faces = []
-
-        for face in side_faces:
-            faces.append("f[{0}]".format(face))
-
-        return faces
+        """
+        :param teeth: Amount of gear teeth.
+        :return: FaceRange of the faces that will become the teeth, the range spans * 2 to spans * 3, with steps of 2.
+        """
+        return GearTopologyCache.get_faces(teeth)
 
     def modify_extrude(self, teeth=standard_teeth, length=standard_length):
-        faces = self.get_teeth_faces(teeth)
+        # The face names are only formatted the first time a tooth count is used.
+        faces = GearTopologyCache.get_face_names(teeth)
 
         # The extrude node has an attribute called inputComponents
         # To change it I use a simple SetAttr call instead of recreating the extrude which can be expensive
@@ -102,9 +95,100 @@ class Gear(object):
         self.change_length(length)
 
 
-my_gear1 = Gear()
-my_gear1.create()
-my_gear1.change_teeth(30, 1)
-my_gear1.change_length(2)
+    @classmethod
+    def create_node(cls, teeth=10, length=0.3, name="gear"):
+        """
+        Creates a gear computed by the gearNode of the gear plugin. Its teeth, length, radii and height can be
+        changed on the node at any time, without any construction history to re-run.
+        :param teeth: Amount of gear teeth.
+        :param length: The length of the teeth.
+        :param name: The name of the gear transform.
+        :return: Tuple of the transform and the gearNode.
+        """
+        # The node lives in the gear plugin, so I make sure it is loaded.
+        if not cmds.pluginInfo(cls.PLUGIN_NAME, query=True, loaded=True):
+            cmds.loadPlugin(cls.PLUGIN_NAME, quiet=True)
+
+        transform = cmds.createNode("transform", name=name)
+        mesh = cmds.createNode("mesh", name="{0}Shape".format(transform), parent=transform)
+        gear_node = cmds.createNode("gearNode")
+        cmds.setAttr("{0}.teeth".format(gear_node), teeth)
+        cmds.setAttr("{0}.length".format(gear_node), length)
+
+        cmds.connectAttr("{0}.outMesh".format(gear_node), "{0}.inMesh".format(mesh))
+        cmds.sets(mesh, edit=True, forceElement=cls.SHADING_GROUP)
+
+        return transform, gear_node
+
+    @classmethod
+    def create_batch(cls, specs, merge=False, name="gear"):
+        """
+        Creates many gears at once. Instead of a polyPipe and an extrude for each gear, the vertices and faces of the
+        gears are computed in Python, and every mesh is created with a single MFnMesh.create call. There is no
+        selection, and no construction history, so the gears can't be changed afterwards with change_teeth.
+        Creating the meshes through the API is not undoable.
+
+        :param specs: List of (teeth, length, radius, matrix) tuples. The matrix is a list of 16 values like the one
+        of cmds.xform(matrix=True), or None to leave the gear at the origin.
+        :param merge: When True all the gears are merged into one mesh, which is a lot less nodes for set dressing.
+        :param name: The name of the gear transforms.
+        :return: List of the created transforms, only one when merged.
+        """
+        meshes = []
+        if merge:
+            # Every gear's vertices are moved by its matrix, as the merged mesh only has the one transform.
+            gear_meshes = []
+            for teeth, length, radius, matrix in specs:
+                points, polygon_counts, polygon_connects = GearMeshBuilder.build(teeth, length, radius)
+                if matrix:
+                    points = GearMeshBuilder.transform_points(points, matrix)
+                gear_meshes.append((points, polygon_counts, polygon_connects))
+            meshes.append(GearMeshBuilder.merge(gear_meshes) + (None,))
+        else:
+            for teeth, length, radius, matrix in specs:
+                meshes.append(GearMeshBuilder.build(teeth, length, radius) + (matrix,))
+
+        transforms = []
+        shapes = []
+        for points, polygon_counts, polygon_connects, matrix in meshes:
+            transform, shape = cls.create_mesh(points, polygon_counts, polygon_connects, name, matrix)
+            transforms.append(transform)
+            shapes.append(shape)
+
+        # Assigning the default shader to every mesh in one call, a mesh without one doesn't render.
+        if shapes:
+            cmds.sets(shapes, edit=True, forceElement=cls.SHADING_GROUP)
+
+        return transforms
+
+    @staticmethod
+    def create_mesh(points, polygon_counts, polygon_connects, name, matrix=None):
+        """
+        Creates a mesh through MFnMesh.create, without a shader assigned.
+        :param points: The points array of the mesh, like GearMeshBuilder.build returns it.
+        :param polygon_counts: The polygon_counts array of the mesh.
+        :param polygon_connects: The polygon_connects array of the mesh.
+        :param name: The name of the transform.
+        :param matrix: Optional list of 16 values for the transform, like the one of cmds.xform(matrix=True).
+        :return: Tuple of the full path of the transform and of the mesh shape.
+        """
+        mesh_fn = om2.MFnMesh()
+        # Without a parent, create makes the transform as well, and returns it.
+        transform = mesh_fn.create(om2.MPointArray(GearMeshBuilder.get_point_tuples(points)),
+                                   om2.MIntArray(polygon_counts), om2.MIntArray(polygon_connects))
+
+        transform_fn = om2.MFnTransform(transform)
+        transform_fn.setName(name)
+        if matrix:
+            transform_fn.setTransformation(om2.MTransformationMatrix(om2.MMatrix(matrix)))
+
+        return transform_fn.fullPathName(), mesh_fn.fullPathName()
+
+
+if __name__ == "__main__":
+    my_gear1 = Gear()
+    my_gear1.create()
+    my_gear1.change_teeth(30, 1)
+    my_gear1.change_length(2)
 
 
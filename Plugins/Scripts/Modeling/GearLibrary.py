@@ -0,0 +1,268 @@
+import collections
+
+import maya.api.OpenMaya as om2
+import maya.cmds as cmds
+
+from Scripts.Modeling import GearMeshBuilder
+from Scripts.Modeling.Gear import Gear
+
+"""
+Using: Maya API 2.0, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Builds large mechanical assemblies out of few meshes. Gears with the same teeth, length and radius share one prototype
+mesh, and every other gear of that spec is an instance of it. Each prototype also gets LOD meshes with fewer teeth,
+named _LOD0, _LOD1 and so on, like game engines expects them on export.
+
+Example:
+    library = GearLibrary()
+    library.add([(12, 0.3, 1.0, matrix1), (12, 0.3, 1.0, matrix2), (30, 0.2, 2.0, None)])
+    library.build()
+    print(library.get_report_text())
+"""
+
+# GearLibrary objects waiting for the gearLibraryBuild command of the gear plugin to build them.
+pending_libraries = []
+
+
+class GearLibrary(object):
+
+    # The teeth of every LOD, relative to the full resolution gear.
+    LOD_TEETH_RATIOS = [1.0, 0.5, 0.25]
+    MIN_LOD_TEETH = 3
+
+    # To estimate the memory of a mesh, a vertex is three floats, and each face vertex and face count is an int.
+    BYTES_PER_VERTEX = 12
+    BYTES_PER_INDEX = 4
+
+    def __init__(self, lod_ratios=None, name="gearLibrary"):
+        """
+        :param lod_ratios: The teeth of every LOD relative to the full gear, defaults to LOD_TEETH_RATIOS. [1.0] for
+        no LODs.
+        :param name: The name of the group holding the prototypes and the instances.
+        """
+        self.lod_ratios = lod_ratios or self.LOD_TEETH_RATIOS
+        self.name = name
+
+        # Dictionary of spec key to the list of matrices of the gears with the spec, in the order they were added.
+        self.placements = collections.OrderedDict()
+        # Dictionary of spec key to the prototype transform, after the library is built.
+        self.prototypes = {}
+        self.group = None
+        self.group_object = None
+
+    @staticmethod
+    def get_key(teeth, length, radius):
+        """
+        :return: The key of a gear spec. The sizes are rounded, so specs that only differ by float noise are shared.
+        """
+        return int(teeth), round(length, 6), round(radius, 6)
+
+    def add(self, specs):
+        """
+        :param specs: List of (teeth, length, radius, matrix) tuples, like for Gear.create_batch.
+        """
+        for teeth, length, radius, matrix in specs:
+            self.placements.setdefault(self.get_key(teeth, length, radius), []).append(matrix)
+
+    def get_lod_teeth(self, teeth):
+        """
+        :return: The teeth of every LOD of a gear. LOD0 is always the gear as asked for, the reduced LODs are kept to
+        MIN_LOD_TEETH, and LODs that would not have fewer teeth than the one before are left out.
+        """
+        lod_teeth = [int(teeth)]
+        for ratio in self.lod_ratios[1:]:
+            level_teeth = max(self.MIN_LOD_TEETH, int(round(teeth * ratio)))
+            if level_teeth < lod_teeth[-1]:
+                lod_teeth.append(level_teeth)
+        return lod_teeth
+
+    @staticmethod
+    def get_prototype_name(key):
+        teeth, length, radius = key
+        # The sizes are in the name, without the dots Maya doesn't allow.
+        return "gear_{0}_{1}_{2}".format(teeth, length, radius).replace(".", "p")
+
+    def build(self):
+        """
+        Creates the prototypes with their LODs, and an instance of the prototype for every other gear of its spec.
+        Everything is created by the gearLibraryBuild command of the gear plugin, so a single undo removes all of it.
+        :return: The group holding everything.
+        """
+        # The command lives in the gear plugin, so I make sure it is loaded.
+        if not cmds.pluginInfo(Gear.PLUGIN_NAME, query=True, loaded=True):
+            cmds.loadPlugin(Gear.PLUGIN_NAME, quiet=True)
+
+        pending_libraries.append(self)
+        cmds.gearLibraryBuild()
+        return self.group
+
+    def create_nodes(self):
+        """
+        Creates every node of the library through the API. The transforms, names, visibility and shader connections
+        all go through one MDagModifier, the meshes and the instances are made under the transforms it created.
+        Called by the gearLibraryBuild command, which undoes it with delete_nodes.
+        :return: The group holding everything.
+        """
+        modifier = om2.MDagModifier()
+        self.group_object = modifier.createNode("transform")
+        modifier.renameNode(self.group_object, self.name)
+
+        # The prototype of every spec, with its LOD transforms and the placements of its instances.
+        prototypes = []
+        for key, matrices in self.placements.items():
+            teeth, length, radius = key
+            prototype_name = self.get_prototype_name(key)
+
+            # The first gear of the spec is the prototype itself.
+            prototype = modifier.createNode("transform", self.group_object)
+            modifier.renameNode(prototype, prototype_name)
+
+            lods = []
+            for level, lod_teeth in enumerate(self.get_lod_teeth(teeth)):
+                lod = modifier.createNode("transform", prototype)
+                modifier.renameNode(lod, "{0}_LOD{1}".format(prototype_name, level))
+                lods.append((lod, lod_teeth))
+
+            placements = []
+            for index in range(1, len(matrices)):
+                placement = modifier.createNode("transform", self.group_object)
+                modifier.renameNode(placement, "{0}_instance{1}".format(prototype_name, index))
+                placements.append(placement)
+
+            prototypes.append((key, prototype, lods, placements, matrices))
+        modifier.doIt()
+
+        shapes = []
+        for key, prototype, lods, placements, matrices in prototypes:
+            teeth, length, radius = key
+            for level, (lod, lod_teeth) in enumerate(lods):
+                shapes.append(self.create_mesh(lod, lod_teeth, length, radius))
+                # Only the full resolution gear is visible in the viewport, the LODs are there to be exported.
+                if level:
+                    modifier.newPlugValueBool(om2.MFnDependencyNode(lod).findPlug("visibility", False), False)
+
+            self.set_matrix(prototype, matrices[0])
+            self.prototypes[key] = om2.MFnDagNode(prototype).fullPathName()
+
+            for placement, matrix in zip(placements, matrices[1:]):
+                self.set_matrix(placement, matrix)
+                placement_fn = om2.MFnDagNode(placement)
+                for lod, lod_teeth in lods:
+                    # Keeping the existing parents makes the LOD an instance, instead of moving it.
+                    placement_fn.addChild(lod, om2.MFnDagNode.kNextPos, True)
+
+        # Assigning the default shader after the placements are instanced, so every instance of the meshes is in it.
+        self.connect_shading_group(modifier, shapes)
+        modifier.doIt()
+
+        self.group = om2.MFnDagNode(self.group_object).fullPathName()
+        return self.group
+
+    @staticmethod
+    def create_mesh(transform, teeth, length, radius):
+        """
+        Creates the mesh of a gear under a transform, through MFnMesh.create.
+        :return: The mesh shape MObject.
+        """
+        points, polygon_counts, polygon_connects = GearMeshBuilder.build(teeth, length, radius)
+        mesh_fn = om2.MFnMesh()
+        # With a transform as the parent, create makes only the shape, and returns it.
+        shape = mesh_fn.create(om2.MPointArray(GearMeshBuilder.get_point_tuples(points)),
+                               om2.MIntArray(polygon_counts), om2.MIntArray(polygon_connects), parent=transform)
+        mesh_fn.setName("{0}Shape".format(om2.MFnDependencyNode(transform).name()))
+        return shape
+
+    @staticmethod
+    def set_matrix(transform, matrix):
+        """
+        :param transform: A transform MObject.
+        :param matrix: List of 16 values, like the one of cmds.xform(matrix=True), or None to leave it at the origin.
+        """
+        if matrix:
+            om2.MFnTransform(transform).setTransformation(om2.MTransformationMatrix(om2.MMatrix(matrix)))
+
+    @staticmethod
+    def connect_shading_group(modifier, shapes):
+        """
+        Adds the shapes to the default shading group with the modifier, the way cmds.sets(forceElement) connects them.
+        Each instance of a shape is a member of its own, through the instObjGroups element of its instance number.
+        :param modifier: The MDagModifier to add the connections to.
+        :param shapes: List of mesh shape MObjects, already instanced.
+        """
+        selection_list = om2.MSelectionList()
+        selection_list.add(Gear.SHADING_GROUP)
+        members_plug = om2.MFnDependencyNode(selection_list.getDependNode(0)).findPlug("dagSetMembers", False)
+
+        indices = members_plug.getExistingArrayAttributeIndices()
+        next_index = max(indices) + 1 if indices else 0
+        for shape in shapes:
+            groups_plug = om2.MFnDependencyNode(shape).findPlug("instObjGroups", False)
+            for path in om2.MDagPath.getAllPathsTo(shape):
+                instance_plug = groups_plug.elementByLogicalIndex(path.instanceNumber())
+                modifier.connect(instance_plug, members_plug.elementByLogicalIndex(next_index))
+                next_index += 1
+
+    def delete_nodes(self):
+        """
+        Deletes the group with everything created by create_nodes, the meshes and instances with it.
+        """
+        if self.group_object is None or not om2.MObjectHandle(self.group_object).isValid():
+            return
+
+        modifier = om2.MDagModifier()
+        modifier.deleteNode(self.group_object)
+        modifier.doIt()
+
+        self.group_object = None
+        self.group = None
+        self.prototypes = {}
+
+    def get_mesh_bytes(self, teeth):
+        """
+        :return: An estimate of the memory of the mesh of a gear with the teeth.
+        """
+        # Every tooth has two spans of four vertices, and four tip vertices. The two spans has three faces each around
+        # the pipe, and the tooth adds an outer face, a tip and four sides. Every face is a quad.
+        vertex_count = teeth * 12
+        face_count = teeth * 12
+        return vertex_count * self.BYTES_PER_VERTEX + face_count * 5 * self.BYTES_PER_INDEX
+
+    def get_report(self):
+        """
+        Compares the library with creating every gear as its own full resolution mesh.
+        :return: Dictionary with the number of gears, unique specs, meshes and instances, and the estimated bytes with
+        and without the library.
+        """
+        gears = 0
+        meshes = 0
+        library_bytes = 0
+        unique_bytes = 0
+
+        for key, matrices in self.placements.items():
+            teeth = key[0]
+            lod_teeth = self.get_lod_teeth(teeth)
+
+            gears += len(matrices)
+            meshes += len(lod_teeth)
+            library_bytes += sum(self.get_mesh_bytes(level_teeth) for level_teeth in lod_teeth)
+            unique_bytes += self.get_mesh_bytes(teeth) * len(matrices)
+
+        return {
+            "gears": gears,
+            "unique_specs": len(self.placements),
+            "meshes": meshes,
+            "instances": gears - len(self.placements),
+            "bytes": library_bytes,
+            "bytes_without_library": unique_bytes,
+            "bytes_saved": unique_bytes - library_bytes,
+        }
+
+    def get_report_text(self):
+        """
+        :return: The report as readable text.
+        """
+        report = self.get_report()
+        return ("{gears} gears from {unique_specs} unique specs: {meshes} meshes including LODs, "
+                "{instances} instances.\n"
+                "Mesh memory {bytes} bytes instead of {bytes_without_library}, {bytes_saved} bytes saved."
+                ).format(**report)
@@ -0,0 +1,149 @@
+import math
+from array import array
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Builds the mesh of a gear as flat arrays, without Maya. The gear is a pipe where every second face around the outside
+is extruded into a tooth, the same shape as the polyPipe and extrude of the Gear class. The arrays can be handed to
+MFnMesh.create in Maya, or written to a file by GearMeshWriter.
+
+The mesh is three arrays:
+    points: array of doubles, x, y, z of every vertex after each other.
+    polygon_counts: array of ints, the number of vertices of every face.
+    polygon_connects: array of ints, the vertex indices of every face after each other.
+"""
+
+# The default sizes of the polyPipe the gears are made from. The height of the pipe, and its inner radius relative to
+# the outer radius.
+PIPE_HEIGHT = 2.0
+PIPE_INNER_RADIUS = 0.5
+
+
+def get_topology(teeth):
+    """
+    Computes the faces of a gear, they only depend on the tooth count, so they can be reused while the sizes change.
+    :param teeth: Amount of gear teeth.
+    :return: Tuple of the polygon_counts and polygon_connects arrays, indexing the vertices of get_points.
+    """
+    spans = teeth * 2
+    polygon_connects = array("i")
+
+    for span in range(spans):
+        next_span = (span + 1) % spans
+        outer_bottom, outer_top, inner_bottom, inner_top = range(span * 4, span * 4 + 4)
+        next_outer_bottom, next_outer_top, next_inner_bottom, next_inner_top = range(next_span * 4, next_span * 4 + 4)
+
+        polygon_connects.extend([inner_bottom, inner_top, next_inner_top, next_inner_bottom])
+        polygon_connects.extend([outer_top, next_outer_top, next_inner_top, inner_top])
+        polygon_connects.extend([outer_bottom, inner_bottom, next_inner_bottom, next_outer_bottom])
+
+        outer_face = [outer_bottom, next_outer_bottom, next_outer_top, outer_top]
+        # Like the teeth faces of Gear.make_teeth, every second face, starting with the first.
+        if span % 2 == 1:
+            polygon_connects.extend(outer_face)
+            continue
+
+        # The tip vertices of the tooth comes after the vertices of all the spans.
+        first_tip_vertex = spans * 4 + span * 2
+        tip_face = [first_tip_vertex, first_tip_vertex + 1, first_tip_vertex + 2, first_tip_vertex + 3]
+
+        polygon_connects.extend(tip_face)
+        # A side face between every edge of the outer face and the same edge of the tip.
+        for corner in range(4):
+            next_corner = (corner + 1) % 4
+            polygon_connects.extend([outer_face[corner], outer_face[next_corner], tip_face[next_corner],
+                                     tip_face[corner]])
+
+    # Every face of the gear is a quad.
+    polygon_counts = array("i", [4]) * (len(polygon_connects) // 4)
+    return polygon_counts, polygon_connects
+
+
+def get_points(teeth, length, radius, inner_radius=None, height=None):
+    """
+    Computes the vertices of a gear.
+    :param teeth: Amount of gear teeth.
+    :param length: The length of the teeth.
+    :param radius: The outer radius of the pipe.
+    :param inner_radius: The inner radius of the pipe, defaults to the one of the default polyPipe.
+    :param height: The height of the pipe, defaults to the one of the default polyPipe.
+    :return: The points array. The four vertices of every span first, the four tip vertices of every tooth after.
+    """
+    spans = teeth * 2
+    if inner_radius is None:
+        inner_radius = radius * PIPE_INNER_RADIUS
+    if height is None:
+        height = PIPE_HEIGHT
+    bottom = -height / 2.0
+    top = height / 2.0
+
+    # Four vertices on every span, the outer bottom, outer top, inner bottom and inner top.
+    points = array("d")
+    for span in range(spans):
+        angle = 2 * math.pi * span / spans
+        cos, sin = math.cos(angle), -math.sin(angle)
+        points.extend([radius * cos, bottom, radius * sin, radius * cos, top, radius * sin,
+                       inner_radius * cos, bottom, inner_radius * sin, inner_radius * cos, top, inner_radius * sin])
+
+    # The teeth are the outer face of every second span moved out along its normal, which points out at the middle of
+    # the span, like polyExtrudeFacet does with localTranslateZ.
+    for span in range(0, spans, 2):
+        next_span = (span + 1) % spans
+        middle_angle = 2 * math.pi * (span + 0.5) / spans
+        offset_x, offset_z = math.cos(middle_angle) * length, -math.sin(middle_angle) * length
+        for vertex in [span * 4, next_span * 4, next_span * 4 + 1, span * 4 + 1]:
+            points.extend([points[vertex * 3] + offset_x, points[vertex * 3 + 1], points[vertex * 3 + 2] + offset_z])
+
+    return points
+
+
+def build(teeth, length, radius, inner_radius=None, height=None):
+    """
+    Computes the mesh of a gear. The parameters are the same as for get_points.
+    :return: Tuple of the points, polygon_counts and polygon_connects arrays.
+    """
+    polygon_counts, polygon_connects = get_topology(teeth)
+    return get_points(teeth, length, radius, inner_radius, height), polygon_counts, polygon_connects
+
+
+def transform_points(points, matrix):
+    """
+    :param points: The points array.
+    :param matrix: List of 16 values, row by row, with the translation in the last row like Maya.
+    :return: A new points array, with the points multiplied by the matrix.
+    """
+    m = matrix
+    transformed = array("d")
+    for index in range(0, len(points), 3):
+        x, y, z = points[index], points[index + 1], points[index + 2]
+        transformed.extend([x * m[0] + y * m[4] + z * m[8] + m[12],
+                            x * m[1] + y * m[5] + z * m[9] + m[13],
+                            x * m[2] + y * m[6] + z * m[10] + m[14]])
+    return transformed
+
+
+def merge(meshes):
+    """
+    Merges meshes into one.
+    :param meshes: List of (points, polygon_counts, polygon_connects) tuples.
+    :return: Tuple of the points, polygon_counts and polygon_connects arrays of the merged mesh.
+    """
+    points, polygon_counts, polygon_connects = array("d"), array("i"), array("i")
+
+    for mesh_points, mesh_counts, mesh_connects in meshes:
+        # Offsetting the vertex indices of the mesh, by the vertices of the meshes before it.
+        vertex_offset = len(points) // 3
+        points.extend(mesh_points)
+        polygon_counts.extend(mesh_counts)
+        polygon_connects.extend([index + vertex_offset for index in mesh_connects])
+
+    return points, polygon_counts, polygon_connects
+
+
+def get_point_tuples(points):
+    """
+    :param points: The points array.
+    :return: List of (x, y, z) tuples, like MPointArray takes them.
+    """
+    return list(zip(points[0::3], points[1::3], points[2::3]))
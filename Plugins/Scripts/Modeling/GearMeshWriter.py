@@ -0,0 +1,142 @@
+import argparse
+import base64
+import json
+import struct
+from array import array
+
+from Scripts.Modeling import GearMeshBuilder
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Writes gear meshes from GearMeshBuilder to OBJ or glTF files, so gears can be generated offline without Maya.
+Run from the Plugins folder:
+    python -m Scripts.Modeling.GearMeshWriter gears.obj --gear 12 0.3 1.0 --gear 30 0.2 2.0
+    python -m Scripts.Modeling.GearMeshWriter gears.gltf --gear 12 0.3 1.0
+"""
+
+# The glTF component types and buffer targets used.
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def write_obj(path, meshes):
+    """
+    :param path: The OBJ file to write.
+    :param meshes: List of (name, points, polygon_counts, polygon_connects), with the arrays of GearMeshBuilder.
+    """
+    lines = []
+    # OBJ vertex indices start at 1, and counts on through all the objects of the file.
+    vertex_offset = 1
+
+    for name, points, polygon_counts, polygon_connects in meshes:
+        lines.append("o {0}".format(name))
+        for index in range(0, len(points), 3):
+            lines.append("v {0:.6f} {1:.6f} {2:.6f}".format(points[index], points[index + 1], points[index + 2]))
+
+        connect_index = 0
+        for count in polygon_counts:
+            face = polygon_connects[connect_index:connect_index + count]
+            lines.append("f " + " ".join(str(vertex + vertex_offset) for vertex in face))
+            connect_index += count
+
+        vertex_offset += len(points) // 3
+
+    with open(path, "w") as obj_file:
+        obj_file.write("\n".join(lines) + "\n")
+
+
+def triangulate(polygon_counts, polygon_connects):
+    """
+    glTF only has triangles, so every face is split into a fan of triangles.
+    :return: array of the vertex indices of the triangles.
+    """
+    triangles = array("I")
+    connect_index = 0
+
+    for count in polygon_counts:
+        first = polygon_connects[connect_index]
+        for corner in range(1, count - 1):
+            triangles.extend([first, polygon_connects[connect_index + corner],
+                              polygon_connects[connect_index + corner + 1]])
+        connect_index += count
+
+    return triangles
+
+
+def write_gltf(path, meshes):
+    """
+    Writes a glTF 2.0 file, with the binary data embedded in it, so it is a single file.
+    :param path: The glTF file to write.
+    :param meshes: List of (name, points, polygon_counts, polygon_connects), with the arrays of GearMeshBuilder.
+    """
+    data = bytearray()
+    gltf = {"asset": {"version": "2.0", "generator": "GearMeshWriter"}, "scene": 0, "scenes": [{"nodes": []}],
+            "nodes": [], "meshes": [], "accessors": [], "bufferViews": []}
+
+    def add_buffer_view(values, target):
+        # glTF is little endian, and every view starts on a multiple of 4 bytes.
+        if struct.pack("=I", 1) != struct.pack("<I", 1):
+            values.byteswap()
+        gltf["bufferViews"].append({"buffer": 0, "byteOffset": len(data), "byteLength": len(values) * values.itemsize,
+                                    "target": target})
+        data.extend(values.tostring() if hasattr(values, "tostring") else values.tobytes())
+        data.extend(b"\0" * (-len(data) % 4))
+        return len(gltf["bufferViews"]) - 1
+
+    for name, points, polygon_counts, polygon_connects in meshes:
+        vertex_count = len(points) // 3
+        positions = array("f", points)
+        indices = triangulate(polygon_counts, polygon_connects)
+
+        # The position accessor must have the bounds of the points.
+        position_accessor = {"bufferView": add_buffer_view(positions, GLTF_ARRAY_BUFFER), "componentType": GLTF_FLOAT,
+                             "count": vertex_count, "type": "VEC3",
+                             "min": [min(points[axis::3]) for axis in range(3)],
+                             "max": [max(points[axis::3]) for axis in range(3)]}
+        index_accessor = {"bufferView": add_buffer_view(indices, GLTF_ELEMENT_ARRAY_BUFFER),
+                          "componentType": GLTF_UNSIGNED_INT, "count": len(indices), "type": "SCALAR"}
+        gltf["accessors"].extend([position_accessor, index_accessor])
+
+        gltf["meshes"].append({"name": name, "primitives": [{"attributes": {"POSITION": len(gltf["accessors"]) - 2},
+                                                             "indices": len(gltf["accessors"]) - 1}]})
+        gltf["nodes"].append({"name": name, "mesh": len(gltf["meshes"]) - 1})
+        gltf["scenes"][0]["nodes"].append(len(gltf["nodes"]) - 1)
+
+    gltf["buffers"] = [{"byteLength": len(data),
+                        "uri": "data:application/octet-stream;base64," + base64.b64encode(bytes(data)).decode("ascii")}]
+
+    with open(path, "w") as gltf_file:
+        json.dump(gltf, gltf_file)
+
+
+def write(path, meshes):
+    """
+    Writes an OBJ or a glTF file, depending on the extension of the path.
+    """
+    if path.lower().endswith(".gltf"):
+        write_gltf(path, meshes)
+    elif path.lower().endswith(".obj"):
+        write_obj(path, meshes)
+    else:
+        raise ValueError("Only .obj and .gltf files can be written: {0}".format(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write gear meshes to an OBJ or glTF file, without Maya.")
+    parser.add_argument("path", help="The .obj or .gltf file to write.")
+    parser.add_argument("--gear", nargs=3, type=float, action="append", metavar=("TEETH", "LENGTH", "RADIUS"),
+                        required=True, help="A gear to write, can be given many times.")
+    args = parser.parse_args(argv)
+
+    meshes = []
+    for index, (teeth, length, radius) in enumerate(args.gear):
+        meshes.append(("gear{0}".format(index + 1),) + GearMeshBuilder.build(int(teeth), length, radius))
+
+    write(args.path, meshes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import collections
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Caches the teeth faces of the polyPipe gears by tooth count, so changing a gear to a tooth count it has had before
+doesn't format its face names again. Used by the Gear class and the ModelingTest functions. The cache only keeps the
+tooth counts used most recently.
+"""
+
+
+class FaceRange(object):
+    """
+    A compact range of face indices, start to stop (not included) in steps, instead of a list of face names.
+    Maya's component names has no steps, so a range with a step is only expanded to names when they are passed to a
+    command, in a single call.
+    """
+
+    def __init__(self, start, stop, step=1):
+        self.start = start
+        self.stop = stop
+        self.step = step
+
+    def __len__(self):
+        return len(range(self.start, self.stop, self.step))
+
+    def __iter__(self):
+        return iter(range(self.start, self.stop, self.step))
+
+    def get_names(self):
+        """
+        :return: The face names, like ["f[40]", "f[42]"], or a single ["f[40:59]"] when there are no steps.
+        """
+        if self.step == 1:
+            return ["f[{0}:{1}]".format(self.start, self.stop - 1)] if self.stop > self.start else []
+        return ["f[{0}]".format(face) for face in self]
+
+    def get_components(self, node):
+        """
+        :param node: The mesh node.
+        :return: The face names on the node, like ["pPipe1.f[40]", "pPipe1.f[42]"].
+        """
+        return ["{0}.{1}".format(node, name) for name in self.get_names()]
+
+
+class GearTopologyCache(object):
+
+    # The number of tooth counts kept, the least recently used one is thrown away when another is added.
+    MAX_SIZE = 32
+
+    # Dictionary of tooth count to its entry, in the order they were last used.
+    entries = collections.OrderedDict()
+
+    # Counters to see how well the cache is doing.
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def get_entry(cls, teeth):
+        """
+        :param teeth: Amount of gear teeth.
+        :return: Dictionary with the faces as a FaceRange, which also iterates the face indices, and the face names.
+        """
+        entry = cls.entries.pop(teeth, None)
+
+        if entry is None:
+            cls.misses += 1
+            # The teeth are every second face of the polyPipe, the range spans * 2 to spans * 3.
+            spans = teeth * 2
+            faces = FaceRange(spans * 2, spans * 3, 2)
+            # The names are a tuple, as they are shared by everyone asking for them.
+            entry = {"faces": faces, "face_names": tuple(faces.get_names())}
+
+            if len(cls.entries) >= cls.MAX_SIZE:
+                cls.entries.popitem(last=False)
+                cls.evictions += 1
+        else:
+            cls.hits += 1
+
+        # Putting the entry back at the end, as the most recently used.
+        cls.entries[teeth] = entry
+        return entry
+
+    @classmethod
+    def get_faces(cls, teeth):
+        """
+        :return: FaceRange of the teeth faces.
+        """
+        return cls.get_entry(teeth)["faces"]
+
+    @classmethod
+    def get_face_names(cls, teeth):
+        """
+        :return: Tuple of the teeth face names, like ("f[40]", "f[42]").
+        """
+        return cls.get_entry(teeth)["face_names"]
+
+    @classmethod
+    def clear(cls):
+        cls.entries.clear()
+
+    @classmethod
+    def get_stats(cls):
+        """
+        :return: Dictionary with the hits, misses, evictions, hit rate and number of cached tooth counts.
+        """
+        lookups = cls.hits + cls.misses
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "evictions": cls.evictions,
+            "hit_rate": float(cls.hits) / lookups if lookups else 0.0,
+            "cached_teeth": len(cls.entries),
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        cls.hits = 0
+        cls.misses = 0
+        cls.evictions = 0
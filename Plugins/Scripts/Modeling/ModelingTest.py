@@ -1,5 +1,7 @@
 import maya.cmds as cmds
 
+from Scripts.Modeling.GearTopologyCache import GearTopologyCache
+
 
 # Using the Maya 1.0 APIs
 # The test script, to help understand modeling with the Maya API
@@ -23,24 +25,19 @@ def gear_creator(standard_teeth=10, standard_length=0.3):
     # and the constructor is the node that creates the pipe and controls its parameters
     transform, constructor = cmds.polyPipe(subdivisionsAxis=spans)
 
-    # Creating a list to select all the faces that will become the teeth.
-    # This will return a list of numbers in the range 40 to 60, with steps of 2.
-    side_faces = range(spans * 2, spans * 3, 2)
-
-    print "Selecting the faces %s" % side_faces
+    # The faces that will become the teeth, shared with the Gear class through the topology cache.
+    # This will be the range 40 to 60, with steps of 2.
+    side_faces = GearTopologyCache.get_faces(standard_teeth)
 
-    # Clearing the selection, to ensure only faces is added.
-    cmds.select(clear=True)
+    print "Extruding the faces %s" % list(side_faces)
 
-    # Looping through the faces in the list of side_faces
-    for face in side_faces:
-        # The '%s.f[%s]' expands to something like pPipe1.f[20]
-        # ADD selecting the wanted faces on the created polygonPipe.
-        cmds.select("%s.f[%s]" % (transform, face), add=True)
+    # The components expands to something like pPipe1.f[20]
+    # Passing all the faces to the extrude in one call, instead of selecting them one at a time.
+    faces = side_faces.get_components(transform)
 
-    # Extruding the selected faces by the given length
+    # Extruding the faces by the given length
     # This gives back the value of the extrude node inside a list
-    extrude = cmds.polyExtrudeFacet(localTranslateZ=standard_length)[0]
+    extrude = cmds.polyExtrudeFacet(faces, localTranslateZ=standard_length)[0]
 
     print extrude
 
@@ -67,14 +64,8 @@ def gear_teeth_modifier(constructor, extrude, standard_teeth=10, length=0.3):
     # Modifying its attributes instead of creating a new one
     cmds.polyPipe(constructor, edit=True, subdivisionsAxis=spans)
 
-    # List of faces to extrude as teeth
-    side_faces = range(spans * 2, spans * 3, 2)
-    face_names = []
-
-    # Collecting the face names
-    for face in side_faces:
-        face_name = "f[%s]" % face
-        face_names.append(face_name)
+    # The names of the faces to extrude as teeth, only formatted the first time the tooth count is used.
+    face_names = GearTopologyCache.get_face_names(standard_teeth)
 
     # cmds.setAttr('extrudeNode.inputComponents', numberOfItems, item1, item2, item3, type='componentList')
     # Example cmds.setAttr('extrudeNode.inputComponents', 2, 'f[1]', 'f[2]', type='componentList'
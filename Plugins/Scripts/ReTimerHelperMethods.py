@@ -1,10 +1,18 @@
+import collections
+import time
 import traceback
 import maya.cmds as cmds
 import maya.mel as mel
 import maya.OpenMaya as om #Maya API 2.0
-from PySide2 import QtCore, QtWidgets
-from shiboken2 import wrapInstance
-import maya.OpenMayaUI as omui
+import maya.api.OpenMayaAnim as oma2
+from Scripts.Retiming import KeyMover, KeyScanner, TimingEngine
+from Scripts.Retiming.KeyframeIndex import KeyframeIndex
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimeLog import RetimeLog
+from Scripts.Retiming.RetimePlan import RetimePlan
+from Scripts.Retiming.RetimePlanFile import RetimePlanFile
+from Scripts.Retiming.RetimePreview import RetimePreview
+from Scripts.Retiming.RetimeTask import RetimeTask
 
 """
 Using: Maya API 1.0, Python 2.7.11
@@ -15,6 +23,24 @@ Requirements: A simple animation in maya, to showcase timeline editing.
 
 class ReTimerHelperMethods(object):
 
+    # The plugin holding the command that commits the key edits to the undo queue.
+    PLUGIN_NAME = "retimer_plugin.py"
+
+    # Selections with fewer keys than this are re-timed right away, as starting a worker would take longer.
+    ASYNC_MIN_KEYS = 20000
+
+    # The curves that are keyed in time, the ones re-timed across the animation layers. Driven keys are left out.
+    TIME_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
+    # The layer reported for curves that are not on any animation layer.
+    NO_LAYER = "(no layer)"
+
+    # When set, the re-timed keys are snapped to a grid with this step in frames, 1.0 for whole frames, and keys that
+    # would land on the same frame are pushed apart. Set by the dialog.
+    snap_grid = None
+
+    # Every re-time applied, so the same clicks can be saved and replayed on other shots.
+    operation_log = RetimeLog()
+
     # Method Types Python
     # https://levelup.gitconnected.com/method-types-in-python-2c95d46281cd
     # Using cls, as this won't be initialized with parameters.
@@ -22,7 +48,7 @@ class ReTimerHelperMethods(object):
     # https://www.programiz.com/python-programming/methods/built-in/classmethod
 
     @classmethod
-    def re_time_keys(cls, re_time_value, incremental, move_to_next):
+    def re_time_keys(cls, re_time_value, incremental, move_to_next, scale_tangents=False):
         """
         Re-time the selected keys (range).
         :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
@@ -30,6 +56,7 @@ class ReTimerHelperMethods(object):
         keyframes. This will be the top row buttons in the UI. When True the re_time value will be how many frames
         should be inserted between the keyframes in the selected range.
         :param move_to_next:
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
         :return:
         """
 
@@ -38,75 +65,103 @@ class ReTimerHelperMethods(object):
         # The user selected range in the playback slider.
         range_start_time, range_end_time = cls.get_selected_range()
 
-        # The keyframe of the start of the selected range.
-        start_keyframe_time = cls.get_start_keyframe_time(range_start_time)
-
-        # The very last keyframe for any of the selected objects.
-        last_keyframe_time = cls.get_last_keyframe_time()
-
-        # The start keyframe time, if we have a range, the current_time will always be the start of that range.
-        current_time = start_keyframe_time
-
-        # A list to store all of the soon to be calculated new keyframe times. start_keyframe_time is the anchor,
-        # while its time will not change, nor will any of the frame to the left of it. It will be required to calculate
-        # the new key frame times.
-        new_keyframe_times = [start_keyframe_time]
-
-        # This while loop is used to iterate over each of the key frames, starting at the start keyframe time,
-        # which the time is initially set to, and the loop end at the current time is equal to the last keyframe time.
-        while current_time != last_keyframe_time:
-            # Getting the next keyframe time. This will be used in the end of the loop to set the current_time to the
-            # next keyframes time until the loop reaches the last_keyframes_time.
-            next_keyframe_time = cls.find_keyframe("next", current_time)
-            # If incremental is True.
-            if incremental:
-                # Find the time difference between the current keyframe time and the next.
-                time_diff = next_keyframe_time - current_time
-                # If current time is less than the end time of the range.
-                if current_time < range_end_time:
-                    # Increment the time difference with the re_time_value.
-                    time_diff += re_time_value
-
-                    # One important thing, is that I need to handle one specific case, where too many frames is
-                    # being removed. There must always be 1 frame between keyframes, and keyframes cannot jump over
-                    # one another.
-
-                    # Therefore I check if time_diff is less than one, if so, I force it to be one.
-                    if time_diff < 1:
-                        time_diff = 1
-
-            # Calculation of new keyframe times, when the re-time value is absolute.
-            else:
-                # Because the re-time value is the exact number of frames, that should separate keyframes.
-                # The time difference for any keyframes in the selected range will be set to this value.
-
-                # Keyframes within the selected range
-                if current_time < range_end_time:
-                    time_diff = re_time_value
-                # Keyframes outside the selected range.
-                else:
-                    # Will keep the same number of frames between  the next keyframe, and will only be moved in
-                    # relation to the previous keyframe.
-                    time_diff = next_keyframe_time - current_time
-
-            # Calculating the final re-timed value for this keyframe, and add it to the new_keyframes_times list.
-            # To calculate the final value. I add the last keyframes new time and the time difference.
-            new_keyframe_times.append(new_keyframe_times[-1] + time_diff)
-            current_time = next_keyframe_time
-
-        # Checking the length of the new keyframe times list is bigger then one.
-        if len(new_keyframe_times) > 1:
-            # If there more then one value, begin the recursive re-timer.
-            cls.re_time_keys_recursive(start_keyframe_time, 0, new_keyframe_times)
-
-        # Storing the first keyframe time.
-        first_keyframe_time = cls.find_keyframe("first")
+        # Planning the re-time of every animation curve on the selected objects, over the selected range.
+        plan = cls.plan_re_time_curves(cls.get_anim_curves(), (range_start_time, range_end_time), re_time_value,
+                                       incremental)
+
+        # Nothing to re-time without keyframes.
+        if plan.is_empty():
+            return
+
+        # Moving the keys of every curve in one batch, using the old to new time of each keyframe.
+        cls.apply_plan(plan, scale_tangents)
+
+        cls.move_current_time(plan, move_to_next)
+
+    @classmethod
+    def re_time_keys_async(cls, re_time_value, incremental, move_to_next, scale_tangents=False, on_finished=None,
+                           on_progress=None):
+        """
+        Re-time the selected keys (range), planning the re-time on a worker thread. The keys are written on the main
+        thread when the plan is done, unless the task is cancelled or the scene changed in the meantime.
+        The parameters are the same as for re_time_keys.
+        :param on_finished: Optional function called with the task on the main thread, after the keys are written.
+        :param on_progress: Optional function called with the progress fraction on the main thread.
+        :return: The RetimeTask, None when the selection was small enough to be re-timed right away.
+        """
+        range_start_time, range_end_time = cls.get_selected_range()
+        curves = cls.get_anim_curves()
+
+        # The snapshot the worker plans on, read on the main thread. The plan gets its own copy of the cached lists.
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        if sum(len(times) for times in curve_key_times.values()) < cls.ASYNC_MIN_KEYS:
+            cls.re_time_keys(re_time_value, incremental, move_to_next, scale_tangents)
+            return None
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+
+        def finish(task):
+            try:
+                cls.apply_re_time_task(task, move_to_next, scale_tangents)
+            except Exception:
+                task.error = traceback.format_exc()
+            if on_finished:
+                on_finished(task)
+
+        task = RetimeTask(curve_key_times, (range_start_time, range_end_time), re_time_value, incremental,
+                          cls.snap_grid)
+        task.start(finish, on_progress)
+        return task
+
+    @classmethod
+    def apply_re_time_task(cls, task, move_to_next, scale_tangents=False):
+        """
+        Writes the keys of a planned task. Must be called on the main thread.
+        :param task: The finished RetimeTask.
+        :return: The number of keys moved.
+        """
+        if task.error:
+            raise RuntimeError("Planning the re-time failed:\n{0}".format(task.error))
+
+        # The plan is from a snapshot, if anything changed since, it could move the wrong keys.
+        if task.is_stale():
+            om.MGlobal.displayWarning("The scene changed while the re-time was planned, the re-time was discarded.")
+            return 0
+
+        if task.plan.is_empty():
+            return 0
+
+        keys_moved = cls.apply_plan(task.plan, scale_tangents)
+        cls.move_current_time(task.plan, move_to_next)
+        return keys_moved
+
+    @classmethod
+    def move_current_time(cls, plan, move_to_next):
+        """
+        Sets the current time after a re-time, to the start keyframe of the range, or the keyframe after it.
+        :param plan: The RetimePlan of the re-time.
+        :param move_to_next: When True the current time is set to the keyframe after the start keyframe.
+        """
+        range_start_time, range_end_time = plan.time_range
+        key_times = plan.key_times
+        new_key_times = plan.new_key_times
+
+        # The keyframe of the start of the selected range. Its time will not change, nor will any of the frames to the
+        # left of it.
+        anchor_index = TimingEngine.get_anchor_index(key_times, range_start_time)
+        start_keyframe_time = key_times[anchor_index]
+
+        # Storing the first keyframe time. The keyframes before the anchor never move, so it is still the first one.
+        first_keyframe_time = key_times[0]
 
         # The implementation of the move_to_next functionality, set in the parameters.
         if move_to_next and range_start_time >= first_keyframe_time:
             # When move_to_next is True and the range start time is after the very first keyframe, the current time
-            # will be set to the next keyframe, after the start keyframe time.
-            next_keyframe_time = cls.find_keyframe("next", start_keyframe_time)
+            # will be set to the next keyframe, after the start keyframe time. Which is already known, unless the start
+            # keyframe is the last one, then the index of the new key times wraps around to the first one.
+            if anchor_index + 1 < len(new_key_times):
+                next_keyframe_time = new_key_times[anchor_index + 1]
+            else:
+                next_keyframe_time = cls.find_keyframe("next", start_keyframe_time, KeyframeIndex(new_key_times))
             cls.set_current_time(next_keyframe_time)
         elif range_end_time > first_keyframe_time:
             # When move_to_next is False and range end time is before the first keyframe, after re-timing the current
@@ -117,39 +172,360 @@ class ReTimerHelperMethods(object):
             cls.set_current_time(range_start_time)
 
     @classmethod
-    def re_time_keys_recursive(cls, current_time, index, new_keyframe_times):
-        """
-        A recursive method to re-time keyframe times.
-        Starting with the first keyframe, verifying it can be moved, otherwise wait to the next frame has been
-        moved, then move it.
-        :param current_time: The chosen start keyframes time.  
-        :param index: The start index.
-        :param new_keyframe_times: List holding the keyframe times.
-        :return:
+    def preview_re_time_keys(cls, re_time_value, incremental, move_to_next):
         """
+        Previews a re-time of the selected range, without moving any keys. The first preview starts on the animation
+        curves of the selected objects, the next ones are added on top of it until it is applied or cancelled.
+        The parameters are the same as for re_time_keys.
+        """
+        range_start_time, range_end_time = cls.get_selected_range()
 
-        # Exit when index is larger or equal to length of new key frame times list.
-        if index >= len(new_keyframe_times):
-            return
+        if not RetimePreview.is_active():
+            curves = cls.get_anim_curves()
+            if not curves:
+                return
+            curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+            RetimePreview.start(dict((curve_name, list(times)) for curve_name, times in curve_key_times.items()))
+
+        plan = RetimePreview.re_time((range_start_time, range_end_time), re_time_value, incremental, cls.snap_grid)
+
+        # The current time follows the previewed keys, like it follows the moved keys.
+        if not plan.is_empty():
+            cls.move_current_time(plan, move_to_next)
+
+    @classmethod
+    def apply_preview(cls, scale_tangents=False):
+        """
+        Writes every previewed re-time to the keys in one batch, as a single undo, and removes the preview.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :return: The number of keys moved.
+        """
+        if not RetimePreview.is_active():
+            return 0
+
+        # The composed plan is from the keys as they were when the preview started.
+        if RetimePreview.is_stale():
+            RetimePreview.remove()
+            raise RuntimeError("The keys changed while previewing, the preview was cancelled")
+
+        plan = RetimePreview.get_plan()
+        click_plans = RetimePreview.click_plans
+        RetimePreview.remove()
+        keys_moved = cls.apply_plan(plan, scale_tangents)
+
+        # The composed plan is not a single re-time, so every click is logged instead. Like apply_plan, a preview that
+        # moved nothing isn't logged.
+        if keys_moved:
+            for click_plan in click_plans:
+                cls.operation_log.record(click_plan)
+        return keys_moved
+
+    @classmethod
+    def cancel_preview(cls):
+        """
+        Removes the preview, leaving the keys as they are.
+        """
+        RetimePreview.remove()
+
+    @classmethod
+    def re_time(cls, targets, time_range, re_time_value, incremental, dry_run=False, scale_tangents=False):
+        """
+        Re-time the keys of the given nodes or animation curves, without using the selection or the playback slider.
+        :param targets: List of animCurve nodes, or nodes with animation curves.
+        :param time_range: The (start time, end time) range to re-time.
+        :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
+        :param incremental: If False, the re_time_value is the exact number of frames between keyframes in the range.
+        When True the re_time_value is added to the frames between the keyframes in the range.
+        :param dry_run: When True the plan is only computed, nothing is changed in the scene.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :return: The RetimePlan.
+        """
+        plan = cls.plan_re_time(targets, time_range, re_time_value, incremental)
+
+        if not dry_run:
+            cls.apply_plan(plan, scale_tangents)
 
-        # Storing the updated key frame time.
-        updated_keyframe_time = new_keyframe_times[index]
+        return plan
 
-        # Getting the next keyframe.
-        next_keyframe_time = cls.find_keyframe("next", current_time)
+    @classmethod
+    def plan_re_time(cls, targets, time_range, re_time_value, incremental):
+        """
+        Plans the re-time of the keys of the given nodes or animation curves, without changing the scene.
+        The parameters are the same as for re_time.
+        :return: The RetimePlan.
+        """
+        return cls.plan_re_time_curves(cls.get_anim_curves_of(targets), time_range, re_time_value, incremental)
+
+    @classmethod
+    def plan_re_time_curves(cls, curves, time_range, re_time_value, incremental):
+        """
+        Plans the re-time of the keys of the given animation curves, without changing the scene.
+        :param curves: List of animCurve nodes.
+        The other parameters are the same as for re_time.
+        :return: The RetimePlan.
+        """
+        # The key times are cached between re-times, so re-timing the same curves again doesn't read them again.
+        # The plan gets its own copy of them, as the cached lists are patched after the keys are moved.
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
 
-        # If the keyframe can be moved.
-        if updated_keyframe_time < next_keyframe_time:
-            # Change the time immediately to the updated time.
-            cls.change_time_of_keyframe(current_time, updated_keyframe_time)
-            # Move the next keyframe
-            cls.re_time_keys_recursive(next_keyframe_time, index + 1, new_keyframe_times)
-        # If not
+        return RetimePlan.from_curve_key_times(curve_key_times, time_range, re_time_value, incremental, cls.snap_grid)
+
+    @classmethod
+    def apply_plan(cls, plan, scale_tangents=False):
+        """
+        Moves the keys of a planned re-time, with one batch of API edits per curve that changed.
+        The edits share one MAnimCurveChange, which is committed to the undo queue as a single undo.
+        :param plan: The RetimePlan.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :return: The number of keys moved.
+        """
+        change = oma2.MAnimCurveChange()
+        keys_moved = KeyMover.move_plan_keys(plan, change, scale_tangents)
+
+        # Only commit and log, when something was moved, so a no-op retime doesn't add an undo step or a log entry.
+        if keys_moved:
+            cls.commit_change(change)
+            cls.operation_log.record(plan)
+
+        return keys_moved
+
+    @classmethod
+    def export_re_time_keys(cls, path, re_time_value, incremental):
+        """
+        Plans a re-time of the selected keys (range) like re_time_keys, and writes it to a plan file instead of moving
+        the keys.
+        :param path: The folder to write the plan file to.
+        The other parameters are the same as for re_time_keys.
+        :return: The RetimePlan.
+        """
+        plan = cls.plan_re_time_curves(cls.get_anim_curves(), cls.get_selected_range(), re_time_value, incremental)
+        cls.export_plan(path, plan)
+        return plan
+
+    @classmethod
+    def export_plan(cls, path, plan):
+        """
+        Writes a plan with the key values of its curves to a plan file, see RetimePlanFile.
+        :param path: The folder to write the plan file to.
+        :param plan: The RetimePlan.
+        """
+        RetimePlanFile.from_plan(plan, KeyMover.get_curve_key_values(plan.curves)).write(path)
+
+    @classmethod
+    def import_plan(cls, path, targets=None, scale_tangents=False):
+        """
+        Reads a plan file and re-times the keys with its old to new time mapping, as a single undo.
+        :param path: The folder of the plan file.
+        :param targets: List of animCurve nodes, or nodes with animation curves, to re-time. Defaults to the curves of
+        the file that are in the scene.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :return: The RetimePlan that was applied.
+        """
+        plan_file = RetimePlanFile.read(path)
+
+        if targets is None:
+            curves = [curve_name for curve_name in plan_file.curve_names if cmds.objExists(curve_name)]
+        else:
+            curves = cls.get_anim_curves_of(targets)
+
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+
+        plan = plan_file.to_plan(curve_key_times)
+        cls.apply_plan(plan, scale_tangents)
+        return plan
+
+    @classmethod
+    def replay_log(cls, log, targets=None, scale_tangents=False):
+        """
+        Replays the operations of a log on the given nodes, as one re-time with a single write of the keys and a single
+        undo. Every operation is applied to the same curves, the ones of the targets.
+        :param log: The RetimeLog.
+        :param targets: List of animCurve nodes, or nodes with animation curves. Defaults to the selection, or the
+        curves of the log that are in the scene when nothing is selected.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :return: The composed RetimePlan.
+        """
+        if targets is not None:
+            curves = cls.get_anim_curves_of(targets)
         else:
-            # Move the next keyframe
-            cls.re_time_keys_recursive(next_keyframe_time, index + 1, new_keyframe_times)
-            # When the next keyframe is moved, it is safe to change the time of the current keyframe.
-            cls.change_time_of_keyframe(current_time, updated_keyframe_time)
+            curves = cls.get_anim_curves() or [curve_name for curve_name in log.get_curves()
+                                               if cmds.objExists(curve_name)]
+
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+
+        plan = log.get_plan(curve_key_times)
+        cls.apply_plan(plan, scale_tangents)
+        return plan
+
+    @classmethod
+    def scan_keys(cls, targets=None):
+        """
+        Looks for the keyframe problems a re-time would run into, like duplicate or sub-frame keys, keys outside the
+        playback range and locked or referenced curves. Nothing in the scene is changed.
+        :param targets: List of animCurve nodes, or nodes with animation curves. Defaults to the selection, or every
+        time curve in the scene when nothing is selected.
+        :return: The report dictionary of KeyScanner.scan_curve_key_times.
+        """
+        if targets is not None:
+            curves = cls.get_anim_curves_of(targets)
+        else:
+            curves = cls.get_anim_curves() or cmds.ls(type=cls.TIME_CURVE_TYPES) or []
+
+        # The key times are read once, through the cache a re-time of the same selection uses afterwards.
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+
+        locked_curves, referenced_curves = KeyScanner.get_curve_states(cmds, curves)
+        return KeyScanner.scan_curve_key_times(curve_key_times, KeyScanner.get_playback_range(cmds), locked_curves,
+                                               referenced_curves)
+
+    @classmethod
+    def re_time_keys_all_layers(cls, re_time_value, incremental, move_to_next, scale_tangents=False,
+                                namespaces=None):
+        """
+        Re-time the selected range of the selected objects on every animation layer, not only the active ones.
+        The parameters are the same as for re_time_keys.
+        :param namespaces: Optional list of namespaces, every node in them is re-timed too, like referenced characters.
+        :return: The report of re_time_layers.
+        """
+        plan, report = cls.re_time_layers(cmds.ls(selection=True), cls.get_selected_range(), re_time_value,
+                                          incremental, namespaces, scale_tangents)
+
+        if not plan.is_empty():
+            cls.move_current_time(plan, move_to_next)
+
+        return report
+
+    @classmethod
+    def re_time_layers(cls, targets, time_range, re_time_value, incremental, namespaces=None, scale_tangents=False):
+        """
+        Re-times the keys of the given nodes on every animation layer in one step. Every curve gets the same time
+        mapping, planned from the keys of all the layers, so the layers stays in sync.
+        :param targets: List of animated nodes.
+        :param namespaces: Optional list of namespaces, every node in them is re-timed too.
+        The other parameters are the same as for re_time.
+        :return: Tuple of the RetimePlan and a report dictionary, with the seconds spent finding the curves, planning,
+        and the curves, keys, keys moved and seconds of every layer.
+        """
+        start_time = time.time()
+        nodes = list(targets or [])
+        for namespace in namespaces or []:
+            # Nested namespaces are included, like a prop referenced into a character.
+            nodes.extend(cmds.ls("{0}:*".format(namespace), recursive=True) or [])
+        layer_curves = cls.get_layered_anim_curves(nodes)
+        gather_seconds = time.time() - start_time
+
+        start_time = time.time()
+        plan = cls.plan_re_time_curves([curve for curves in layer_curves.values() for curve in curves], time_range,
+                                       re_time_value, incremental)
+        report = {"gather_seconds": gather_seconds, "plan_seconds": time.time() - start_time,
+                  "layers": collections.OrderedDict()}
+
+        # The edits of every layer shares one MAnimCurveChange, so the whole re-time is a single undo.
+        change = oma2.MAnimCurveChange()
+        keys_moved = 0
+        try:
+            keys_moved = cls.move_layer_keys(plan, layer_curves, change, scale_tangents, report)
+        except Exception:
+            # The failing layer put back every key of the shared change, so the cache of the layers before it, that
+            # was patched with the new times, is thrown away too.
+            for curve_name in plan.curves:
+                KeyTimeCache.invalidate_curve(curve_name)
+            raise
+
+        # Only commit and log, when something was moved, so a no-op retime doesn't add an undo step or a log entry.
+        if keys_moved:
+            cls.commit_change(change)
+            cls.operation_log.record(plan)
+
+        return plan, report
+
+    @classmethod
+    def move_layer_keys(cls, plan, layer_curves, change, scale_tangents, report):
+        """
+        Moves the keys of each layer with the anchors of the whole plan, adding the layers to the report.
+        :param plan: The RetimePlan of the curves of every layer.
+        :param layer_curves: Ordered dictionary of layer name to the list of its curves.
+        :param change: The MAnimCurveChange shared by every layer.
+        :param scale_tangents: When True the tangent handles are stretched with the frames between the keyframes.
+        :param report: The report dictionary of re_time_layers.
+        :return: The number of keys moved.
+        """
+        keys_moved = 0
+        for layer, curves in layer_curves.items():
+            start_time = time.time()
+            curve_key_times = dict((curve_name, plan.curve_key_times[curve_name]) for curve_name in curves)
+            # The layer gets the anchors of the whole plan, so its keys are mapped the same way as on the other layers.
+            layer_plan = RetimePlan(curve_key_times, plan.key_times, plan.new_key_times, plan.time_range,
+                                    plan.snap_grid, plan.tolerance)
+            layer_keys_moved = KeyMover.move_plan_keys(layer_plan, change, scale_tangents) if not plan.is_empty() else 0
+            keys_moved += layer_keys_moved
+
+            report["layers"][layer] = {"curves": len(curves),
+                                       "keys": sum(len(times) for times in curve_key_times.values()),
+                                       "keys_moved": layer_keys_moved, "seconds": time.time() - start_time}
+
+        return keys_moved
+
+    @classmethod
+    def get_layered_anim_curves(cls, nodes):
+        """
+        Finds the animation curves of the nodes on every animation layer. The keyframe command only sees the curves of
+        the active layers, so instead the curves are found in one traversal of the history of the nodes.
+        :param nodes: List of animated nodes.
+        :return: OrderedDict of layer name to the list of its curves.
+        """
+        if not nodes:
+            return collections.OrderedDict()
+
+        # The curves of the layers are connected through the blend nodes of the layers. Stopping at DAG nodes keeps the
+        # traversal from following constraints into other rigs.
+        history = cmds.listHistory(nodes, pruneDagObjects=True) or []
+        # Driven keys are not re-timed, and neither is the time warp of a preview.
+        curves = set(cmds.ls(history, type=cls.TIME_CURVE_TYPES) or [])
+        curves.discard(RetimePreview.WARP_NODE_NAME)
+
+        # One query for each layer, instead of one for each curve.
+        curve_layers = {}
+        for layer in cmds.ls(type="animLayer") or []:
+            for curve_name in cmds.animLayer(layer, query=True, animCurves=True) or []:
+                curve_layers[curve_name] = layer
+
+        layer_curves = collections.OrderedDict()
+        for curve_name in sorted(curves):
+            layer_curves.setdefault(curve_layers.get(curve_name, cls.NO_LAYER), []).append(curve_name)
+        return layer_curves
+
+    @classmethod
+    def get_layer_report_text(cls, report):
+        """
+        :param report: The report of re_time_layers.
+        :return: The report as readable text.
+        """
+        lines = ["Found the curves in {0:.1f} ms, planned in {1:.1f} ms.".format(report["gather_seconds"] * 1000,
+                                                                                  report["plan_seconds"] * 1000),
+                 "{0:<24} {1:>8} {2:>10} {3:>10} {4:>10}".format("layer", "curves", "keys", "moved", "ms")]
+        for layer, layer_report in report["layers"].items():
+            lines.append("{0:<24} {1:>8} {2:>10} {3:>10} {4:>10.1f}".format(
+                layer, layer_report["curves"], layer_report["keys"], layer_report["keys_moved"],
+                layer_report["seconds"] * 1000))
+        return "\n".join(lines)
+
+    @classmethod
+    def commit_change(cls, change):
+        """
+        Hands a MAnimCurveChange to Maya's undo queue through the reTimerCommitChange command.
+        :param change: The applied MAnimCurveChange.
+        """
+        # The command lives in the retimer plugin, so I make sure it is loaded.
+        if not cmds.pluginInfo(cls.PLUGIN_NAME, query=True, loaded=True):
+            cmds.loadPlugin(cls.PLUGIN_NAME, quiet=True)
+
+        KeyMover.pending_changes.append(change)
+        cmds.reTimerCommitChange()
 
     @classmethod
     def set_current_time(cls, time):
@@ -173,13 +549,18 @@ class ReTimerHelperMethods(object):
         return selected_range
 
     @classmethod
-    def find_keyframe(cls, which, time=None):
+    def find_keyframe(cls, which, time=None, index=None):
         """
         Queries the frame of a keyframe, based on a string value passed in.
         :param which: which keyframe to query (first, last, next or previous).
         :param time: Defaults to None, as it is not required for every which value.
+        :param index: Optional KeyframeIndex to look the keyframe up in, instead of querying Maya.
         :return: returns the value of the find key_frame command.
         """
+        # Looking up in the index is a bisect, instead of a command. Without keys Maya decides what to return.
+        if index:
+            return index.find(which, time)
+
         # Dictionary containing all the command flags, that will be passed into the find key frames command.
         kwargs = {"which": which}
         # Checking if the flag is next or previous.
@@ -206,12 +587,18 @@ class ReTimerHelperMethods(object):
         cmds.keyframe(edit=True, time=(current_time, current_time), timeChange=new_time)
 
     @classmethod
-    def get_start_keyframe_time(cls, range_start_time):
+    def get_start_keyframe_time(cls, range_start_time, index=None):
         """
         Get the start keyframe time or the previous.
         :param range_start_time:
+        :param index: Optional KeyframeIndex to look the keyframe up in, instead of querying Maya.
         :return: The current chosen or previous keyframe if no keyframe exist.
         """
+        if index:
+            if index.has_key(range_start_time):
+                return range_start_time
+            return index.previous(range_start_time)
+
         # Maya keyframe command.
         start_times = cmds.keyframe(query=True, time=(range_start_time, range_start_time))
         # If there is a list returned with any values.
@@ -224,190 +611,37 @@ class ReTimerHelperMethods(object):
         return start_time
 
     @classmethod
-    def get_last_keyframe_time(cls):
+    def get_last_keyframe_time(cls, index=None):
         """
+        :param index: Optional KeyframeIndex to look the keyframe up in, instead of querying Maya.
         :return: The last Keyframe time.
         """
-        return cls.find_keyframe("last")
-
-# Extends QDialog class
-class RetimingUi(QtWidgets.QDialog):
-
-    # Constants
-    WINDOW_TITLE = "Retiming Tool"
-    ABSOLUTE_BUTTON_WIDTH = 50
-    RELATIVE_BUTTON_WIDTH = 64
-    RETIMING_PROPERTY_NAME = "re_timing_data"
-
-    # Storing an instance of this dialog.
-    # Storing as class level variable.
-    dlg_instance = None
+        return cls.find_keyframe("last", index=index)
 
-    # Adding a display method to the class, for production release.
     @classmethod
-    def display(cls):
-        # I check if there isn't an instance created.
-        if not cls.dlg_instance:
-            # Storing as class level variable.
-            cls.dlg_instance = RetimingUi()
-
-        # I check if the instance is hidden.
-        if cls.dlg_instance.isHidden():
-            # If it is hidden I show it.
-            cls.dlg_instance.show()
-        else:
-            # Otherwise I will raise the window and activate it.
-            cls.dlg_instance.raise_()
-            cls.dlg_instance.activateWindow()
+    def get_anim_curves(cls):
+        """
+        :return: The animation curves of the selected objects.
+        """
+        # Maya keyframe command, the name flag returns the animCurve nodes instead of the key times.
+        # Only queried when the selection or its connections has changed since the last time.
+        return KeyTimeCache.get_anim_curves(lambda: cmds.keyframe(query=True, name=True) or [])
 
     @classmethod
-    def maya_main_window(cls):
-        """
-        Used to parent this dialog to Mayas main window.
-        Return the Maya main window widget as a Python object
-        """
-        main_window_ptr = omui.MQtUtil.mainWindow()
-        return wrapInstance(long(main_window_ptr), QtWidgets.QWidget)
-
-    def __init__(self):
-        super(RetimingUi, self).__init__(self.maya_main_window())
-
-        # Setting the window title of the main window.
-        self.setWindowTitle(self.WINDOW_TITLE)
-
-        # Setting the window title of the main window.
-        # If windows.
-        if cmds.about(ntOS=True):
-            # The question mark in the top right of the title bar, is removed from the dialog.
-            self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
-        # Else if Mac OS
-        elif cmds.about(macOS=True):
-            # Setting the dialog to be interpreted as a tool, to keep the dialog from falling behind Mayas main window.
-            self.setWindowFlags(QtCore.Qt.Tool)
-
-        self.create_widgets()
-        self.create_layouts()
-        self.create_connections()
-
-    def create_widgets(self):
-        # A list to store the top-row buttons
-        self.absolute_buttons = []
-
-        # Creating 6 buttons, moving up to 6 frames as a maximum.
-        for i in range(1, 7):
-            # The text on the button.
-            btn = QtWidgets.QPushButton("{0}f".format(i))
-            # Using the constant to set a fixed width
-            btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
-            # Storing the value inside the widget itself, later this will allow the re_time method to pull out how
-            # many frames, aswell whether or not it is absolute re-timing or relative re-timing. Passing in a list,
-            # with two values, the first is the current value of i, this will be the number of frames, that will be
-            # re-timed with, as whether or not it is incremental timing.
-            # Because this is absolute buttons, it is not incremental, and i will set the second value to False.
-            btn.setProperty(self.RETIMING_PROPERTY_NAME, [i, False])
-            # Now I add the new absolute button to the list.
-            self.absolute_buttons.append(btn)
-
-        # A list to store the bottom-row buttons.
-        self.relative_buttons = []
-
-        # Creating 4 Buttons.
-        for i in [-2, -1, 1, 2]:
-            # The text on the button.
-            btn = QtWidgets.QPushButton("{0}f".format(i))
-            # Using the constant to set a fixed width
-            btn.setFixedWidth(self.RELATIVE_BUTTON_WIDTH)
-            # Storing the value inside the widget itself, later this will allow the re_time method to pull out how
-            # many frames, aswell whether or not it is absolute re-timing or relative re-timing. Passing in a list,
-            # with two values, the first is the current value of i, this will be the number of frames, that will be
-            # re-timed with, as whether or not it is incremental timing.
-            # Because this is relative button, it is incremental, so I set the value to True.
-            btn.setProperty(self.RETIMING_PROPERTY_NAME, [i, True])
-            # Now I add the new relative button to the list.
-            self.relative_buttons.append(btn)
-
-        # To enable move to next frame, I set a checkbox to give the option to enable and disable.
-        self.move_to_next_cb = QtWidgets.QCheckBox("Move to Next Frame")
-
-    def create_layouts(self):
-        # The layout for my top-row buttons. In a horizontal layout.
-        absolute_re_time_layout = QtWidgets.QHBoxLayout()
-        # The spacing between buttons.
-        absolute_re_time_layout.setSpacing(2)
-        # Iterating over my list of absolute buttons.
-        for btn in self.absolute_buttons:
-            absolute_re_time_layout.addWidget(btn)
-
-        # The layout for my bottom-row buttons. In a horizontal layout.
-        relative_re_time_layout = QtWidgets.QHBoxLayout()
-        # The spacing between buttons.
-        relative_re_time_layout.setSpacing(2)
-        # Iterating over my list of relative buttons.
-        for btn in self.relative_buttons:
-            relative_re_time_layout.addWidget(btn)
-            # If there is two widgets in this layout.
-            if relative_re_time_layout.count() == 2:
-                # Add a stretch between the negative and positive numbers.
-                relative_re_time_layout.addStretch()
-
-        # Building the UI.
-        # Adding my main layout, which is a vertical box layout layout, parented to dialog.
-        main_layout = QtWidgets.QVBoxLayout(self)
-        # Setting the margins.
-        main_layout.setContentsMargins(2, 2, 2, 2)
-        # Setting the spacing
-        main_layout.setSpacing(2)
-        # I now add the two button layouts.
-        main_layout.addLayout(absolute_re_time_layout)
-        main_layout.addLayout(relative_re_time_layout)
-        # Adding the checkbox.
-        main_layout.addWidget(self.move_to_next_cb)
-
-    def create_connections(self):
-        # Creating the clicked signal connected to the retime slot.
-        # For the absolute buttons.
-        for btn in self.absolute_buttons:
-            btn.clicked.connect(self.retime)
-        # For the relative buttons.
-        for btn in self.relative_buttons:
-            btn.clicked.connect(self.retime)
-
-    def retime(self):
-        # Waiting for a signal to be received from a widget(button) click.
-        # I query this using the sender method.
-        btn = self.sender()
-        # If a signal is received and therefore was a sender.
-        if btn:
-            # I retrieve the data stored as a property. Storing ot in retiming_data, getting the data with the
-            # property method passing in the key used to store the data.
-            retiming_data = btn.property(self.RETIMING_PROPERTY_NAME)
-            # I query if the move_to_next is checked.
-            move_to_next = self.move_to_next_cb.isChecked()
-
-            # Using the undo info command, that would group multiple undo operations into a single undo.
-            # I create a undo chunk sorrounding the RetimerHelperMethods re-time keys.
-            # Open flag.
-            cmds.undoInfo(openChunk=True)
-            # Hindering not reaching the undoInfo, by handling exceptions.
-            try:
-                # I now call the RetimeHelperMethods re_time_keys method.
-                # I pass in the number of frames and of it is a incremental or absolute change, and if move_to_next is enabled.
-                ReTimerHelperMethods.re_time_keys(retiming_data[0], retiming_data[1], move_to_next)
-            except:
-                # Printing the error to the editor.
-                traceback.print_exc()
-                # Displaying the error to maya.
-                om.MGlobal.displayError("Re-time error occurred. See the script editor for details.")
-            # Close fag.
-            cmds.undoInfo(closeChunk=True)
+    def get_anim_curves_of(cls, targets):
+        """
+        :param targets: List of animCurve nodes, or nodes with animation curves.
+        :return: The animation curves of the targets.
+        """
+        # Without any targets the keyframe command would fall back to the selection.
+        if not targets:
+            return []
+        # Maya keyframe command, an animCurve node given to it returns itself.
+        return cmds.keyframe(targets, query=True, name=True) or []
 
-if __name__ == "__main__":
 
-    try:
-        retiming_ui.close()  # pylint: disable=E0601
-        retiming_ui.deleteLater()
-    except:
-        pass
+if __name__ == "__main__":
+    # Running the file in the script editor still opens the dialog, the Qt modules are only imported for it here.
+    from Scripts.RetimingUi import RetimingUi
 
-    retiming_ui = RetimingUi()
-    retiming_ui.show()
+    RetimingUi.display()
@@ -0,0 +1,268 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from Scripts.Retiming import TimingEngine
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: Maya standalone (mayapy), Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Applies the same re-time to many scene files, without the UI or the playback slider.
+Every worker process runs its own standalone Maya, and writes a report of the keys moved and the time it took.
+
+Example:
+    mayapy -m Scripts.Retiming.BatchRetime spec.json --processes 4 --report report.json
+
+The spec is a json file like:
+    {
+        "files": ["shots/*.mb", "retiming_tool_example.mb"],
+        "mode": "incremental",
+        "value": 2,
+        "ranges": [[10, 40]],
+        "nodes": ["character1:*"],
+        "output_dir": "retimed"
+    }
+An optional "snap": 1.0 snaps the re-timed keys to whole frames, or any other step of frames.
+"""
+
+# Only curves driven by time can be re-timed, this leaves out set driven keys.
+TIME_CURVE_TYPES = ["animCurveTA", "animCurveTL", "animCurveTT", "animCurveTU"]
+
+SCENE_FILE_TYPES = {".ma": "mayaAscii", ".mb": "mayaBinary"}
+
+RETIME_MODES = ["absolute", "incremental"]
+
+
+def load_spec(spec_path):
+    """
+    Reads and validates a re-time spec.
+    :param spec_path: Path to the json spec.
+    :return: The spec dictionary, with the file patterns expanded to scene files.
+    """
+    with open(spec_path) as spec_file:
+        spec = json.load(spec_file)
+
+    # Relative file patterns are relative to the spec.
+    base_dir = os.path.dirname(os.path.abspath(spec_path))
+    spec["files"] = expand_files(spec.get("files", []), base_dir)
+
+    validate_spec(spec)
+    return spec
+
+
+def validate_spec(spec):
+    """
+    Raises a ValueError if the spec can't be used.
+    :param spec: The spec dictionary.
+    """
+    if spec.get("mode") not in RETIME_MODES:
+        raise ValueError("The mode must be one of {0}".format(", ".join(RETIME_MODES)))
+    if not isinstance(spec.get("value"), (int, float)):
+        raise ValueError("The value must be a number of frames")
+    # Keyframes can't be on top of each other.
+    if spec["mode"] == "absolute" and spec["value"] < 1:
+        raise ValueError("An absolute value must be at least 1 frame")
+    if not spec.get("ranges"):
+        raise ValueError("At least one frame range is required")
+    for time_range in spec["ranges"]:
+        if len(time_range) != 2 or time_range[0] > time_range[1]:
+            raise ValueError("A frame range must be [start, end], got {0}".format(time_range))
+    if spec.get("snap") is not None and (not isinstance(spec["snap"], (int, float)) or spec["snap"] <= 0):
+        raise ValueError("The snap must be a positive number of frames")
+
+
+def expand_files(patterns, base_dir):
+    """
+    :param patterns: List of scene file paths or glob patterns.
+    :param base_dir: The directory relative paths are relative to.
+    :return: Sorted list of the scene files.
+    """
+    files = set()
+    for pattern in patterns:
+        files.update(glob.glob(os.path.join(base_dir, pattern)))
+    return sorted(path for path in files if os.path.splitext(path)[1].lower() in SCENE_FILE_TYPES)
+
+
+def get_curves(cmds, node_filters=None):
+    """
+    :param cmds: The maya.cmds module.
+    :param node_filters: List of node name patterns. When empty every time curve in the scene is used.
+    :return: The time driven animation curves to re-time.
+    """
+    if not node_filters:
+        return cmds.ls(type=TIME_CURVE_TYPES) or []
+
+    nodes = cmds.ls(node_filters) or []
+    if not nodes:
+        return []
+
+    curves = cmds.keyframe(nodes, query=True, name=True) or []
+    time_curves = set(cmds.ls(curves, type=TIME_CURVE_TYPES) or [])
+    return sorted(time_curves)
+
+
+def read_curve_key_times(cmds, curves):
+    """
+    :param cmds: The maya.cmds module.
+    :param curves: List of animCurve node names.
+    :return: Dictionary of curve name to the list of its key times.
+    """
+    return dict((curve, cmds.keyframe(curve, query=True, timeChange=True) or []) for curve in curves)
+
+
+def plan_re_time(curve_key_times, spec):
+    """
+    Plans the re-time of the spec the same way the retimer does in the UI. Keys closer than the time tolerance count
+    as one frame, and with a snap the keys between the anchors are snapped too.
+    :param curve_key_times: Dictionary of curve name to the list of its key times.
+    :param spec: The spec dictionary.
+    :return: The RetimePlan.
+    """
+    key_times = set()
+    for times in curve_key_times.values():
+        key_times.update(times)
+    key_times = TimingEngine.merge_close_times(key_times)
+
+    new_key_times = TimingEngine.compute_new_key_times_for_ranges(key_times, spec["ranges"], spec["value"],
+                                                                  spec["mode"] == "incremental")
+    # The keys before the first range stay, so that is where the snapping starts.
+    time_range = (min(time_range[0] for time_range in spec["ranges"]),
+                  max(time_range[1] for time_range in spec["ranges"]))
+    plan = RetimePlan(curve_key_times, key_times, new_key_times, time_range, spec.get("snap"))
+
+    if spec.get("snap") and key_times:
+        plan.new_key_times = TimingEngine.snap_key_times(key_times, new_key_times, plan.get_anchor_time(), spec["snap"])
+    return plan
+
+
+def write_plan_keys(plan):
+    """
+    Moves the keys of every curve that changed to their new time, with one batch of API edits per curve.
+    :param plan: The RetimePlan.
+    :return: The number of keys moved.
+    """
+    # The Maya API can only be imported once the standalone Maya of the worker is started.
+    from Scripts.Retiming import KeyMover
+
+    # Nothing is undone in a batch, so the edits are not recorded in a MAnimCurveChange.
+    return KeyMover.move_curve_key_array(plan.get_curve_key_array(), plan.get_new_curve_key_array())
+
+
+def retime_scene(scene_path, spec, cmds=None):
+    """
+    Opens a scene, re-times it after the spec and saves it.
+    :param scene_path: The scene file to re-time.
+    :param spec: The spec dictionary.
+    :param cmds: The maya.cmds module, or a stand-in for it.
+    :return: The report dictionary of the scene.
+    """
+    if cmds is None:
+        import maya.cmds as cmds
+
+    report = {"file": scene_path, "output": None, "curves": 0, "keys_moved": 0, "error": None}
+
+    start_time = time.time()
+    cmds.file(scene_path, open=True, force=True)
+    report["open_seconds"] = time.time() - start_time
+
+    start_time = time.time()
+    curve_key_times = read_curve_key_times(cmds, get_curves(cmds, spec.get("nodes")))
+
+    plan = plan_re_time(curve_key_times, spec)
+    report["curves"] = len(curve_key_times)
+    report["keys_moved"] = write_plan_keys(plan)
+    report["retime_seconds"] = time.time() - start_time
+
+    start_time = time.time()
+    output_path = scene_path
+    if spec.get("output_dir"):
+        output_path = os.path.join(spec["output_dir"], os.path.basename(scene_path))
+        cmds.file(rename=output_path)
+    cmds.file(save=True, force=True, type=SCENE_FILE_TYPES[os.path.splitext(output_path)[1].lower()])
+    report["output"] = output_path
+    report["save_seconds"] = time.time() - start_time
+
+    return report
+
+
+def retime_scene_safely(scene_path, spec, cmds=None):
+    """
+    Same as retime_scene, but a failing scene is returned in the report instead of stopping the batch.
+    """
+    try:
+        return retime_scene(scene_path, spec, cmds)
+    except Exception as error:
+        return {"file": scene_path, "output": None, "curves": 0, "keys_moved": 0, "error": str(error)}
+
+
+def retime_scene_worker(arguments):
+    # Pool.map only passes a single argument.
+    return retime_scene_safely(*arguments)
+
+
+def initialize_standalone():
+    """
+    Starts a standalone Maya in the worker process.
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+
+def run_batch(spec, processes=None, cmds=None):
+    """
+    Re-times every scene file of the spec.
+    :param spec: The spec dictionary.
+    :param processes: The number of worker processes, defaults to the number of CPUs.
+    :param cmds: A stand-in for maya.cmds. When given the scenes are re-timed in this process with it.
+    :return: List of report dictionaries, one for each scene.
+    """
+    if spec.get("output_dir") and not os.path.isdir(spec["output_dir"]) and cmds is None:
+        os.makedirs(spec["output_dir"])
+
+    if cmds is not None:
+        return [retime_scene_safely(scene_path, spec, cmds) for scene_path in spec["files"]]
+
+    # Making the workers start mayapy and not a plain python.
+    multiprocessing.set_executable(sys.executable)
+
+    pool = multiprocessing.Pool(processes, initializer=initialize_standalone)
+    try:
+        return pool.map(retime_scene_worker, [(scene_path, spec) for scene_path in spec["files"]], chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-time the keys of many Maya scene files.")
+    parser.add_argument("spec", help="The json re-time spec.")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--report", default="retime_report.json", help="Where to write the json report.")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+
+    start_time = time.time()
+    reports = run_batch(spec, args.processes)
+
+    summary = {
+        "files": len(reports),
+        "failed": len([report for report in reports if report["error"]]),
+        "keys_moved": sum(report["keys_moved"] for report in reports),
+        "seconds": time.time() - start_time,
+    }
+
+    with open(args.report, "w") as report_file:
+        json.dump({"summary": summary, "files": reports}, report_file, indent=4)
+
+    print("Re-timed {files} files, {keys_moved} keys moved, {failed} failed in {seconds:.2f} seconds".format(**summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
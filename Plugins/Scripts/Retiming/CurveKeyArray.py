@@ -0,0 +1,111 @@
+from array import array
+
+from Scripts.Retiming import TimingEngine
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The key times of many animation curves stored in one flat array, with the offset of where each curve starts.
+That way a re-time is applied to every curve with a single call, while each curve keeps only its own keys.
+"""
+
+
+class CurveKeyArray(object):
+
+    # How many keys are mapped between each check for cancel, when mapping on a worker thread.
+    CHUNK_SIZE = 50000
+
+    def __init__(self, curve_names, times, offsets):
+        """
+        :param curve_names: List of the curve names.
+        :param times: array of doubles, holding the key times of every curve after each other.
+        :param offsets: List of where each curve starts in times, with the length of times as the last entry.
+        """
+        self.curve_names = curve_names
+        self.times = times
+        self.offsets = offsets
+
+    @classmethod
+    def from_curve_key_times(cls, curve_key_times):
+        """
+        :param curve_key_times: Dictionary of curve name to the list of its key times.
+        :return: A CurveKeyArray holding the curves, sorted by name.
+        """
+        curve_names = sorted(curve_key_times.keys())
+        times = array("d")
+        offsets = [0]
+
+        for curve_name in curve_names:
+            times.extend(curve_key_times[curve_name])
+            offsets.append(len(times))
+
+        return cls(curve_names, times, offsets)
+
+    def __len__(self):
+        return len(self.curve_names)
+
+    def get_key_count(self):
+        return len(self.times)
+
+    def get_curve_times(self, index):
+        """
+        :param index: The index of the curve.
+        :return: The key times of the curve, as an array.
+        """
+        return self.times[self.offsets[index]:self.offsets[index + 1]]
+
+    def to_curve_key_times(self):
+        """
+        :return: Dictionary of curve name to the list of its key times.
+        """
+        return dict((curve_name, self.get_curve_times(index).tolist())
+                    for index, curve_name in enumerate(self.curve_names))
+
+    def map_times(self, anchor_times, new_anchor_times, on_progress=None, is_cancelled=None):
+        """
+        Applies a re-time to the keys of every curve in one call.
+        :param anchor_times: Sorted list of unique anchor times.
+        :param new_anchor_times: List of the new anchor times, in the same order as anchor_times.
+        :param on_progress: Optional function called with the fraction of the keys mapped so far.
+        :param is_cancelled: Optional function returning True when the mapping should stop.
+        :return: A new CurveKeyArray with the re-timed key times, the curves and offsets are shared. None if cancelled.
+        """
+        if on_progress is None and is_cancelled is None:
+            new_times = array("d", TimingEngine.map_times(self.times, anchor_times, new_anchor_times))
+            return CurveKeyArray(self.curve_names, new_times, self.offsets)
+
+        # Mapping the keys in chunks, so the progress can be reported and the mapping stopped between them.
+        key_count = len(self.times)
+        new_times = array("d")
+        for start in range(0, key_count, self.CHUNK_SIZE):
+            if is_cancelled and is_cancelled():
+                return None
+            new_times.extend(TimingEngine.map_times(self.times[start:start + self.CHUNK_SIZE], anchor_times,
+                                                    new_anchor_times))
+            if on_progress:
+                on_progress(float(len(new_times)) / key_count)
+
+        return CurveKeyArray(self.curve_names, new_times, self.offsets)
+
+    def get_changed_curves(self, other):
+        """
+        :param other: A CurveKeyArray with the same curves, like the one returned by map_times.
+        :return: The indices of the curves with key times that differ between the two.
+        """
+        return [index for index in range(len(self.curve_names))
+                if self.get_curve_times(index) != other.get_curve_times(index)]
+
+    def snap_times(self, new_curve_key_array, start_time, grid, tolerance=TimingEngine.TIME_TOLERANCE):
+        """
+        Snaps the re-timed keys of every curve to a grid, see TimingEngine.snap_key_times.
+        :param new_curve_key_array: The re-timed key times of the same curves, like the one returned by map_times.
+        :param start_time: The time of the anchor of the re-time, only the keys after it are snapped.
+        :param grid: The step of the grid in frames, 1.0 for whole frames.
+        :return: A new CurveKeyArray with the snapped key times, the curves and offsets are shared.
+        """
+        snapped_times = array("d")
+        for index in range(len(self.curve_names)):
+            snapped_times.extend(TimingEngine.snap_key_times(self.get_curve_times(index),
+                                                             new_curve_key_array.get_curve_times(index), start_time,
+                                                             grid, tolerance))
+        return CurveKeyArray(self.curve_names, snapped_times, self.offsets)
@@ -0,0 +1,158 @@
+import cProfile
+import collections
+import timeit
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Opt-in timing of the Maya calls the re-timer makes. When enabled the methods of ReTimerHelperMethods are wrapped, and
+every call is counted and timed. When disabled the original methods are put back, so they cost nothing extra.
+
+Example:
+    Instrumentation.enable(ReTimerHelperMethods, profile_path="C:/temp/retime.prof")
+    ... re-time in the UI ...
+    print(Instrumentation.get_summary())
+"""
+
+
+class Instrumentation(object):
+
+    # The methods that are timed.
+    INSTRUMENTED_METHODS = ["re_time_keys", "re_time", "preview_re_time_keys", "apply_preview", "re_time_keys_async",
+                            "apply_re_time_task", "re_time_keys_all_layers", "re_time_layers",
+                            "get_layered_anim_curves", "plan_re_time_curves", "apply_plan", "find_keyframe",
+                            "change_time_of_keyframe", "get_start_keyframe_time", "set_current_time",
+                            "get_selected_range", "get_anim_curves", "commit_change"]
+
+    # The methods that starts a re-time, they are the ones profiled and recorded as a re-time.
+    RE_TIME_METHODS = ["re_time_keys", "re_time", "preview_re_time_keys", "apply_preview", "apply_re_time_task",
+                       "re_time_keys_all_layers", "re_time_layers"]
+
+    # How many of the last re-times to keep.
+    MAX_RE_TIMES = 50
+
+    enabled = False
+    target_class = None
+    original_methods = {}
+
+    # Dictionary of method name to a dictionary of calls, total_seconds and max_seconds.
+    stats = {}
+    # The last re-times, each a dictionary of method, seconds, calls and max_depth.
+    re_times = collections.deque(maxlen=MAX_RE_TIMES)
+
+    # When set, every re-time is run through cProfile and its stats are dumped to this file, replacing the last ones.
+    profile_path = None
+
+    # The nesting of the instrumented calls in the re-time that is running.
+    depth = 0
+    max_depth = 0
+    re_time_calls = 0
+
+    @classmethod
+    def enable(cls, target_class, profile_path=None):
+        """
+        Wraps the instrumented methods of the target class.
+        :param target_class: The class to instrument, ReTimerHelperMethods.
+        :param profile_path: Optional file to dump the cProfile stats of each re-time to.
+        """
+        if cls.enabled:
+            cls.disable()
+
+        cls.target_class = target_class
+        cls.profile_path = profile_path
+
+        for name in cls.INSTRUMENTED_METHODS:
+            method = target_class.__dict__.get(name)
+            if method is None:
+                continue
+            cls.original_methods[name] = method
+            # All the methods are classmethods, so the function is wrapped and made a classmethod again.
+            setattr(target_class, name, classmethod(cls.wrap(name, method.__func__)))
+
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        """
+        Puts the original methods back.
+        """
+        for name, method in cls.original_methods.items():
+            setattr(cls.target_class, name, method)
+
+        cls.original_methods = {}
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls):
+        cls.stats = {}
+        cls.re_times.clear()
+
+    @classmethod
+    def wrap(cls, name, function):
+        """
+        :param name: The name of the method.
+        :param function: The function of the method.
+        :return: A function that times the calls to function.
+        """
+        def instrumented(target, *args, **kwargs):
+            starts_re_time = cls.depth == 0 and name in cls.RE_TIME_METHODS
+            if starts_re_time:
+                cls.max_depth = 0
+                cls.re_time_calls = 0
+
+            cls.depth += 1
+            cls.max_depth = max(cls.max_depth, cls.depth)
+            cls.re_time_calls += 1
+            start_time = timeit.default_timer()
+
+            try:
+                if starts_re_time and cls.profile_path:
+                    return cls.profile(function, target, *args, **kwargs)
+                return function(target, *args, **kwargs)
+            finally:
+                seconds = timeit.default_timer() - start_time
+                cls.depth -= 1
+                cls.record(name, seconds)
+
+                if starts_re_time:
+                    cls.re_times.append({"method": name, "seconds": seconds, "calls": cls.re_time_calls,
+                                         "max_depth": cls.max_depth})
+
+        return instrumented
+
+    @classmethod
+    def profile(cls, function, *args, **kwargs):
+        """
+        Runs the function through cProfile, and dumps the stats to the profile path.
+        """
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(function, *args, **kwargs)
+        finally:
+            profiler.dump_stats(cls.profile_path)
+
+    @classmethod
+    def record(cls, name, seconds):
+        method_stats = cls.stats.setdefault(name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        method_stats["calls"] += 1
+        method_stats["total_seconds"] += seconds
+        method_stats["max_seconds"] = max(method_stats["max_seconds"], seconds)
+
+    @classmethod
+    def get_summary(cls):
+        """
+        :return: A readable table of the stats of every method, and the last re-time.
+        """
+        lines = ["{0:<26} {1:>8} {2:>12} {3:>12}".format("method", "calls", "total ms", "max ms")]
+
+        # The slowest methods first.
+        for name, method_stats in sorted(cls.stats.items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append("{0:<26} {1:>8} {2:>12.2f} {3:>12.2f}".format(
+                name, method_stats["calls"], method_stats["total_seconds"] * 1000, method_stats["max_seconds"] * 1000))
+
+        if cls.re_times:
+            last_re_time = cls.re_times[-1]
+            lines.append("Last re-time: {0:.2f} ms, {1} calls, depth {2}".format(
+                last_re_time["seconds"] * 1000, last_re_time["calls"], last_re_time["max_depth"]))
+
+        return "\n".join(lines)
@@ -0,0 +1,192 @@
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+
+from Scripts.Retiming import TimingEngine
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+
+"""
+Using: Maya API 2.0, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Moves the keys of whole animation curves in one go, instead of one keyframe command per key.
+All edits are recorded in a shared MAnimCurveChange, which the retimer plugin command hands to the undo queue.
+"""
+
+# The tangent types that keeps their handles when a key moves, so the time part of the handle is stretched. Maya
+# recomputes the direction of the other types from the keys around them.
+SCALED_TANGENT_TYPES = [oma2.MFnAnimCurve.kTangentFixed]
+# The tangent types without a handle, so they have no weight to scale either.
+STEP_TANGENT_TYPES = [oma2.MFnAnimCurve.kTangentStep, oma2.MFnAnimCurve.kTangentStepNext]
+
+# MAnimCurveChange objects that has been applied but not yet handed to the undo queue.
+# The reTimerCommitChange command in retimer_plugin.py pops them.
+pending_changes = []
+
+
+def get_anim_curve_fn(curve_name):
+    """
+    :param curve_name: The name of an animCurve node.
+    :return: A MFnAnimCurve attached to the curve.
+    """
+    selection_list = om2.MSelectionList()
+    selection_list.add(curve_name)
+    return oma2.MFnAnimCurve(selection_list.getDependNode(0))
+
+
+def get_curve_key_times(curve_names):
+    """
+    Reads the key times of each curve through the API, without a command per key.
+    :param curve_names: List of animCurve node names.
+    :return: Dictionary of curve name to the list of its key times in the current time unit.
+    """
+    ui_unit = om2.MTime.uiUnit()
+    curve_key_times = {}
+
+    for curve_name in curve_names:
+        anim_curve_fn = get_anim_curve_fn(curve_name)
+        curve_key_times[curve_name] = [anim_curve_fn.input(index).asUnits(ui_unit)
+                                       for index in range(anim_curve_fn.numKeys)]
+
+    return curve_key_times
+
+
+def get_curve_key_values(curve_names):
+    """
+    Reads the key values of each curve through the API.
+    :param curve_names: List of animCurve node names.
+    :return: Dictionary of curve name to the list of its key values, in Maya's internal units.
+    """
+    curve_key_values = {}
+
+    for curve_name in curve_names:
+        anim_curve_fn = get_anim_curve_fn(curve_name)
+        curve_key_values[curve_name] = [anim_curve_fn.value(index) for index in range(anim_curve_fn.numKeys)]
+
+    return curve_key_values
+
+
+def move_keys(curve_name, old_times, new_times, change=None, scale_tangents=False):
+    """
+    Moves every key of a single curve to its new time, in a safe order.
+    :param curve_name: The name of the animCurve node.
+    :param old_times: Sorted list of the current key times of the curve.
+    :param new_times: List of the new key times, in the same order as old_times.
+    :param change: The MAnimCurveChange that records the edits for undo.
+    :param scale_tangents: When True the tangents are stretched with the segments between the keys.
+    :return: The number of keys moved.
+    """
+    move_order = TimingEngine.plan_move_order(old_times, new_times)
+
+    if not move_order:
+        return 0
+
+    ui_unit = om2.MTime.uiUnit()
+    anim_curve_fn = get_anim_curve_fn(curve_name)
+
+    for index in move_order:
+        anim_curve_fn.setTime(index, om2.MTime(new_times[index], ui_unit), change)
+
+    if scale_tangents:
+        scale_curve_tangents(anim_curve_fn, old_times, new_times, change)
+
+    return len(move_order)
+
+
+def scale_curve_tangents(anim_curve_fn, old_times, new_times, change=None):
+    """
+    Stretches the tangent handles of a curve by how much the segment they belong to was stretched, so the in-betweens
+    keep their timing. The in tangent of a key belongs to the segment before it, and the out tangent to the one after.
+    Fixed tangents gets the time part of their handle stretched. On a weighted curve the other tangents, except the
+    stepped ones, keeps the direction Maya gives them and gets their weight scaled by the stretch.
+    :param anim_curve_fn: The MFnAnimCurve of the curve, with the keys already moved.
+    :param old_times: Sorted list of the key times before the move.
+    :param new_times: List of the key times after the move, in the same order as old_times.
+    :param change: The MAnimCurveChange that records the edits for undo.
+    :return: The number of tangents scaled.
+    """
+    stretches = TimingEngine.get_segment_stretches(old_times, new_times)
+    is_weighted = anim_curve_fn.isWeighted
+    tangents_scaled = 0
+
+    for index in range(len(old_times)):
+        in_stretch = stretches[index - 1] if index > 0 else 1.0
+        out_stretch = stretches[index] if index < len(stretches) else 1.0
+
+        if in_stretch == 1.0 and out_stretch == 1.0:
+            continue
+
+        # Locked tangents must keep pointing the same way, so both sides gets the average stretch.
+        if anim_curve_fn.tangentsLocked(index):
+            in_stretch = out_stretch = (in_stretch + out_stretch) / 2.0
+
+        for is_in_tangent, stretch in [(True, in_stretch), (False, out_stretch)]:
+            if stretch == 1.0:
+                continue
+
+            if is_in_tangent:
+                tangent_type = anim_curve_fn.inTangentType(index)
+            else:
+                tangent_type = anim_curve_fn.outTangentType(index)
+
+            if tangent_type in SCALED_TANGENT_TYPES:
+                # Only the time part of the handle is stretched, which for weighted tangents scales the weight too.
+                x, y = anim_curve_fn.getTangentXY(index, is_in_tangent)
+                anim_curve_fn.setTangent(index, x * stretch, y, is_in_tangent, change)
+            elif is_weighted and tangent_type not in STEP_TANGENT_TYPES and not anim_curve_fn.weightsLocked(index):
+                # Setting the handle would make the tangent fixed, so only the weight is set and the type is kept.
+                angle, weight = anim_curve_fn.getTangentAngleWeight(index, is_in_tangent)
+                anim_curve_fn.setWeight(index, weight * stretch, is_in_tangent, change)
+            else:
+                continue
+            tangents_scaled += 1
+
+    return tangents_scaled
+
+
+def move_curve_key_array(curve_key_array, new_curve_key_array, change=None, scale_tangents=False):
+    """
+    Moves the keys of many curves, writing each curve that changed once and skipping the rest.
+    :param curve_key_array: The current key times of the curves, as a CurveKeyArray.
+    :param new_curve_key_array: The new key times of the same curves, as a CurveKeyArray.
+    :param change: The MAnimCurveChange shared by all of the curves.
+    :param scale_tangents: When True the tangents are stretched with the segments between the keys.
+    :return: The number of keys moved.
+    """
+    keys_moved = 0
+
+    for index in curve_key_array.get_changed_curves(new_curve_key_array):
+        keys_moved += move_keys(curve_key_array.curve_names[index], curve_key_array.get_curve_times(index),
+                                new_curve_key_array.get_curve_times(index), change, scale_tangents)
+
+    return keys_moved
+
+
+def move_plan_keys(plan, change=None, scale_tangents=False):
+    """
+    Moves the keys of a planned re-time, and patches the key time cache with the new times. If a curve fails, every
+    key moved is put back before the error is raised again.
+    :param plan: The RetimePlan.
+    :param change: The MAnimCurveChange shared by all of the curves.
+    :param scale_tangents: When True the tangents are stretched with the segments between the keys.
+    :return: The number of keys moved.
+    """
+    new_curve_key_array = plan.get_new_curve_key_array()
+
+    # The cache should not throw away the curves, because of the edits made here.
+    KeyTimeCache.ignore_changes = True
+    try:
+        keys_moved = move_curve_key_array(plan.get_curve_key_array(), new_curve_key_array, change, scale_tangents)
+    except Exception:
+        # A curve failed partway, like a locked one. The keys already moved are put back, as they would otherwise be
+        # left outside of the undo queue, and the curves are read again on the next re-time.
+        if change is not None:
+            change.undoIt()
+        for curve_name in plan.curves:
+            KeyTimeCache.invalidate_curve(curve_name)
+        raise
+    finally:
+        KeyTimeCache.ignore_changes = False
+
+    # Instead of reading the curves again on the next re-time, the cached key times are patched.
+    KeyTimeCache.patch(new_curve_key_array.to_curve_key_times())
+
+    return keys_moved
@@ -0,0 +1,232 @@
+import argparse
+import collections
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from Scripts.Retiming import BatchRetime, TimingEngine
+
+"""
+Using: Maya Commands, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Finds the keyframe problems a re-time would run into, before re-timing. Every curve is read once, then the checks
+run over the key times in one pass. Interactively it scans the selection, headless it scans whole folders of scenes
+with a mayapy process for each scene, like BatchRetime.
+
+The problems:
+    duplicate_keys: Keys closer than the time tolerance to the key before them.
+    sub_frame_keys: Keys between the whole frames.
+    outside_playback_range: Keys before or after the playback range.
+    locked: Curves on locked nodes, their keys can't be moved.
+    referenced: Curves from a referenced file, moving their keys adds reference edits.
+
+Example:
+    mayapy -m Scripts.Retiming.KeyScanner shots/ --processes 4 --report scan_report.json
+"""
+
+ISSUES = ["duplicate_keys", "sub_frame_keys", "outside_playback_range", "locked", "referenced"]
+# The issues found by looking at the key times, the others are read from the scene.
+KEY_ISSUES = ISSUES[:3]
+
+
+def check_key_times(times, playback_range=None, tolerance=TimingEngine.TIME_TOLERANCE):
+    """
+    :param times: Sorted list of the key times of a curve.
+    :param playback_range: The (start time, end time) of the playback range, None to skip that check.
+    :param tolerance: Key times closer than this are the same frame.
+    :return: List of the number of keys with each of the KEY_ISSUES.
+    """
+    duplicate_keys = sum(1 for index in range(1, len(times)) if times[index] - times[index - 1] <= tolerance)
+    sub_frame_keys = sum(1 for time in times if abs(time - math.floor(time + 0.5)) > tolerance)
+
+    outside_keys = 0
+    if playback_range:
+        outside_keys = sum(1 for time in times
+                           if time < playback_range[0] - tolerance or time > playback_range[1] + tolerance)
+
+    return [duplicate_keys, sub_frame_keys, outside_keys]
+
+
+def scan_curve_key_times(curve_key_times, playback_range=None, locked_curves=None, referenced_curves=None,
+                         tolerance=TimingEngine.TIME_TOLERANCE):
+    """
+    Checks already read key times, without touching the scene.
+    :param curve_key_times: Dictionary of curve name to the list of its key times.
+    :param playback_range: The (start time, end time) of the playback range, None to skip that check.
+    :param locked_curves: List of the curves on locked nodes.
+    :param referenced_curves: List of the referenced curves.
+    :param tolerance: Key times closer than this are the same frame.
+    :return: The report dictionary, with the curves, keys and seconds, and for every issue a dictionary of curve name
+    to the number of its keys with the issue.
+    """
+    start_time = time.time()
+
+    # The checks are plain Python, so threads would only take turns on the interpreter lock. The curves are checked
+    # one after the other, the parallel part is the headless scan with a process for each scene.
+    issues = collections.OrderedDict((issue, {}) for issue in ISSUES)
+    for curve_name, times in sorted(curve_key_times.items()):
+        for issue, count in zip(KEY_ISSUES, check_key_times(times, playback_range, tolerance)):
+            if count:
+                issues[issue][curve_name] = count
+
+    # Every key of a locked or referenced curve has the issue.
+    for issue, curves in [("locked", locked_curves), ("referenced", referenced_curves)]:
+        for curve_name in curves or []:
+            if curve_name in curve_key_times:
+                issues[issue][curve_name] = len(curve_key_times[curve_name])
+
+    return {
+        "curves": len(curve_key_times),
+        "keys": sum(len(times) for times in curve_key_times.values()),
+        "playback_range": list(playback_range) if playback_range else None,
+        "issues": issues,
+        "seconds": time.time() - start_time,
+    }
+
+
+def get_playback_range(cmds):
+    """
+    :param cmds: The maya.cmds module.
+    :return: The (start time, end time) of the playback range.
+    """
+    return cmds.playbackOptions(query=True, minTime=True), cmds.playbackOptions(query=True, maxTime=True)
+
+
+def get_curve_states(cmds, curves):
+    """
+    Finds the locked and referenced curves, with one query each for all the curves.
+    :param cmds: The maya.cmds module.
+    :param curves: List of animCurve node names.
+    :return: Tuple of the list of locked curves and the list of referenced curves.
+    """
+    if not curves:
+        return [], []
+
+    locked_states = cmds.lockNode(curves, query=True, lock=True) or []
+    locked_curves = [curve_name for curve_name, locked in zip(curves, locked_states) if locked]
+    referenced_curves = cmds.ls(curves, referencedNodes=True) or []
+    return locked_curves, referenced_curves
+
+
+def scan_scene_curves(cmds, curves=None):
+    """
+    Reads the curves of the open scene once, and checks them.
+    :param cmds: The maya.cmds module.
+    :param curves: List of animCurve node names, defaults to every time curve in the scene.
+    :return: The report dictionary of scan_curve_key_times.
+    """
+    if curves is None:
+        curves = BatchRetime.get_curves(cmds)
+
+    curve_key_times = BatchRetime.read_curve_key_times(cmds, curves)
+    locked_curves, referenced_curves = get_curve_states(cmds, curves)
+    return scan_curve_key_times(curve_key_times, get_playback_range(cmds), locked_curves, referenced_curves)
+
+
+def get_report_text(report):
+    """
+    :param report: A report dictionary of scan_curve_key_times.
+    :return: The report as readable text, with the first few curves of every issue.
+    """
+    lines = ["Scanned {0} curves, {1} keys in {2:.1f} ms.".format(report["curves"], report["keys"],
+                                                                  report["seconds"] * 1000)]
+    for issue, curve_counts in report["issues"].items():
+        if not curve_counts:
+            continue
+        curve_names = sorted(curve_counts)
+        shown = ", ".join(curve_names[:5]) + (", ..." if len(curve_names) > 5 else "")
+        lines.append("{0}: {1} curves, {2} keys ({3})".format(issue, len(curve_counts), sum(curve_counts.values()),
+                                                              shown))
+    if len(lines) == 1:
+        lines.append("No problems found.")
+    return "\n".join(lines)
+
+
+def scan_scene(scene_path, cmds=None):
+    """
+    Opens a scene and scans every time curve in it.
+    :param scene_path: The scene file to scan.
+    :param cmds: The maya.cmds module, or a stand-in for it.
+    :return: The report dictionary, with the file and the error if it failed.
+    """
+    if cmds is None:
+        import maya.cmds as cmds
+
+    try:
+        cmds.file(scene_path, open=True, force=True)
+        report = scan_scene_curves(cmds)
+        report["error"] = None
+    except Exception as error:
+        report = {"error": "{0}: {1}".format(type(error).__name__, error)}
+    report["file"] = scene_path
+    return report
+
+
+def find_scenes(paths):
+    """
+    :param paths: List of scene files, folders or glob patterns. Folders are searched with their sub folders.
+    :return: Sorted list of the scene files.
+    """
+    scenes = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, file_names in os.walk(path):
+                scenes.update(os.path.join(folder, file_name) for file_name in file_names)
+        else:
+            scenes.update(BatchRetime.expand_files([path], os.getcwd()))
+    return sorted(path for path in scenes if os.path.splitext(path)[1].lower() in BatchRetime.SCENE_FILE_TYPES)
+
+
+def run_scan(scenes, processes=None, cmds=None):
+    """
+    Scans every scene.
+    :param scenes: List of scene files.
+    :param processes: The number of worker processes, defaults to the number of CPUs.
+    :param cmds: A stand-in for maya.cmds. When given the scenes are scanned in this process with it.
+    :return: List of report dictionaries, one for each scene.
+    """
+    if cmds is not None:
+        return [scan_scene(scene_path, cmds) for scene_path in scenes]
+
+    # Making the workers start mayapy and not a plain python.
+    multiprocessing.set_executable(sys.executable)
+
+    pool = multiprocessing.Pool(processes, initializer=BatchRetime.initialize_standalone)
+    try:
+        return pool.map(scan_scene, scenes, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find keyframe problems in Maya scene files before re-timing.")
+    parser.add_argument("paths", nargs="+", help="Scene files, folders or glob patterns.")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--report", default="scan_report.json", help="Where to write the json report.")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    reports = run_scan(find_scenes(args.paths), args.processes)
+
+    summary = {
+        "files": len(reports),
+        "failed": len([report for report in reports if report["error"]]),
+        "with_issues": len([report for report in reports
+                            if not report["error"] and any(report["issues"].values())]),
+        "seconds": time.time() - start_time,
+    }
+
+    with open(args.report, "w") as report_file:
+        json.dump({"summary": summary, "files": reports}, report_file, indent=4)
+
+    print("Scanned {files} files, {with_issues} with problems, {failed} failed in {seconds:.2f} seconds".format(
+        **summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import maya.api.OpenMaya as om2
+
+"""
+Using: Maya API 2.0, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Caches the key times of the selected animation curves between re-times. Clicking the same re-time button several times
+in a row will then only read the curves once. Scene callbacks throws away what is no longer valid, and the re-timer
+patches the cached times after its own edits instead of reading them again.
+"""
+
+
+class KeyTimeCache(object):
+
+    # Dictionary of curve name to the sorted list of its key times.
+    curve_key_times = {}
+    # The animation curves of the current selection, None when it has to be queried again.
+    selected_curves = None
+
+    # Counters to see how well the cache is doing.
+    hits = 0
+    misses = 0
+
+    # Increased every time anything is invalidated, so a caller can tell if the cache changed since it last looked.
+    generation = 0
+
+    # While True the callbacks ignores changes, used while the re-timer makes its own edits.
+    ignore_changes = False
+
+    # The ids of the scene wide callbacks, and of the attribute changed callback of each cached curve.
+    callback_ids = []
+    curve_callback_ids = {}
+    # Dictionary of curve name to the MObjectHandle of the cached curve node. A curve deleted and created again under
+    # the same name, like after a cutKey and setKeyframe or a reference reload, is a new node with its own handle.
+    curve_handles = {}
+
+    # The scene events that makes the whole cache invalid.
+    INVALIDATE_EVENTS = ["Undo", "Redo", "SceneOpened", "NewSceneOpened"]
+
+    @classmethod
+    def install_callbacks(cls):
+        """
+        Adds the scene callbacks that invalidates the cache. Does nothing if they are already added.
+        """
+        if cls.callback_ids:
+            return
+
+        for event in cls.INVALIDATE_EVENTS:
+            cls.callback_ids.append(om2.MEventMessage.addEventCallback(event, cls.on_scene_changed))
+
+        cls.callback_ids.append(om2.MEventMessage.addEventCallback("SelectionChanged", cls.on_selection_changed))
+        # A new connection may be a new animation curve on a selected object.
+        cls.callback_ids.append(om2.MDGMessage.addConnectionCallback(cls.on_connection_changed))
+
+    @classmethod
+    def remove_callbacks(cls):
+        """
+        Removes every callback and clears the cache.
+        """
+        cls.invalidate_all()
+
+        if cls.callback_ids:
+            om2.MMessage.removeCallbacks(cls.callback_ids)
+            cls.callback_ids = []
+
+    @classmethod
+    def get_anim_curves(cls, query_anim_curves):
+        """
+        :param query_anim_curves: Function returning the animation curves of the selection, called on a cache miss.
+        :return: The animation curves of the selected objects.
+        """
+        cls.install_callbacks()
+
+        if cls.selected_curves is None:
+            cls.misses += 1
+            cls.selected_curves = list(query_anim_curves())
+        else:
+            cls.hits += 1
+
+        return cls.selected_curves
+
+    @classmethod
+    def get_curve_key_times(cls, curve_names, read_curve_key_times):
+        """
+        :param curve_names: List of animCurve node names.
+        :param read_curve_key_times: Function reading the key times of a list of curves, called with the curves that
+        are not cached.
+        :return: Dictionary of curve name to the sorted list of its key times.
+        """
+        cls.install_callbacks()
+
+        # The entries of curves whose node has been deleted since they were cached are thrown away, even if a new
+        # curve now has the name.
+        for curve_name in curve_names:
+            curve_handle = cls.curve_handles.get(curve_name)
+            if curve_handle is not None and not curve_handle.isValid():
+                cls.invalidate_curve(curve_name)
+
+        missing_curves = [curve_name for curve_name in curve_names if curve_name not in cls.curve_key_times]
+        cls.hits += len(curve_names) - len(missing_curves)
+        cls.misses += len(missing_curves)
+
+        # Reading every missing curve in one batch.
+        if missing_curves:
+            for curve_name, key_times in read_curve_key_times(missing_curves).items():
+                cls.curve_key_times[curve_name] = key_times
+                cls.add_curve_callback(curve_name)
+
+        return dict((curve_name, cls.curve_key_times[curve_name]) for curve_name in curve_names)
+
+    @classmethod
+    def patch(cls, new_curve_key_times):
+        """
+        Updates the cached key times in place, after the re-timer moved the keys.
+        :param new_curve_key_times: Dictionary of curve name to the list of its new key times.
+        """
+        for curve_name, new_key_times in new_curve_key_times.items():
+            key_times = cls.curve_key_times.get(curve_name)
+            if key_times is not None:
+                # The re-time keeps the order of the keys, so the list stays sorted.
+                key_times[:] = new_key_times
+
+    @classmethod
+    def add_curve_callback(cls, curve_name):
+        """
+        Watches a cached curve, so it is invalidated when its keys are changed outside of the re-timer, or its node is
+        deleted.
+        :param curve_name: The name of the animCurve node.
+        """
+        selection_list = om2.MSelectionList()
+        selection_list.add(curve_name)
+        curve_object = selection_list.getDependNode(0)
+        cls.curve_handles[curve_name] = om2.MObjectHandle(curve_object)
+        cls.curve_callback_ids[curve_name] = om2.MNodeMessage.addAttributeChangedCallback(
+            curve_object, cls.on_curve_changed, curve_name)
+
+    @classmethod
+    def invalidate_curve(cls, curve_name):
+        """
+        Removes a single curve from the cache.
+        :param curve_name: The name of the animCurve node.
+        """
+        cls.curve_key_times.pop(curve_name, None)
+        cls.curve_handles.pop(curve_name, None)
+        callback_id = cls.curve_callback_ids.pop(curve_name, None)
+        if callback_id is not None:
+            om2.MMessage.removeCallback(callback_id)
+        cls.generation += 1
+
+    @classmethod
+    def invalidate_all(cls):
+        """
+        Removes everything from the cache.
+        """
+        cls.curve_key_times.clear()
+        cls.curve_handles.clear()
+        cls.selected_curves = None
+        if cls.curve_callback_ids:
+            om2.MMessage.removeCallbacks(list(cls.curve_callback_ids.values()))
+            cls.curve_callback_ids.clear()
+        cls.generation += 1
+
+    @classmethod
+    def on_scene_changed(cls, *args):
+        if not cls.ignore_changes:
+            cls.invalidate_all()
+
+    @classmethod
+    def on_selection_changed(cls, *args):
+        # The cached key times are still valid, only the list of selected curves has to be queried again.
+        if not cls.ignore_changes:
+            cls.selected_curves = None
+            cls.generation += 1
+
+    @classmethod
+    def on_connection_changed(cls, *args):
+        if not cls.ignore_changes and cls.selected_curves is not None:
+            cls.selected_curves = None
+            cls.generation += 1
+
+    @classmethod
+    def on_curve_changed(cls, message, plug, other_plug, curve_name):
+        if not cls.ignore_changes:
+            cls.invalidate_curve(curve_name)
+
+    @classmethod
+    def get_stats(cls):
+        """
+        :return: Dictionary with the hits, misses, hit rate and number of cached curves.
+        """
+        lookups = cls.hits + cls.misses
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "hit_rate": float(cls.hits) / lookups if lookups else 0.0,
+            "cached_curves": len(cls.curve_key_times),
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        cls.hits = 0
+        cls.misses = 0
@@ -0,0 +1,170 @@
+import binascii
+import bisect
+from array import array
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+An index of the keyframe times of many animation curves, answering the same first, last, next and previous questions as
+cmds.findKeyframe, with a bisect in memory instead of a command each. Every curve has a bitset of which of the key times
+it has a key on, so the questions can also be asked for only some of the curves.
+Asked about all the curves, a question is a bisect, O(log n). Asked about some of the curves, it shifts and masks the
+bits of every key time, O(n / word size), which is still far less than a command.
+"""
+
+
+def bytes_to_int(bit_bytes):
+    """
+    :param bit_bytes: bytearray of bits, the lowest bit of the first byte first.
+    :return: The bits as an int.
+    """
+    if hasattr(int, "from_bytes"):
+        return int.from_bytes(bytes(bit_bytes), "little")
+    # Python 2 has no int.from_bytes, the hex of the reversed bytes is parsed instead.
+    return int(binascii.hexlify(bytes(bit_bytes[::-1])) or "0", 16)
+
+
+class KeyframeIndex(object):
+
+    def __init__(self, key_times, curve_bits=None):
+        """
+        :param key_times: Sorted list of unique key times.
+        :param curve_bits: Optional dictionary of curve name to an int, with bit i set when the curve has a key on
+        key_times[i].
+        """
+        self.key_times = array("d", key_times)
+        self.curve_bits = curve_bits or {}
+        # The curves of the last mask and the mask, so asking about the same curves again doesn't build it again.
+        self.mask_curve_names = None
+        self.mask = 0
+
+    @classmethod
+    def from_curve_key_times(cls, curve_key_times):
+        """
+        :param curve_key_times: Dictionary of curve name to the sorted list of its key times.
+        :return: The KeyframeIndex of the curves.
+        """
+        key_times = set()
+        for times in curve_key_times.values():
+            key_times.update(times)
+        key_times = sorted(key_times)
+
+        # The position of every key time, so each curve's bits are set without searching.
+        positions = dict((key_time, position) for position, key_time in enumerate(key_times))
+        byte_count = (len(key_times) + 7) // 8
+        curve_bits = {}
+        for curve_name, times in curve_key_times.items():
+            # The bits are set in a bytearray and turned into an int once, setting them on the int would copy all of
+            # it for every key.
+            bit_bytes = bytearray(byte_count)
+            for key_time in times:
+                position = positions[key_time]
+                bit_bytes[position >> 3] |= 1 << (position & 7)
+            curve_bits[curve_name] = bytes_to_int(bit_bytes)
+
+        return cls(key_times, curve_bits)
+
+    def __len__(self):
+        return len(self.key_times)
+
+    def get_mask(self, curve_names):
+        """
+        :param curve_names: The curves to include.
+        :return: An int with a bit set for every key time of the curves.
+        """
+        curve_names = tuple(curve_names)
+        # The same curves are usually asked about again and again, like the selection during a re-time.
+        if curve_names != self.mask_curve_names:
+            mask = 0
+            for curve_name in curve_names:
+                mask |= self.curve_bits.get(curve_name, 0)
+            self.mask_curve_names = curve_names
+            self.mask = mask
+        return self.mask
+
+    def has_key(self, time, curve_names=None):
+        """
+        :return: True when there is a keyframe on the time.
+        """
+        position = bisect.bisect_left(self.key_times, time)
+        if position == len(self.key_times) or self.key_times[position] != time:
+            return False
+        if curve_names is None:
+            return True
+        return bool(self.get_mask(curve_names) >> position & 1)
+
+    def first(self, curve_names=None):
+        if curve_names is None:
+            return self.key_times[0] if self.key_times else None
+
+        mask = self.get_mask(curve_names)
+        if not mask:
+            return None
+        # The lowest set bit.
+        return self.key_times[(mask & -mask).bit_length() - 1]
+
+    def last(self, curve_names=None):
+        if curve_names is None:
+            return self.key_times[-1] if self.key_times else None
+
+        mask = self.get_mask(curve_names)
+        if not mask:
+            return None
+        # The highest set bit.
+        return self.key_times[mask.bit_length() - 1]
+
+    def next(self, time, curve_names=None):
+        """
+        :return: The first keyframe after the time, wrapping around to the first keyframe like cmds.findKeyframe.
+        """
+        position = bisect.bisect_right(self.key_times, time)
+
+        # Every key time is a keyframe of some curve, so without curves the bisect is the answer.
+        if curve_names is None:
+            if position == len(self.key_times):
+                return self.first()
+            return self.key_times[position]
+
+        later_mask = self.get_mask(curve_names) >> position
+        if not later_mask:
+            return self.first(curve_names)
+        # The lowest set bit of the keys after the time.
+        return self.key_times[position + (later_mask & -later_mask).bit_length() - 1]
+
+    def previous(self, time, curve_names=None):
+        """
+        :return: The last keyframe before the time, wrapping around to the last keyframe like cmds.findKeyframe.
+        """
+        position = bisect.bisect_left(self.key_times, time)
+
+        if curve_names is None:
+            if position == 0:
+                return self.last()
+            return self.key_times[position - 1]
+
+        mask = self.get_mask(curve_names)
+        # Taking away the bits from the position and up leaves the keys before the time, without building a mask of
+        # the bits below the position.
+        earlier_mask = mask - (mask >> position << position)
+        if not earlier_mask:
+            return self.last(curve_names)
+        # The highest set bit of the keys before the time.
+        return self.key_times[earlier_mask.bit_length() - 1]
+
+    def find(self, which, time=None, curve_names=None):
+        """
+        Answers the same as cmds.findKeyframe(which=which, time=(time, time)).
+        :param which: first, last, next or previous.
+        :param time: The time to search from, for next and previous.
+        :param curve_names: The curves to search, all of them when None.
+        :return: The key time, None when there are no keys.
+        """
+        if which == "first":
+            return self.first(curve_names)
+        if which == "last":
+            return self.last(curve_names)
+        if which == "next":
+            return self.next(time, curve_names)
+        if which == "previous":
+            return self.previous(time, curve_names)
+        raise ValueError("Unknown keyframe: {0}".format(which))
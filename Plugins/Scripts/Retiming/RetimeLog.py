@@ -0,0 +1,106 @@
+import json
+
+from Scripts.Retiming import TimingEngine
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+A log of the re-times that were applied, so the same clicks can be saved and replayed on other selections and shots.
+Every operation is the mode, value, range and snap grid of a re-time, and the curves it was applied to. A replay
+composes all of the operations into one mapping of the key times, so the keys are written once instead of once for
+every operation.
+
+Example:
+    ReTimerHelperMethods.operation_log.save("C:/temp/walk_retime.json")
+    ... open another shot and select the character ...
+    ReTimerHelperMethods.replay_log(RetimeLog.load("C:/temp/walk_retime.json"))
+"""
+
+
+class RetimeLog(object):
+
+    VERSION = 1
+    MODES = ["absolute", "incremental"]
+
+    def __init__(self, operations=None):
+        """
+        :param operations: List of operation dictionaries, with mode, value, range, snap and curves.
+        """
+        self.operations = operations or []
+
+    def __len__(self):
+        return len(self.operations)
+
+    def record(self, plan):
+        """
+        Adds the re-time of a plan to the log. Plans that are not a single re-time, like a composed preview, are not
+        recorded.
+        :param plan: The applied RetimePlan.
+        """
+        if plan.re_time_value is None or plan.is_empty():
+            return
+
+        self.operations.append({"mode": "incremental" if plan.incremental else "absolute", "value": plan.re_time_value,
+                                "range": list(plan.time_range), "snap": plan.snap_grid, "curves": plan.curves})
+
+    def clear(self):
+        self.operations = []
+
+    def get_curves(self):
+        """
+        :return: Sorted list of every curve an operation was applied to.
+        """
+        curves = set()
+        for operation in self.operations:
+            curves.update(operation["curves"])
+        return sorted(curves)
+
+    def get_plan(self, curve_key_times, tolerance=TimingEngine.TIME_TOLERANCE):
+        """
+        Composes the operations into one re-time of the given curves, in the order they were recorded.
+        Each operation is planned on the key times the operations before it left, like clicking the buttons again, but
+        only the unique key times are re-timed in between, the keys of the curves are mapped once at the end.
+        :param curve_key_times: Dictionary of curve name to the list of its current key times.
+        :param tolerance: Key times closer than this are the same frame.
+        :return: The RetimePlan from the current key times to the key times after the last operation.
+        """
+        key_times = set()
+        for times in curve_key_times.values():
+            key_times.update(times)
+        key_times = TimingEngine.merge_close_times(key_times, tolerance)
+
+        if not self.operations:
+            return RetimePlan(curve_key_times, key_times, list(key_times), tolerance=tolerance)
+
+        new_key_times = list(key_times)
+        for operation in self.operations:
+            new_key_times = RetimePlan.from_key_times({}, new_key_times, operation["range"], operation["value"],
+                                                      operation["mode"] == "incremental", operation["snap"],
+                                                      tolerance).new_key_times
+
+        # No key before the earliest range has moved, so from there on the keys between the anchors can be snapped.
+        first_range_start = min(operation["range"][0] for operation in self.operations)
+        return RetimePlan(curve_key_times, key_times, new_key_times,
+                          (first_range_start, self.operations[-1]["range"][1]), self.operations[-1]["snap"], tolerance)
+
+    def save(self, path):
+        with open(path, "w") as log_file:
+            json.dump({"version": self.VERSION, "operations": self.operations}, log_file, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: A json file written by save.
+        :return: The RetimeLog.
+        """
+        with open(path) as log_file:
+            data = json.load(log_file)
+        if data.get("version", 0) > cls.VERSION:
+            raise ValueError("The log is version {0}, only up to {1} can be read: {2}".format(
+                data["version"], cls.VERSION, path))
+
+        for operation in data["operations"]:
+            if operation.get("mode") not in cls.MODES or len(operation.get("range", [])) != 2:
+                raise ValueError("Invalid operation in the log: {0}".format(operation))
+        return cls(data["operations"])
@@ -0,0 +1,144 @@
+from Scripts.Retiming import TimingEngine
+from Scripts.Retiming.CurveKeyArray import CurveKeyArray
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The result of planning a re-time, before anything is changed in the scene.
+"""
+
+
+class RetimePlan(object):
+
+    def __init__(self, curve_key_times, key_times, new_key_times, time_range=None, snap_grid=None,
+                 tolerance=TimingEngine.TIME_TOLERANCE):
+        """
+        :param curve_key_times: Dictionary of curve name to the list of its current key times.
+        :param key_times: Sorted list of the unique key times of all the curves.
+        :param new_key_times: List of the new key times, in the same order as key_times.
+        :param time_range: The (start time, end time) that was re-timed.
+        :param snap_grid: When given, the re-timed keys of every curve are snapped to a grid with this step in frames.
+        :param tolerance: Key times closer than this are the same frame.
+        """
+        self.curve_key_times = curve_key_times
+        self.key_times = key_times
+        self.new_key_times = new_key_times
+        self.time_range = time_range
+        self.snap_grid = snap_grid
+        self.tolerance = tolerance
+        # The value and mode of the re-time, None when the plan is not a single re-time, like a composed one.
+        self.re_time_value = None
+        self.incremental = None
+        self.curve_key_array = None
+        self.new_curve_key_array = None
+
+    @classmethod
+    def from_curve_key_times(cls, curve_key_times, time_range, re_time_value, incremental, snap_grid=None,
+                             tolerance=TimingEngine.TIME_TOLERANCE):
+        """
+        Plans a re-time of the given curves.
+        :param curve_key_times: Dictionary of curve name to the list of its current key times.
+        :param time_range: The (start time, end time) range to re-time.
+        :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
+        :param incremental: If False, the re_time_value is the exact number of frames between keyframes in the range.
+        When True the re_time_value is added to the frames between the keyframes in the range.
+        :param snap_grid: When given, the re-timed keys are snapped to a grid with this step in frames, 1.0 for whole
+        frames. Keys that would snap onto the same frame are pushed apart.
+        :param tolerance: Key times closer than this are the same frame.
+        :return: The RetimePlan.
+        """
+        # All the keyframe times of the curves, keys on the same frame across curves count once. So does keys that
+        # are only apart by float noise, their curves are mapped between the anchors.
+        key_times = set()
+        for times in curve_key_times.values():
+            key_times.update(times)
+        key_times = TimingEngine.merge_close_times(key_times, tolerance)
+
+        return cls.from_key_times(curve_key_times, key_times, time_range, re_time_value, incremental, snap_grid,
+                                  tolerance)
+
+    @classmethod
+    def from_key_times(cls, curve_key_times, key_times, time_range, re_time_value, incremental, snap_grid=None,
+                       tolerance=TimingEngine.TIME_TOLERANCE):
+        """
+        Plans a re-time of the given curves, with the given anchor times instead of the key times of the curves.
+        :param key_times: Sorted list of unique anchor times, the keys of the curves are mapped between them.
+        The other parameters are the same as for from_curve_key_times.
+        :return: The RetimePlan.
+        """
+        # Keyframes can't be on top of each other, like BatchRetime.validate_spec checks for a spec.
+        if not incremental and re_time_value < 1:
+            raise ValueError("An absolute value must be at least 1 frame, got {0}".format(re_time_value))
+
+        # The timing engine calculates every new keyframe time in a single pass over the key times.
+        new_key_times = TimingEngine.compute_new_key_times(key_times, time_range[0], time_range[1], re_time_value,
+                                                           incremental, tolerance)
+
+        plan = cls(curve_key_times, list(key_times), new_key_times, tuple(time_range), snap_grid, tolerance)
+        plan.re_time_value = re_time_value
+        plan.incremental = incremental
+        if snap_grid and key_times:
+            plan.new_key_times = TimingEngine.snap_key_times(key_times, new_key_times, plan.get_anchor_time(),
+                                                             snap_grid, tolerance)
+        return plan
+
+    @property
+    def curves(self):
+        return sorted(self.curve_key_times.keys())
+
+    @property
+    def time_mapping(self):
+        """
+        :return: Dictionary of old key time to new key time.
+        """
+        return dict(zip(self.key_times, self.new_key_times))
+
+    def get_anchor_time(self):
+        """
+        :return: The time of the anchor keyframe of the re-time, the last keyframe that keeps its time.
+        """
+        return self.key_times[TimingEngine.get_anchor_index(self.key_times, self.time_range[0], self.tolerance)]
+
+    def get_curve_key_array(self):
+        """
+        :return: The current key times of every curve, as a CurveKeyArray.
+        """
+        if self.curve_key_array is None:
+            self.curve_key_array = CurveKeyArray.from_curve_key_times(self.curve_key_times)
+        return self.curve_key_array
+
+    def get_new_curve_key_array(self, on_progress=None, is_cancelled=None):
+        """
+        Maps the key times of every curve in one call. Each curve only moves its own keys, the unique key times of
+        all the curves are only used as anchors for the mapping. The result is kept, so a plan computed on a worker
+        thread is not mapped again when it is applied.
+        :param on_progress: Optional function called with the fraction of the keys mapped so far.
+        :param is_cancelled: Optional function returning True when the mapping should stop.
+        :return: The new key times of every curve, as a CurveKeyArray. None if cancelled.
+        """
+        if self.new_curve_key_array is None:
+            new_curve_key_array = self.get_curve_key_array().map_times(self.key_times, self.new_key_times, on_progress,
+                                                                       is_cancelled)
+            # The keys between the anchors, like the ones merged by the tolerance, are snapped after they are mapped.
+            if new_curve_key_array is not None and self.snap_grid and self.key_times:
+                new_curve_key_array = self.get_curve_key_array().snap_times(new_curve_key_array, self.get_anchor_time(),
+                                                                            self.snap_grid, self.tolerance)
+            self.new_curve_key_array = new_curve_key_array
+        return self.new_curve_key_array
+
+    def get_new_curve_key_times(self):
+        """
+        :return: Dictionary of curve name to the list of its new key times.
+        """
+        return self.get_new_curve_key_array().to_curve_key_times()
+
+    def get_keys_to_move(self):
+        """
+        :return: The number of keys, across all the curves, that will change time.
+        """
+        old_times = self.get_curve_key_array().times
+        new_times = self.get_new_curve_key_array().times
+        return sum(1 for old_time, new_time in zip(old_times, new_times) if old_time != new_time)
+
+    def is_empty(self):
+        return not self.key_times
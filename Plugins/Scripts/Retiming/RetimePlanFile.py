@@ -0,0 +1,177 @@
+import ast
+import json
+import os
+import struct
+from array import array
+
+from Scripts.Retiming.CurveKeyArray import CurveKeyArray
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Writes a re-time plan to disk and reads it back, so plans can be computed outside Maya, applied later, or compared
+between versions of an animation. A plan file is a folder with a NumPy .npy file for every column, and the curve names,
+the range and the snap grid in curves.json. The .npy files are written and read with the array module, so Maya doesn't
+need NumPy, while NumPy can memory map them with numpy.load(path, mmap_mode="r").
+
+The columns:
+    times: The key times of every curve after each other, sorted by curve name.
+    values: The key values, in the same order as times. In Maya's internal units, so rotations are in radians.
+    new_times: The re-timed key times, in the same order as times.
+    offsets: Where each curve starts in the key columns, with the number of keys as the last entry.
+    anchor_times, new_anchor_times: The old to new time mapping of the re-time, used to re-time other keys.
+"""
+
+NPY_MAGIC = b"\x93NUMPY"
+# The NumPy type of each array typecode written. Little endian, like NumPy writes on most machines.
+NPY_DTYPES = {"d": "<f8", "i": "<i4"}
+CURVES_FILE_NAME = "curves.json"
+
+
+def write_npy(path, values):
+    """
+    Writes an array to a version 1.0 .npy file.
+    :param path: The .npy file to write.
+    :param values: array of doubles or ints.
+    """
+    header = "{{'descr': '{0}', 'fortran_order': False, 'shape': ({1},), }}".format(NPY_DTYPES[values.typecode],
+                                                                                   len(values))
+    # The magic, version and header length takes 10 bytes, and the data must start on a multiple of 64 bytes.
+    header += " " * (-(len(header) + 11) % 64) + "\n"
+
+    if struct.pack("=I", 1) != struct.pack("<I", 1):
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    with open(path, "wb") as npy_file:
+        npy_file.write(NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+        values.tofile(npy_file)
+
+
+def read_npy(path):
+    """
+    Reads a one dimensional .npy file of doubles or ints, straight into an array without a Python object per value.
+    :param path: The .npy file to read.
+    :return: The array.
+    """
+    with open(path, "rb") as npy_file:
+        if npy_file.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError("Not a .npy file: {0}".format(path))
+
+        major_version = bytearray(npy_file.read(2))[0]
+        # Version 1.0 has a two byte header length, the later versions four bytes.
+        if major_version == 1:
+            header_length = struct.unpack("<H", npy_file.read(2))[0]
+        else:
+            header_length = struct.unpack("<I", npy_file.read(4))[0]
+        header = ast.literal_eval(npy_file.read(header_length).decode("latin1"))
+
+        typecodes = dict((dtype, typecode) for typecode, dtype in NPY_DTYPES.items())
+        if header["descr"] not in typecodes or header["fortran_order"] or len(header["shape"]) != 1:
+            raise ValueError("Only one dimensional arrays of {0} can be read: {1}".format(
+                ", ".join(sorted(typecodes)), path))
+
+        values = array(typecodes[header["descr"]])
+        values.fromfile(npy_file, header["shape"][0])
+
+    if struct.pack("=I", 1) != struct.pack("<I", 1):
+        values.byteswap()
+    return values
+
+
+class RetimePlanFile(object):
+
+    VERSION = 1
+    COLUMNS = ["times", "values", "new_times", "offsets", "anchor_times", "new_anchor_times"]
+
+    def __init__(self, curve_names, offsets, times, values, new_times, anchor_times, new_anchor_times,
+                 time_range=None, snap_grid=None):
+        """
+        The parameters are the columns described at the top, as arrays, and the list of curve names.
+        :param time_range: The (start time, end time) that was re-timed.
+        :param snap_grid: The grid the re-timed keys were snapped to, None when they weren't.
+        """
+        self.curve_names = curve_names
+        self.offsets = offsets
+        self.times = times
+        self.values = values
+        self.new_times = new_times
+        self.anchor_times = anchor_times
+        self.new_anchor_times = new_anchor_times
+        self.time_range = time_range
+        self.snap_grid = snap_grid
+
+    @classmethod
+    def from_plan(cls, plan, curve_key_values):
+        """
+        :param plan: The RetimePlan.
+        :param curve_key_values: Dictionary of curve name to the list of its key values, for every curve of the plan.
+        :return: The RetimePlanFile of the plan.
+        """
+        curve_key_array = plan.get_curve_key_array()
+
+        values = array("d")
+        for curve_name in curve_key_array.curve_names:
+            values.extend(curve_key_values[curve_name])
+        if len(values) != curve_key_array.get_key_count():
+            raise ValueError("The key values does not match the keys of the plan.")
+
+        return cls(list(curve_key_array.curve_names), array("i", curve_key_array.offsets), curve_key_array.times,
+                   values, plan.get_new_curve_key_array().times, array("d", plan.key_times),
+                   array("d", plan.new_key_times), plan.time_range, plan.snap_grid)
+
+    def get_key_count(self):
+        return len(self.times)
+
+    def get_curve_key_array(self):
+        return CurveKeyArray(self.curve_names, self.times, self.offsets)
+
+    def get_new_curve_key_array(self):
+        return CurveKeyArray(self.curve_names, self.new_times, self.offsets)
+
+    def to_plan(self, curve_key_times):
+        """
+        Re-times the given keys with the mapping of the file. Keys at the same times as when the file was written gets
+        the new times of the file, other keys are interpolated between them, and snapped like when the file was written.
+        :param curve_key_times: Dictionary of curve name to the list of its current key times.
+        :return: The RetimePlan.
+        """
+        return RetimePlan(curve_key_times, self.anchor_times, self.new_anchor_times, self.time_range, self.snap_grid)
+
+    def write(self, path):
+        """
+        :param path: The folder to write the plan to, it is created if it doesn't exist.
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        for column in self.COLUMNS:
+            write_npy(os.path.join(path, column + ".npy"), getattr(self, column))
+
+        with open(os.path.join(path, CURVES_FILE_NAME), "w") as curves_file:
+            json.dump({"version": self.VERSION, "curve_names": self.curve_names,
+                       "time_range": list(self.time_range) if self.time_range else None,
+                       "snap_grid": self.snap_grid}, curves_file, indent=4)
+
+    @classmethod
+    def read(cls, path):
+        """
+        :param path: The folder of a plan written by write.
+        :return: The RetimePlanFile.
+        """
+        with open(os.path.join(path, CURVES_FILE_NAME)) as curves_file:
+            curves = json.load(curves_file)
+        if curves["version"] > cls.VERSION:
+            raise ValueError("The plan file is version {0}, only up to {1} can be read: {2}".format(
+                curves["version"], cls.VERSION, path))
+
+        columns = dict((column, read_npy(os.path.join(path, column + ".npy"))) for column in cls.COLUMNS)
+        if not (len(columns["offsets"]) == len(curves["curve_names"]) + 1 and
+                len(columns["times"]) == len(columns["values"]) == len(columns["new_times"]) ==
+                columns["offsets"][-1] and len(columns["anchor_times"]) == len(columns["new_anchor_times"])):
+            raise ValueError("The columns of the plan file does not match: {0}".format(path))
+
+        time_range = tuple(curves["time_range"]) if curves["time_range"] else None
+        # Files written before the snap grid was saved have no snap_grid, their keys weren't snapped on import either.
+        return cls(curves["curve_names"], time_range=time_range, snap_grid=curves.get("snap_grid"), **columns)
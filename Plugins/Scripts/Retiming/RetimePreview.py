@@ -0,0 +1,200 @@
+import maya.cmds as cmds
+
+from Scripts.Retiming import KeyMover, TimingEngine
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: maya.cmds, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Previews re-times without moving any keys. A time warp curve (animCurveTT) is connected to the input of every
+previewed curve, mapping the previewed time back to the time of the original keys, so the viewport plays the new timing
+right away.
+Every click only rewrites the few keys of the warp, and the re-times of all the clicks are composed into one plan, that
+is written to the curves in a single batch when the preview is applied.
+The keys in the time slider and graph editor stay on their old frames while previewing.
+"""
+
+
+class RetimePreview(object):
+
+    WARP_NODE_NAME = "reTimerPreviewWarp"
+
+    # The time warp curve, None when there is no preview.
+    warp_node = None
+    # The previewed animCurve nodes, and the plug each curve's input was connected to before the preview.
+    curves = []
+    source_plugs = {}
+
+    # The key times of the curves when the preview started, and their unique key times.
+    curve_key_times = {}
+    key_times = []
+    # Where the unique key times are in the preview, in the same order as key_times.
+    preview_key_times = []
+    # The range of the last click, and the earliest start of the ranges of all the clicks.
+    time_range = None
+    first_range_start = None
+    # The snap grid of the last click.
+    snap_grid = None
+    # The plan of every click, in the order they were clicked.
+    click_plans = []
+
+    @classmethod
+    def is_active(cls):
+        """
+        :return: True while there is a preview, and its warp node still exists.
+        """
+        if cls.warp_node and not cmds.objExists(cls.warp_node):
+            # The node is gone with a new scene, there is nothing left to clean up.
+            cls.reset()
+        return cls.warp_node is not None
+
+    @classmethod
+    def start(cls, curve_key_times):
+        """
+        Starts a preview on the given curves, nothing is re-timed until re_time is called.
+        :param curve_key_times: Dictionary of curve name to the list of its current key times.
+        """
+        if cls.is_active():
+            cls.remove()
+
+        cls.curve_key_times = curve_key_times
+        key_times = set()
+        for times in curve_key_times.values():
+            key_times.update(times)
+        cls.key_times = TimingEngine.merge_close_times(key_times)
+        cls.preview_key_times = list(cls.key_times)
+        cls.curves = sorted(curve_key_times.keys())
+
+        # The preview is not something to undo, so it is kept out of the undo queue, without flushing it.
+        undo_state = cls.suspend_undo()
+        # Connecting the warp would otherwise invalidate the cached key times of the curves.
+        KeyTimeCache.ignore_changes = True
+        try:
+            cls.warp_node = cmds.createNode("animCurveTT", name=cls.WARP_NODE_NAME, skipSelect=True)
+            # The warp continues with the slope of its end segments, which are never stretched.
+            cmds.setInfinity(cls.warp_node, preInfinite="linear", postInfinite="linear")
+            cls.set_warp_keys(cls.key_times, cls.key_times)
+
+            cls.source_plugs = {}
+            for curve_name in cls.curves:
+                input_plug = "{0}.input".format(curve_name)
+                sources = cmds.listConnections(input_plug, source=True, destination=False, plugs=True)
+                if sources:
+                    cls.source_plugs[curve_name] = sources[0]
+                cmds.connectAttr("{0}.output".format(cls.warp_node), input_plug, force=True)
+        finally:
+            KeyTimeCache.ignore_changes = False
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+    @classmethod
+    def re_time(cls, time_range, re_time_value, incremental, snap_grid=None):
+        """
+        Re-times the preview, on top of the re-times already previewed.
+        The parameters are the same as for ReTimerHelperMethods.re_time.
+        :param snap_grid: When given, the previewed key times are snapped to a grid with this step in frames.
+        :return: The RetimePlan of this click, from the previewed key times to the new ones.
+        """
+        # The keys as they are seen in the preview, each curve is mapped on its own, like the keys will be moved.
+        previewed_curve_key_times = dict(
+            (curve_name, TimingEngine.map_times(times, cls.key_times, cls.preview_key_times))
+            for curve_name, times in cls.curve_key_times.items())
+
+        # Planned on the previewed unique key times, so the new key times stays in the same order as key_times.
+        plan = RetimePlan.from_key_times(previewed_curve_key_times, cls.preview_key_times, time_range, re_time_value,
+                                         incremental, snap_grid)
+
+        # The unique previewed times are the previewed unique key times, as the mapping keeps the order of the keys.
+        cls.preview_key_times = plan.new_key_times
+        cls.time_range = tuple(time_range)
+        if cls.first_range_start is None or time_range[0] < cls.first_range_start:
+            cls.first_range_start = time_range[0]
+        cls.snap_grid = snap_grid
+        cls.click_plans.append(plan)
+
+        undo_state = cls.suspend_undo()
+        try:
+            cls.set_warp_keys(cls.key_times, cls.preview_key_times)
+        finally:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+        return plan
+
+    @classmethod
+    def set_warp_keys(cls, key_times, new_key_times):
+        """
+        Replaces the keys of the warp, so it maps every new time back to the old time.
+        :param key_times: Sorted list of the old unique key times.
+        :param new_key_times: List of the new key times, in the same order as key_times.
+        """
+        old_points, new_points = TimingEngine.get_mapping_breakpoints(key_times, new_key_times)
+
+        cmds.cutKey(cls.warp_node, clear=True)
+        # The warp is keyed on the new times, with the old times as values, only where the mapping bends.
+        for old_time, new_time in zip(old_points, new_points):
+            cmds.setKeyframe(cls.warp_node, time=new_time, value=old_time, inTangentType="linear",
+                             outTangentType="linear")
+
+    @classmethod
+    def get_plan(cls):
+        """
+        :return: A RetimePlan from the keys when the preview started, to the previewed keys.
+        """
+        if cls.time_range is None:
+            return RetimePlan(cls.curve_key_times, cls.key_times, cls.preview_key_times)
+        # No key before the earliest range has moved, so from there on the keys between the anchors are snapped too.
+        return RetimePlan(cls.curve_key_times, cls.key_times, cls.preview_key_times,
+                          (cls.first_range_start, cls.time_range[1]), cls.snap_grid)
+
+    @classmethod
+    def is_stale(cls):
+        """
+        :return: True when the keys of the previewed curves changed, since the preview started.
+        """
+        current_curve_key_times = KeyTimeCache.get_curve_key_times(cls.curves, KeyMover.get_curve_key_times)
+        return any(current_curve_key_times[curve_name] != times for curve_name, times in cls.curve_key_times.items())
+
+    @classmethod
+    def suspend_undo(cls):
+        """
+        Turns off the undo queue, without flushing it.
+        :return: If undo was on before, to turn it back to afterwards. Undo turned off by the user stays off.
+        """
+        undo_state = cmds.undoInfo(query=True, state=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+        return undo_state
+
+    @classmethod
+    def remove(cls):
+        """
+        Deletes the warp and connects the curves back to what they were connected to.
+        """
+        if not cls.is_active():
+            return
+
+        undo_state = cls.suspend_undo()
+        KeyTimeCache.ignore_changes = True
+        try:
+            # Deleting the warp disconnects it from the curves, which then goes back to the scene time.
+            cmds.delete(cls.warp_node)
+            for curve_name, source_plug in cls.source_plugs.items():
+                if cmds.objExists(curve_name):
+                    cmds.connectAttr(source_plug, "{0}.input".format(curve_name), force=True)
+        finally:
+            KeyTimeCache.ignore_changes = False
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        cls.warp_node = None
+        cls.curves = []
+        cls.source_plugs = {}
+        cls.curve_key_times = {}
+        cls.key_times = []
+        cls.preview_key_times = []
+        cls.time_range = None
+        cls.first_range_start = None
+        cls.snap_grid = None
+        cls.click_plans = []
@@ -0,0 +1,103 @@
+import threading
+import traceback
+
+import maya.utils
+
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+"""
+Using: Pure Python, maya.utils, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Plans a re-time on a worker thread, so a large selection doesn't freeze Maya while the new key times are computed.
+The worker only works on a snapshot of the key times, read on the main thread before it starts. Progress and the
+finished plan are handed back to the main thread with executeDeferred, where the keys are written.
+"""
+
+
+class RetimeTask(object):
+
+    def __init__(self, curve_key_times, time_range, re_time_value, incremental, snap_grid=None):
+        """
+        :param curve_key_times: Snapshot of the key times, dictionary of curve name to the list of its key times.
+        :param snap_grid: When given, the re-timed keys are snapped to a grid with this step in frames.
+        The other parameters are the same as for ReTimerHelperMethods.re_time.
+        """
+        self.curve_key_times = curve_key_times
+        self.time_range = time_range
+        self.re_time_value = re_time_value
+        self.incremental = incremental
+        self.snap_grid = snap_grid
+
+        # The cache generation of the snapshot, if the cache has changed when the plan is done, the scene has too.
+        self.generation = KeyTimeCache.generation
+
+        self.plan = None
+        # The formatted traceback, when planning or applying failed.
+        self.error = None
+        self.progress = 0.0
+
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.on_progress = None
+        self.on_finished = None
+
+    def start(self, on_finished, on_progress=None):
+        """
+        Starts planning on a worker thread.
+        :param on_finished: Function called with this task on the main thread, when the plan is done. Not called if
+        the task is cancelled.
+        :param on_progress: Optional function called with the progress fraction on the main thread.
+        """
+        self.on_finished = on_finished
+        self.on_progress = on_progress
+
+        self.thread = threading.Thread(target=self.run, name="RetimeTask")
+        # The worker must never keep Maya from quitting.
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        # Runs on the worker thread, so nothing in here may touch the scene or the UI.
+        try:
+            plan = RetimePlan.from_curve_key_times(self.curve_key_times, self.time_range, self.re_time_value,
+                                                   self.incremental, self.snap_grid)
+            if self.is_cancelled():
+                return
+            self.report_progress(0.1)
+
+            # Mapping the keys of every curve is the slow part, it reports the last 90 percent of the progress.
+            if plan.get_new_curve_key_array(lambda fraction: self.report_progress(0.1 + fraction * 0.9),
+                                            self.is_cancelled) is None:
+                return
+            self.plan = plan
+        except Exception:
+            self.error = traceback.format_exc()
+
+        if not self.is_cancelled():
+            maya.utils.executeDeferred(self.finish)
+
+    def report_progress(self, progress):
+        self.progress = progress
+        if self.on_progress:
+            maya.utils.executeDeferred(self.on_progress, progress)
+
+    def finish(self):
+        # Back on the main thread. Checking for cancel again, as it may have been cancelled while this was queued.
+        if not self.is_cancelled():
+            self.on_finished(self)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def is_stale(self):
+        """
+        :return: True when the scene changed since the snapshot, which means the plan can't be applied.
+        """
+        return KeyTimeCache.generation != self.generation
@@ -0,0 +1,249 @@
+import bisect
+import math
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The timing engine behind the re-timer. It only works on lists of key times, so it has no dependency on Maya and
+can be tested and benchmarked outside of it.
+"""
+
+# Key times closer than this are the same frame. Mocap and scaled clips leaves float noise on the key times, which
+# would otherwise be re-timed as keys of their own.
+TIME_TOLERANCE = 1e-4
+
+
+def get_anchor_index(key_times, range_start_time, tolerance=TIME_TOLERANCE):
+    """
+    Find the index of the start keyframe (the anchor) of the selected range.
+    Follows the same rule as ReTimerHelperMethods.get_start_keyframe_time, the keyframe on the range start time,
+    otherwise the previous keyframe. Like cmds.findKeyframe, the previous keyframe of a time before the first keyframe
+    wraps around to the last keyframe, so a range starting before the first keyframe moves nothing.
+    :param key_times: Sorted list of unique key times.
+    :param range_start_time: The start time of the selected range.
+    :param tolerance: A key within this of the range start time is on it.
+    :return: The index of the anchor keyframe in key_times.
+    """
+    # bisect_right gives the index after any key on the range start time, so one less is the key on or before it.
+    index = bisect.bisect_right(key_times, range_start_time + tolerance) - 1
+    if index < 0:
+        # When there is no keyframe before the range, the previous keyframe is the last one.
+        return len(key_times) - 1
+    return index
+
+
+def get_time_deltas(key_times, anchor_index, range_end_time, re_time_value, incremental, tolerance=TIME_TOLERANCE):
+    """
+    Calculates the new time difference between every keyframe after the anchor and the keyframe before it.
+    :param key_times: Sorted list of unique key times.
+    :param anchor_index: The index of the anchor keyframe, the first keyframe that will not move.
+    :param range_end_time: The end time of the selected range.
+    :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
+    :param incremental: If False, the re_time_value is the exact number of frames between keyframes in the range.
+    When True the re_time_value is added to the frames between the keyframes in the range.
+    :param tolerance: A key within this of the range end time is on it, and is the last key re-timed.
+    :return: List of time deltas, one for each keyframe after the anchor.
+    """
+    time_deltas = []
+
+    for index in range(anchor_index, len(key_times) - 1):
+        current_time = key_times[index]
+        # The time difference to the next keyframe, used as is for keyframes outside of the selected range.
+        time_diff = key_times[index + 1] - current_time
+
+        if current_time < range_end_time - tolerance:
+            if incremental:
+                # There must always be 1 frame between keyframes, and keyframes cannot jump over one another.
+                time_diff = max(time_diff + re_time_value, 1)
+            else:
+                time_diff = re_time_value
+
+        time_deltas.append(time_diff)
+
+    return time_deltas
+
+
+def compute_new_key_times(key_times, range_start_time, range_end_time, re_time_value, incremental,
+                          tolerance=TIME_TOLERANCE):
+    """
+    Computes the re-timed time of every keyframe in one pass, as the cumulative sum of the time deltas starting at
+    the anchor keyframe. Keyframes up to and including the anchor keep their time.
+    :param key_times: Sorted list of unique key times.
+    :param range_start_time: The start time of the selected range.
+    :param range_end_time: The end time of the selected range.
+    :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
+    :param incremental: If False, the re_time_value is the exact number of frames between keyframes in the range.
+    When True the re_time_value is added to the frames between the keyframes in the range.
+    :param tolerance: How close a key must be to the range start or end time to be on it.
+    :return: List of new key times, in the same order as key_times.
+    """
+    if not key_times:
+        return []
+
+    anchor_index = get_anchor_index(key_times, range_start_time, tolerance)
+    time_deltas = get_time_deltas(key_times, anchor_index, range_end_time, re_time_value, incremental, tolerance)
+
+    # The keyframes before the anchor and the anchor itself are left untouched.
+    new_key_times = list(key_times[:anchor_index + 1])
+    new_time = new_key_times[-1]
+
+    for time_diff in time_deltas:
+        new_time += time_diff
+        new_key_times.append(new_time)
+
+    return new_key_times
+
+
+def plan_move_order(old_times, new_times):
+    """
+    Plans the order the keys of a curve should be moved in, so a key is never moved past or onto another key.
+    Keys moving right are moved first from the last to the first, then keys moving left from the first to the last.
+    This requires the new times to keep the order of the old times, which compute_new_key_times guarantees.
+    :param old_times: Sorted list of the current key times of the curve.
+    :param new_times: List of the new key times, in the same order as old_times.
+    :return: List of key indices in the order they should be moved. Keys that don't move are left out.
+    """
+    moving_right = [index for index in range(len(old_times)) if new_times[index] > old_times[index]]
+    moving_left = [index for index in range(len(old_times)) if new_times[index] < old_times[index]]
+
+    # Reversing the keys moving right, makes the key in front of them move out of the way first.
+    moving_right.reverse()
+
+    return moving_right + moving_left
+
+
+def compute_new_key_times_for_ranges(key_times, time_ranges, re_time_value, incremental, tolerance=TIME_TOLERANCE):
+    """
+    Re-times several ranges in one go. The ranges are given in the original frame numbers, so they are re-timed from
+    the last to the first, that way re-timing a range never moves the ranges still to be re-timed.
+    :param key_times: Sorted list of unique key times.
+    :param time_ranges: List of (start time, end time) tuples.
+    :param re_time_value: Is the number of frames, how it is interpreted depends on incremental.
+    :param incremental: If False, the re_time_value is the exact number of frames between keyframes in the range.
+    When True the re_time_value is added to the frames between the keyframes in the range.
+    :param tolerance: How close a key must be to the range start or end time to be on it.
+    :return: List of new key times, in the same order as key_times.
+    """
+    new_key_times = list(key_times)
+
+    for range_start_time, range_end_time in sorted(time_ranges, reverse=True):
+        new_key_times = compute_new_key_times(new_key_times, range_start_time, range_end_time, re_time_value,
+                                              incremental, tolerance)
+
+    return new_key_times
+
+
+def map_times(times, anchor_times, new_anchor_times):
+    """
+    Maps any key times through a re-time, given as the old and new time of a set of anchor keys. Times between two
+    anchors are interpolated linearly, times outside the anchors keep their distance to the nearest anchor.
+    :param times: Iterable of key times, they don't have to be sorted.
+    :param anchor_times: Sorted list of unique anchor times, the key times the re-time was computed for.
+    :param new_anchor_times: List of the new anchor times, in the same order as anchor_times.
+    :return: List of the mapped times, in the same order as times.
+    """
+    if not anchor_times:
+        return list(times)
+
+    last_index = len(anchor_times) - 1
+    first_offset = new_anchor_times[0] - anchor_times[0]
+    last_offset = new_anchor_times[last_index] - anchor_times[last_index]
+
+    # The stretch of each segment between two anchors, computed once instead of once per key.
+    stretches = [float(new_anchor_times[index + 1] - new_anchor_times[index]) /
+                 (anchor_times[index + 1] - anchor_times[index]) for index in range(last_index)]
+
+    mapped_times = []
+    for time in times:
+        index = bisect.bisect_right(anchor_times, time) - 1
+        if index < 0:
+            mapped_times.append(time + first_offset)
+        elif index >= last_index:
+            mapped_times.append(time + last_offset)
+        elif time == anchor_times[index]:
+            # Keeping the anchors exact, so whole frames stay whole frames.
+            mapped_times.append(new_anchor_times[index])
+        else:
+            mapped_times.append(new_anchor_times[index] + (time - anchor_times[index]) * stretches[index])
+
+    return mapped_times
+
+
+def get_segment_stretches(old_times, new_times):
+    """
+    :param old_times: Sorted list of the key times of a curve.
+    :param new_times: List of the new key times, in the same order as old_times.
+    :return: List of how much each segment between two keys is stretched, 2.0 is twice as long, 0.5 half as long.
+    """
+    return [float(new_times[index + 1] - new_times[index]) / (old_times[index + 1] - old_times[index])
+            for index in range(len(old_times) - 1)]
+
+
+def get_mapping_breakpoints(anchor_times, new_anchor_times):
+    """
+    Reduces a re-time to the fewest points that describe the same piecewise linear mapping. Anchors in the middle of a
+    straight run, like every key outside of the re-timed range, are left out. A point one frame past each end is added,
+    so a curve through the points that continues linearly keeps the offsets outside the anchors, like map_times.
+    :param anchor_times: Sorted list of unique anchor times.
+    :param new_anchor_times: List of the new anchor times, in the same order as anchor_times.
+    :return: Tuple of the list of old times and the list of new times of the breakpoints.
+    """
+    if not anchor_times:
+        return [], []
+
+    # Padding the ends with a segment that isn't stretched.
+    old_points = [anchor_times[0] - 1] + list(anchor_times) + [anchor_times[-1] + 1]
+    new_points = [new_anchor_times[0] - 1] + list(new_anchor_times) + [new_anchor_times[-1] + 1]
+    stretches = get_segment_stretches(old_points, new_points)
+
+    breakpoint_times = [old_points[0]]
+    new_breakpoint_times = [new_points[0]]
+    for index in range(1, len(old_points) - 1):
+        # A point is only needed where the stretch changes.
+        if stretches[index - 1] != stretches[index]:
+            breakpoint_times.append(old_points[index])
+            new_breakpoint_times.append(new_points[index])
+    breakpoint_times.append(old_points[-1])
+    new_breakpoint_times.append(new_points[-1])
+
+    return breakpoint_times, new_breakpoint_times
+
+
+def merge_close_times(times, tolerance=TIME_TOLERANCE):
+    """
+    :param times: Iterable of key times.
+    :return: Sorted list of the unique times, where times within the tolerance of the time before them are left out.
+    """
+    merged_times = []
+    for time in sorted(times):
+        if not merged_times or time - merged_times[-1] > tolerance:
+            merged_times.append(time)
+    return merged_times
+
+
+def snap_key_times(old_times, new_times, start_time, grid, tolerance=TIME_TOLERANCE):
+    """
+    Snaps the re-timed keys of a curve to a grid, like whole frames or half frames. Keys that would snap onto or
+    before the key before them are pushed to the next free step of the grid, so no two keys end up on the same frame
+    and the keys keep their order.
+    :param old_times: Sorted list of the key times of the curve.
+    :param new_times: List of the new key times, in the same order as old_times.
+    :param start_time: The time of the anchor of the re-time, only the keys after it are snapped.
+    :param grid: The step of the grid in frames, 1.0 for whole frames.
+    :param tolerance: A key within this of the anchor time is the anchor.
+    :return: List of the snapped new key times.
+    """
+    # The keys up to the anchor keeps their time, the first snapped key must come after the last of them.
+    first_index = bisect.bisect_right(old_times, start_time + tolerance)
+    snapped_times = list(new_times[:first_index])
+    previous_time = snapped_times[-1] if snapped_times else None
+
+    for time in new_times[first_index:]:
+        snapped_time = math.floor(time / grid + 0.5) * grid
+        if previous_time is not None and snapped_time <= previous_time + tolerance:
+            # The next step of the grid after the key before it.
+            snapped_time = (math.floor((previous_time + tolerance) / grid) + 1) * grid
+        snapped_times.append(snapped_time)
+        previous_time = snapped_time
+
+    return snapped_times
@@ -0,0 +1,426 @@
+import traceback
+import maya.cmds as cmds
+import maya.OpenMaya as om
+from PySide2 import QtCore, QtWidgets
+from shiboken2 import wrapInstance
+import maya.OpenMayaUI as omui
+from Scripts.ReTimerHelperMethods import ReTimerHelperMethods
+from Scripts.Retiming import KeyScanner
+from Scripts.Retiming.Instrumentation import Instrumentation
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimeLog import RetimeLog
+from Scripts.Retiming.RetimePreview import RetimePreview
+
+"""
+Using: PySide2, Maya API 1.0, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The dialog of the retimer tool. It is kept apart from ReTimerHelperMethods, so Qt is only imported when the dialog is
+opened, not when Maya starts or a batch re-time runs.
+"""
+
+
+# Extends QDialog class
+class RetimingUi(QtWidgets.QDialog):
+
+    # Constants
+    WINDOW_TITLE = "Retiming Tool"
+    ABSOLUTE_BUTTON_WIDTH = 50
+    RELATIVE_BUTTON_WIDTH = 64
+    RETIMING_PROPERTY_NAME = "re_timing_data"
+    # The grids the re-timed keys can be snapped to, as the label and the step in frames.
+    SNAP_GRIDS = [("Off", None), ("1f", 1.0), ("1/2f", 0.5), ("1/4f", 0.25)]
+    LOG_FILE_FILTER = "Re-time log (*.json)"
+
+    # Storing an instance of this dialog.
+    # Storing as class level variable.
+    dlg_instance = None
+
+    # Adding a display method to the class, for production release.
+    @classmethod
+    def display(cls):
+        # I check if there isn't an instance created.
+        if not cls.dlg_instance:
+            # Storing as class level variable.
+            cls.dlg_instance = RetimingUi()
+
+        # I check if the instance is hidden.
+        if cls.dlg_instance.isHidden():
+            # If it is hidden I show it.
+            cls.dlg_instance.show()
+        else:
+            # Otherwise I will raise the window and activate it.
+            cls.dlg_instance.raise_()
+            cls.dlg_instance.activateWindow()
+
+    @classmethod
+    def maya_main_window(cls):
+        """
+        Used to parent this dialog to Mayas main window.
+        Return the Maya main window widget as a Python object
+        """
+        main_window_ptr = omui.MQtUtil.mainWindow()
+        return wrapInstance(long(main_window_ptr), QtWidgets.QWidget)
+
+    def __init__(self):
+        super(RetimingUi, self).__init__(self.maya_main_window())
+
+        # Setting the window title of the main window.
+        self.setWindowTitle(self.WINDOW_TITLE)
+
+        # Setting the window title of the main window.
+        # If windows.
+        if cmds.about(ntOS=True):
+            # The question mark in the top right of the title bar, is removed from the dialog.
+            self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
+        # Else if Mac OS
+        elif cmds.about(macOS=True):
+            # Setting the dialog to be interpreted as a tool, to keep the dialog from falling behind Mayas main window.
+            self.setWindowFlags(QtCore.Qt.Tool)
+
+        self.create_widgets()
+        self.create_layouts()
+        self.create_connections()
+
+    def create_widgets(self):
+        # A list to store the top-row buttons
+        self.absolute_buttons = []
+
+        # Creating 6 buttons, moving up to 6 frames as a maximum.
+        for i in range(1, 7):
+            # The text on the button.
+            btn = QtWidgets.QPushButton("{0}f".format(i))
+            # Using the constant to set a fixed width
+            btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+            # Storing the value inside the widget itself, later this will allow the re_time method to pull out how
+            # many frames, aswell whether or not it is absolute re-timing or relative re-timing. Passing in a list,
+            # with two values, the first is the current value of i, this will be the number of frames, that will be
+            # re-timed with, as whether or not it is incremental timing.
+            # Because this is absolute buttons, it is not incremental, and i will set the second value to False.
+            btn.setProperty(self.RETIMING_PROPERTY_NAME, [i, False])
+            # Now I add the new absolute button to the list.
+            self.absolute_buttons.append(btn)
+
+        # A list to store the bottom-row buttons.
+        self.relative_buttons = []
+
+        # Creating 4 Buttons.
+        for i in [-2, -1, 1, 2]:
+            # The text on the button.
+            btn = QtWidgets.QPushButton("{0}f".format(i))
+            # Using the constant to set a fixed width
+            btn.setFixedWidth(self.RELATIVE_BUTTON_WIDTH)
+            # Storing the value inside the widget itself, later this will allow the re_time method to pull out how
+            # many frames, aswell whether or not it is absolute re-timing or relative re-timing. Passing in a list,
+            # with two values, the first is the current value of i, this will be the number of frames, that will be
+            # re-timed with, as whether or not it is incremental timing.
+            # Because this is relative button, it is incremental, so I set the value to True.
+            btn.setProperty(self.RETIMING_PROPERTY_NAME, [i, True])
+            # Now I add the new relative button to the list.
+            self.relative_buttons.append(btn)
+
+        # To enable move to next frame, I set a checkbox to give the option to enable and disable.
+        self.move_to_next_cb = QtWidgets.QCheckBox("Move to Next Frame")
+        # Stretching the tangents with the keys, so the curves keeps their shape after a large re-time.
+        self.scale_tangents_cb = QtWidgets.QCheckBox("Scale Tangents")
+        # Re-timing the keys on every animation layer, not only the active ones.
+        self.all_layers_cb = QtWidgets.QCheckBox("All Layers")
+
+        # Snapping the re-timed keys to a grid, for mocap and scaled clips with keys between the frames.
+        self.snap_label = QtWidgets.QLabel("Snap Keys")
+        self.snap_cmb = QtWidgets.QComboBox()
+        for label, snap_grid in self.SNAP_GRIDS:
+            self.snap_cmb.addItem(label, snap_grid)
+
+        # While previewing, the buttons only change the timing in the viewport. The keys are moved when applied.
+        self.preview_cb = QtWidgets.QCheckBox("Preview")
+        self.apply_preview_btn = QtWidgets.QPushButton("Apply")
+        self.apply_preview_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        self.cancel_preview_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_preview_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        self.update_preview_buttons()
+
+        # The progress of a re-time planned in the background, and the button to cancel it.
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.cancel_re_time_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_re_time_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        # The running re-time, None when there is none.
+        self.re_time_task = None
+        self.set_re_time_running(False)
+
+        # The re-times applied so far can be saved, and a saved log replayed on the selection.
+        self.log_label = QtWidgets.QLabel()
+        self.save_log_btn = QtWidgets.QPushButton("Save")
+        self.save_log_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        self.replay_log_btn = QtWidgets.QPushButton("Replay")
+        self.replay_log_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        self.clear_log_btn = QtWidgets.QPushButton("Clear")
+        self.clear_log_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        self.update_log_label()
+
+        # Timing of the Maya calls is opt-in, the stats button prints what has been recorded.
+        self.instrument_cb = QtWidgets.QCheckBox("Instrument")
+        self.instrument_cb.setChecked(Instrumentation.enabled)
+        self.stats_btn = QtWidgets.QPushButton("Stats")
+        self.stats_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+        # Checking the selection for keys a re-time would trip over, before re-timing it.
+        self.scan_btn = QtWidgets.QPushButton("Scan")
+        self.scan_btn.setFixedWidth(self.ABSOLUTE_BUTTON_WIDTH)
+
+    def create_layouts(self):
+        # The layout for my top-row buttons. In a horizontal layout.
+        absolute_re_time_layout = QtWidgets.QHBoxLayout()
+        # The spacing between buttons.
+        absolute_re_time_layout.setSpacing(2)
+        # Iterating over my list of absolute buttons.
+        for btn in self.absolute_buttons:
+            absolute_re_time_layout.addWidget(btn)
+
+        # The layout for my bottom-row buttons. In a horizontal layout.
+        relative_re_time_layout = QtWidgets.QHBoxLayout()
+        # The spacing between buttons.
+        relative_re_time_layout.setSpacing(2)
+        # Iterating over my list of relative buttons.
+        for btn in self.relative_buttons:
+            relative_re_time_layout.addWidget(btn)
+            # If there is two widgets in this layout.
+            if relative_re_time_layout.count() == 2:
+                # Add a stretch between the negative and positive numbers.
+                relative_re_time_layout.addStretch()
+
+        # Building the UI.
+        # Adding my main layout, which is a vertical box layout layout, parented to dialog.
+        main_layout = QtWidgets.QVBoxLayout(self)
+        # Setting the margins.
+        main_layout.setContentsMargins(2, 2, 2, 2)
+        # Setting the spacing
+        main_layout.setSpacing(2)
+        # I now add the two button layouts.
+        main_layout.addLayout(absolute_re_time_layout)
+        main_layout.addLayout(relative_re_time_layout)
+        # Adding the checkbox.
+        main_layout.addWidget(self.move_to_next_cb)
+        main_layout.addWidget(self.scale_tangents_cb)
+        main_layout.addWidget(self.all_layers_cb)
+
+        # The snap label and its combo box on one row.
+        snap_layout = QtWidgets.QHBoxLayout()
+        snap_layout.addWidget(self.snap_label)
+        snap_layout.addStretch()
+        snap_layout.addWidget(self.snap_cmb)
+        main_layout.addLayout(snap_layout)
+
+        # The preview checkbox with its apply and cancel buttons on one row.
+        preview_layout = QtWidgets.QHBoxLayout()
+        preview_layout.addWidget(self.preview_cb)
+        preview_layout.addStretch()
+        preview_layout.addWidget(self.apply_preview_btn)
+        preview_layout.addWidget(self.cancel_preview_btn)
+        main_layout.addLayout(preview_layout)
+
+        # The progress bar and its cancel button on one row.
+        progress_layout = QtWidgets.QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_re_time_btn)
+        main_layout.addLayout(progress_layout)
+
+        # The log label and its buttons on one row.
+        log_layout = QtWidgets.QHBoxLayout()
+        log_layout.addWidget(self.log_label)
+        log_layout.addStretch()
+        log_layout.addWidget(self.save_log_btn)
+        log_layout.addWidget(self.replay_log_btn)
+        log_layout.addWidget(self.clear_log_btn)
+        main_layout.addLayout(log_layout)
+
+        # The instrumentation checkbox, the scan and the stats button on one row.
+        instrumentation_layout = QtWidgets.QHBoxLayout()
+        instrumentation_layout.addWidget(self.instrument_cb)
+        instrumentation_layout.addStretch()
+        instrumentation_layout.addWidget(self.scan_btn)
+        instrumentation_layout.addWidget(self.stats_btn)
+        main_layout.addLayout(instrumentation_layout)
+
+    def create_connections(self):
+        # Creating the clicked signal connected to the retime slot.
+        # For the absolute buttons.
+        for btn in self.absolute_buttons:
+            btn.clicked.connect(self.retime)
+        # For the relative buttons.
+        for btn in self.relative_buttons:
+            btn.clicked.connect(self.retime)
+
+        self.cancel_re_time_btn.clicked.connect(self.cancel_re_time)
+        self.snap_cmb.currentIndexChanged.connect(self.set_snap_grid)
+
+        self.preview_cb.toggled.connect(self.set_preview)
+        self.apply_preview_btn.clicked.connect(self.apply_preview)
+        self.cancel_preview_btn.clicked.connect(self.cancel_preview)
+
+        self.save_log_btn.clicked.connect(self.save_log)
+        self.replay_log_btn.clicked.connect(self.replay_log)
+        self.clear_log_btn.clicked.connect(self.clear_log)
+
+        self.instrument_cb.toggled.connect(self.set_instrumentation)
+        self.stats_btn.clicked.connect(self.print_stats)
+        self.scan_btn.clicked.connect(self.scan_keys)
+
+    def set_re_time_running(self, running):
+        # While a re-time is planned in the background, the re-time buttons are disabled, so one is done at a time.
+        for btn in self.absolute_buttons + self.relative_buttons:
+            btn.setEnabled(not running)
+        self.progress_bar.setVisible(running)
+        self.progress_bar.setValue(0)
+        self.cancel_re_time_btn.setVisible(running)
+
+    def set_re_time_progress(self, progress):
+        self.progress_bar.setValue(int(progress * 100))
+
+    def on_re_time_finished(self, task):
+        self.re_time_task = None
+        self.set_re_time_running(False)
+        self.update_log_label()
+        if task.error:
+            print(task.error)
+            om.MGlobal.displayError("Re-time error occurred. See the script editor for details.")
+
+    def cancel_re_time(self):
+        if self.re_time_task:
+            self.re_time_task.cancel()
+        self.re_time_task = None
+        self.set_re_time_running(False)
+
+    def update_log_label(self):
+        self.log_label.setText("Log: {0} re-times".format(len(ReTimerHelperMethods.operation_log)))
+
+    def save_log(self):
+        path = QtWidgets.QFileDialog.getSaveFileName(self, "Save Re-Time Log", "", self.LOG_FILE_FILTER)[0]
+        if path:
+            ReTimerHelperMethods.operation_log.save(path)
+
+    def replay_log(self):
+        path = QtWidgets.QFileDialog.getOpenFileName(self, "Replay Re-Time Log", "", self.LOG_FILE_FILTER)[0]
+        if not path:
+            return
+        try:
+            ReTimerHelperMethods.replay_log(RetimeLog.load(path), scale_tangents=self.scale_tangents_cb.isChecked())
+        except:
+            traceback.print_exc()
+            om.MGlobal.displayError("Re-time error occurred. See the script editor for details.")
+
+    def clear_log(self):
+        ReTimerHelperMethods.operation_log.clear()
+        self.update_log_label()
+
+    def set_snap_grid(self, index):
+        ReTimerHelperMethods.snap_grid = self.SNAP_GRIDS[index][1]
+
+    def update_preview_buttons(self):
+        # Apply and cancel are only useful while there is a preview.
+        preview_active = RetimePreview.is_active()
+        self.apply_preview_btn.setEnabled(preview_active)
+        self.cancel_preview_btn.setEnabled(preview_active)
+
+    def set_preview(self, enabled):
+        # Turning the preview off throws away what has been previewed.
+        if not enabled:
+            self.cancel_preview()
+
+    def apply_preview(self):
+        try:
+            ReTimerHelperMethods.apply_preview(self.scale_tangents_cb.isChecked())
+        except:
+            traceback.print_exc()
+            om.MGlobal.displayError("Re-time error occurred. See the script editor for details.")
+        self.update_preview_buttons()
+        self.update_log_label()
+
+    def cancel_preview(self):
+        ReTimerHelperMethods.cancel_preview()
+        self.update_preview_buttons()
+
+    def closeEvent(self, event):
+        # The preview warp is not left behind in the scene, when the dialog is closed. Nor is a re-time left running.
+        self.cancel_preview()
+        self.cancel_re_time()
+        super(RetimingUi, self).closeEvent(event)
+
+    def set_instrumentation(self, enabled):
+        # Wrapping the helper methods only while the checkbox is checked.
+        if enabled:
+            Instrumentation.enable(ReTimerHelperMethods)
+        else:
+            Instrumentation.disable()
+
+    def print_stats(self):
+        # Printing the timings and the key time cache stats to the script editor.
+        print(Instrumentation.get_summary())
+        print("Key time cache: {0}".format(KeyTimeCache.get_stats()))
+        om.MGlobal.displayInfo("Re-time stats printed to the script editor.")
+
+    def scan_keys(self):
+        # Printing the problems found to the script editor, and a one line summary in the status line.
+        try:
+            report = ReTimerHelperMethods.scan_keys()
+        except:
+            traceback.print_exc()
+            om.MGlobal.displayError("Scan error occurred. See the script editor for details.")
+            return
+        print(KeyScanner.get_report_text(report))
+        problems = sum(len(curve_counts) for curve_counts in report["issues"].values())
+        if problems:
+            om.MGlobal.displayWarning("Found {0} curve problems. See the script editor for details.".format(problems))
+        else:
+            om.MGlobal.displayInfo("No key problems found.")
+
+    def retime(self):
+        # Waiting for a signal to be received from a widget(button) click.
+        # I query this using the sender method.
+        btn = self.sender()
+        # If a signal is received and therefore was a sender.
+        if btn:
+            # I retrieve the data stored as a property. Storing ot in retiming_data, getting the data with the
+            # property method passing in the key used to store the data.
+            retiming_data = btn.property(self.RETIMING_PROPERTY_NAME)
+            # I query if the move_to_next is checked.
+            move_to_next = self.move_to_next_cb.isChecked()
+            scale_tangents = self.scale_tangents_cb.isChecked()
+
+            # The re-time is committed to the undo queue as a single undoable command, so there is no need for an
+            # undo chunk around it.
+            try:
+                # I now call the RetimeHelperMethods re_time_keys method.
+                # I pass in the number of frames and of it is a incremental or absolute change, and if move_to_next is enabled.
+                if self.preview_cb.isChecked():
+                    # Only the timing in the viewport changes, nothing is added to the undo queue.
+                    ReTimerHelperMethods.preview_re_time_keys(retiming_data[0], retiming_data[1], move_to_next)
+                elif self.all_layers_cb.isChecked():
+                    # The layers are re-timed together, with the time spent on each printed to the editor.
+                    report = ReTimerHelperMethods.re_time_keys_all_layers(retiming_data[0], retiming_data[1],
+                                                                          move_to_next, scale_tangents)
+                    print(ReTimerHelperMethods.get_layer_report_text(report))
+                else:
+                    # Large selections are planned in the background, keeping Maya responsive.
+                    self.re_time_task = ReTimerHelperMethods.re_time_keys_async(
+                        retiming_data[0], retiming_data[1], move_to_next, scale_tangents, self.on_re_time_finished,
+                        self.set_re_time_progress)
+                    if self.re_time_task:
+                        self.set_re_time_running(True)
+            except:
+                # Printing the error to the editor.
+                traceback.print_exc()
+                # Displaying the error to maya.
+                om.MGlobal.displayError("Re-time error occurred. See the script editor for details.")
+            self.update_preview_buttons()
+            self.update_log_label()
+
+if __name__ == "__main__":
+
+    try:
+        retiming_ui.close()  # pylint: disable=E0601
+        retiming_ui.deleteLater()
+    except:
+        pass
+
+    retiming_ui = RetimingUi()
+    retiming_ui.show()
@@ -0,0 +1,616 @@
+import copy
+import fnmatch
+import math
+import sys
+import types
+
+# Text can be unicode in Python 2, when it is loaded from json.
+STRING_TYPES = (str, type(u""))
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+An in-memory stand-in for the parts of maya.cmds and the Maya API the re-timer uses. It holds scenes of simple animation
+curves and records every call made to it, so the re-timing code can be run and measured without Maya.
+install() puts it in place of the maya modules, before any of the re-timer modules are imported.
+"""
+
+# The FakeCmds the fake API classes works on, set by install().
+active_cmds = None
+
+
+class FakeAnimCurve(object):
+
+    def __init__(self, name, node, attribute, times, values=None, curve_type="animCurveTL", layer=None,
+                 locked=False, referenced=False, tangents=None, tangent_types=None, weighted=False):
+        """
+        :param name: The name of the curve node.
+        :param node: The node the curve is animating.
+        :param attribute: The attribute of the node the curve is connected to.
+        :param times: Sorted list of key times.
+        :param values: List of key values, defaults to 0 for every key.
+        :param curve_type: The node type of the curve.
+        :param layer: The animation layer the curve is on, None when it is not on a layer.
+        :param locked: If the curve node is locked.
+        :param referenced: If the curve node is from a referenced file.
+        :param tangents: List of the (in x, in y, out x, out y) handles of every key, defaults to flat handles a frame
+        long.
+        :param tangent_types: List of the (in type, out type) of every key, defaults to auto tangents.
+        :param weighted: If the curve has weighted tangents, where the length of a handle is its weight.
+        """
+        self.name = name
+        self.node = node
+        self.attribute = attribute
+        self.times = list(times)
+        self.values = list(values) if values is not None else [0.0] * len(self.times)
+        self.curve_type = curve_type
+        self.layer = layer
+        self.locked = locked
+        self.referenced = referenced
+        self.tangents = [list(tangent) for tangent in tangents] if tangents else [[1.0, 0.0, 1.0, 0.0]
+                                                                                  for _ in self.times]
+        self.tangent_types = ([list(types) for types in tangent_types] if tangent_types else
+                              [[MFnAnimCurve.kTangentAuto] * 2 for _ in self.times])
+        self.weighted = weighted
+        # The keys with locked tangents and the keys with locked weights, Maya locks the tangents of new keys.
+        self.tangents_locked = set(range(len(self.times)))
+        self.weights_locked = set()
+
+
+class FakeCmds(object):
+
+    def __init__(self, scenes=None):
+        """
+        :param scenes: Dictionary of scene file path to a list of FakeAnimCurve, the scenes that can be opened.
+        """
+        self.scenes = scenes or {}
+        # Counting every call, by the command name.
+        self.call_counts = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Goes back to an empty scene, with the time slider, selection and undo queue as Maya starts with them.
+        """
+        # The curves of the open scene.
+        self.curves = {}
+        self.scene_name = ""
+        # The state of the time slider.
+        self.current_time = 1.0
+        self.selected_range = [1.0, 2.0]
+        self.playback_range = [1.0, 120.0]
+        # If the undo queue is on.
+        self.undo_state = True
+        self.selection = []
+        # Nodes that are not animation curves, like the preview time warp, with their keys as (time, value) pairs.
+        self.nodes = {}
+        # Dictionary of destination plug to source plug.
+        self.connections = {}
+        # The functions queued with executeDeferred, with their arguments, run by run_deferred.
+        self.deferred = []
+
+    def record(self, command):
+        self.call_counts[command] = self.call_counts.get(command, 0) + 1
+
+    def get_total_calls(self):
+        return sum(self.call_counts.values())
+
+    def get_command_calls(self):
+        """
+        :return: The number of calls to commands and mel, leaving out the in-process API calls.
+        """
+        return sum(count for command, count in self.call_counts.items() if not command.startswith("M"))
+
+    def reset_calls(self):
+        self.call_counts = {}
+
+    def run_deferred(self):
+        """
+        Runs the queued deferred functions, like Maya does when it is idle.
+        """
+        while self.deferred:
+            function, args = self.deferred.pop(0)
+            function(*args)
+
+    def set_curves(self, curves):
+        """
+        Replaces the open scene with the given curves.
+        :param curves: List of FakeAnimCurve.
+        """
+        self.curves = dict((curve.name, curve) for curve in curves)
+
+    def get_curves_of(self, objects):
+        """
+        :param objects: Node or curve names.
+        :return: The curves that are, or are animating, one of the objects.
+        """
+        return [curve for curve in self.curves.values() if curve.name in objects or curve.node in objects]
+
+    @staticmethod
+    def flatten(objects):
+        """
+        Commands takes objects as separate arguments or as lists.
+        :return: A flat list of the object names.
+        """
+        flat_objects = []
+        for item in objects:
+            flat_objects.extend([item] if isinstance(item, STRING_TYPES) else item)
+        return flat_objects
+
+    def file(self, *args, **kwargs):
+        self.record("file")
+
+        if kwargs.get("query") or kwargs.get("q"):
+            return self.scene_name
+        if kwargs.get("open") or kwargs.get("o"):
+            path = args[0]
+            if path not in self.scenes:
+                raise RuntimeError("File not found: {0}".format(path))
+            # Opening a copy, so nothing is changed in the scene until it is saved.
+            self.set_curves(copy.deepcopy(self.scenes[path]))
+            self.scene_name = path
+            return path
+        if "rename" in kwargs:
+            self.scene_name = kwargs["rename"]
+            return self.scene_name
+        if kwargs.get("save") or kwargs.get("s"):
+            self.scenes[self.scene_name] = copy.deepcopy(list(self.curves.values()))
+            return self.scene_name
+        if kwargs.get("new"):
+            self.set_curves([])
+            self.scene_name = ""
+
+    def ls(self, *patterns, **kwargs):
+        self.record("ls")
+
+        if kwargs.get("selection") or kwargs.get("sl"):
+            return list(self.selection)
+
+        names = set(curve.name for curve in self.curves.values())
+        names.update(curve.node for curve in self.curves.values())
+
+        node_types = kwargs.get("type")
+        if node_types:
+            node_types = [node_types] if isinstance(node_types, STRING_TYPES) else node_types
+            # An animCurve type matches every curve type.
+            names = set(curve.name for curve in self.curves.values()
+                        if curve.curve_type in node_types or "animCurve" in node_types)
+            if "animLayer" in node_types:
+                names.update(curve.layer for curve in self.curves.values() if curve.layer)
+
+        if patterns:
+            patterns = self.flatten(patterns)
+            names = set(name for name in names if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns))
+
+        if kwargs.get("referencedNodes") or kwargs.get("rn"):
+            names = set(name for name in names if name in self.curves and self.curves[name].referenced)
+
+        return sorted(names)
+
+    def keyframe(self, *objects, **kwargs):
+        self.record("keyframe")
+
+        curves = self.get_curves_of(self.flatten(objects)) if objects else list(self.curves.values())
+
+        if kwargs.get("query") or kwargs.get("q"):
+            if kwargs.get("name") or kwargs.get("n"):
+                return sorted(curve.name for curve in curves) or None
+            if kwargs.get("valueChange") or kwargs.get("vc"):
+                return [value for curve in curves for value in curve.values] or None
+            if "time" in kwargs:
+                start_time, end_time = kwargs["time"]
+                return [time for curve in curves for time in curve.times if start_time <= time <= end_time] or None
+            return [time for curve in curves for time in curve.times] or None
+
+        if kwargs.get("edit") or kwargs.get("e"):
+            start_index, end_index = kwargs["index"]
+            new_time = kwargs["timeChange"]
+            for curve in curves:
+                for index in range(start_index, end_index + 1):
+                    self.move_key(curve, index, new_time)
+            return len(curves)
+
+    def move_key(self, curve, index, new_time):
+        """
+        Moves a key like Maya does, a key can't be moved onto or past another key.
+        """
+        previous_time = curve.times[index - 1] if index > 0 else None
+        next_time = curve.times[index + 1] if index + 1 < len(curve.times) else None
+
+        if (previous_time is not None and new_time <= previous_time) or \
+                (next_time is not None and new_time >= next_time):
+            raise RuntimeError("Can't move the key at {0} past another key on {1}".format(curve.times[index],
+                                                                                         curve.name))
+
+        curve.times[index] = new_time
+
+    def findKeyframe(self, *objects, **kwargs):
+        self.record("findKeyframe")
+
+        curves = self.get_curves_of(self.flatten(objects)) if objects else list(self.curves.values())
+        key_times = sorted(set(time for curve in curves for time in curve.times))
+        if not key_times:
+            return self.current_time
+
+        which = kwargs.get("which", "next")
+        time = kwargs.get("time", (self.current_time, self.current_time))[0]
+
+        if which == "first":
+            return key_times[0]
+        if which == "last":
+            return key_times[-1]
+        # Like Maya, next and previous wraps around the ends.
+        if which == "next":
+            later_times = [key_time for key_time in key_times if key_time > time]
+            return later_times[0] if later_times else key_times[0]
+        earlier_times = [key_time for key_time in key_times if key_time < time]
+        return earlier_times[-1] if earlier_times else key_times[-1]
+
+    def createNode(self, node_type, **kwargs):
+        self.record("createNode")
+
+        name = kwargs.get("name", node_type)
+        self.nodes[name] = []
+        return name
+
+    def objExists(self, name):
+        self.record("objExists")
+        return name in self.nodes or name in self.curves
+
+    def delete(self, *objects, **kwargs):
+        self.record("delete")
+
+        for name in self.flatten(objects):
+            self.nodes.pop(name, None)
+            self.curves.pop(name, None)
+            # Deleting a node breaks its connections.
+            self.connections = dict((destination, source) for destination, source in self.connections.items()
+                                    if destination.split(".")[0] != name and source.split(".")[0] != name)
+
+    def setInfinity(self, *args, **kwargs):
+        self.record("setInfinity")
+
+    def cutKey(self, *objects, **kwargs):
+        self.record("cutKey")
+
+        for name in self.flatten(objects):
+            if name in self.nodes:
+                self.nodes[name] = []
+
+    def setKeyframe(self, *objects, **kwargs):
+        self.record("setKeyframe")
+
+        for name in self.flatten(objects):
+            self.nodes[name].append((kwargs["time"], kwargs["value"]))
+            self.nodes[name].sort()
+
+    def connectAttr(self, source, destination, **kwargs):
+        self.record("connectAttr")
+        self.connections[destination] = source
+
+    def listConnections(self, plug, **kwargs):
+        self.record("listConnections")
+
+        source = self.connections.get(plug)
+        return [source] if source else None
+
+    def listHistory(self, *objects, **kwargs):
+        self.record("listHistory")
+
+        # The nodes themselves and every curve animating them, on any layer.
+        objects = self.flatten(objects)
+        return objects + [curve.name for curve in self.get_curves_of(objects) if curve.name not in objects]
+
+    def animLayer(self, layer, **kwargs):
+        self.record("animLayer")
+
+        if kwargs.get("animCurves"):
+            return sorted(curve.name for curve in self.curves.values() if curve.layer == layer) or None
+
+    def currentTime(self, *args, **kwargs):
+        self.record("currentTime")
+
+        if args:
+            self.current_time = args[0]
+        return self.current_time
+
+    def playbackOptions(self, *args, **kwargs):
+        self.record("playbackOptions")
+
+        if kwargs.get("minTime") or kwargs.get("min"):
+            return self.playback_range[0]
+        if kwargs.get("maxTime") or kwargs.get("max"):
+            return self.playback_range[1]
+
+    def lockNode(self, *objects, **kwargs):
+        self.record("lockNode")
+
+        # Only the curves can be locked, the query returns the lock state of each node.
+        objects = self.flatten(objects)
+        if kwargs.get("query") or kwargs.get("q"):
+            return [name in self.curves and self.curves[name].locked for name in objects]
+        for name in objects:
+            if name in self.curves:
+                self.curves[name].locked = kwargs.get("lock", kwargs.get("l", True))
+
+    def timeControl(self, *args, **kwargs):
+        self.record("timeControl")
+        return list(self.selected_range)
+
+    def pluginInfo(self, *args, **kwargs):
+        self.record("pluginInfo")
+        return True
+
+    def loadPlugin(self, *args, **kwargs):
+        self.record("loadPlugin")
+
+    def undoInfo(self, *args, **kwargs):
+        self.record("undoInfo")
+
+        if kwargs.get("query") or kwargs.get("q"):
+            return self.undo_state
+        for flag in ["state", "stateWithoutFlush", "swf"]:
+            if flag in kwargs:
+                self.undo_state = kwargs[flag]
+
+    def about(self, *args, **kwargs):
+        self.record("about")
+        return False
+
+    def reTimerCommitChange(self, *args, **kwargs):
+        self.record("reTimerCommitChange")
+
+        from Scripts.Retiming import KeyMover
+        if KeyMover.pending_changes:
+            KeyMover.pending_changes.pop(0)
+
+
+def get_installed_cmds():
+    """
+    Installs a FakeCmds the first time it is called. The re-timer modules keeps the maya.cmds they were imported with,
+    so every test shares the one installed.
+    :return: The installed FakeCmds.
+    """
+    if active_cmds is None:
+        install(FakeCmds())
+    return active_cmds
+
+
+def execute_deferred(function, *args):
+    # Can be called from any thread, like the real one.
+    active_cmds.deferred.append((function, args))
+
+
+class FakeMel(object):
+
+    def eval(self, command):
+        active_cmds.record("mel.eval")
+        # The only mel the re-timer evaluates is getting the playback slider.
+        return "timeControl1"
+
+
+class MTime(object):
+
+    def __init__(self, value=0.0, unit=0):
+        self.value = value
+
+    @staticmethod
+    def uiUnit():
+        return 0
+
+    def asUnits(self, unit):
+        return self.value
+
+
+class MObject(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class MObjectHandle(object):
+
+    def __init__(self, mobject):
+        # The curve the object was when the handle was made, a curve created again under the name is another one.
+        self.name = mobject.name
+        self.curve = active_cmds.curves.get(mobject.name)
+
+    def isValid(self):
+        return self.curve is not None and active_cmds.curves.get(self.name) is self.curve
+
+
+class MSelectionList(object):
+
+    def __init__(self):
+        self.names = []
+
+    def add(self, name):
+        active_cmds.record("MSelectionList.add")
+        if name not in active_cmds.curves:
+            raise RuntimeError("No object matches name: {0}".format(name))
+        self.names.append(name)
+
+    def getDependNode(self, index):
+        return MObject(self.names[index])
+
+
+class MAnimCurveChange(object):
+
+    def __init__(self):
+        # List of (list, index, old value, new value) for every key time or tangent handle changed.
+        self.edits = []
+
+    def undoIt(self):
+        for values, index, old_value, new_value in reversed(self.edits):
+            values[index] = old_value
+
+    def redoIt(self):
+        for values, index, old_value, new_value in self.edits:
+            values[index] = new_value
+
+
+class MFnAnimCurve(object):
+
+    # The tangent types, with the values of Maya.
+    kTangentFixed = 1
+    kTangentLinear = 2
+    kTangentFlat = 3
+    kTangentStep = 5
+    kTangentStepNext = 10
+    kTangentAuto = 11
+
+    def __init__(self, mobject):
+        active_cmds.record("MFnAnimCurve")
+        self.curve = active_cmds.curves[mobject.name]
+
+    @property
+    def numKeys(self):
+        return len(self.curve.times)
+
+    def input(self, index):
+        active_cmds.record("MFnAnimCurve.input")
+        return MTime(self.curve.times[index])
+
+    def value(self, index):
+        active_cmds.record("MFnAnimCurve.value")
+        return self.curve.values[index]
+
+    def setTime(self, index, time, change=None):
+        active_cmds.record("MFnAnimCurve.setTime")
+        if self.curve.locked:
+            raise RuntimeError("The curve is locked: {0}".format(self.curve.name))
+        old_time = self.curve.times[index]
+        active_cmds.move_key(self.curve, index, time.value)
+        if change is not None:
+            change.edits.append((self.curve.times, index, old_time, time.value))
+
+    @property
+    def isWeighted(self):
+        return self.curve.weighted
+
+    def tangentsLocked(self, index):
+        return index in self.curve.tangents_locked
+
+    def weightsLocked(self, index):
+        return index in self.curve.weights_locked
+
+    def inTangentType(self, index):
+        return self.curve.tangent_types[index][0]
+
+    def outTangentType(self, index):
+        return self.curve.tangent_types[index][1]
+
+    def getTangentXY(self, index, is_in_tangent):
+        active_cmds.record("MFnAnimCurve.getTangentXY")
+        offset = 0 if is_in_tangent else 2
+        return tuple(self.curve.tangents[index][offset:offset + 2])
+
+    def getTangentAngleWeight(self, index, is_in_tangent):
+        active_cmds.record("MFnAnimCurve.getTangentAngleWeight")
+        x, y = self.getTangentXY(index, is_in_tangent)
+        # The angle is returned in radians, not as an MAngle.
+        return math.atan2(y, x), math.hypot(x, y)
+
+    def setTangent(self, index, x, y, is_in_tangent, change=None):
+        active_cmds.record("MFnAnimCurve.setTangent")
+        self.set_handle(index, x, y, is_in_tangent, change)
+        # Setting the handle makes the tangent fixed, like in Maya.
+        self.curve.tangent_types[index][0 if is_in_tangent else 1] = self.kTangentFixed
+
+    def setWeight(self, index, weight, is_in_tangent, change=None):
+        active_cmds.record("MFnAnimCurve.setWeight")
+        angle, old_weight = self.getTangentAngleWeight(index, is_in_tangent)
+        self.set_handle(index, weight * math.cos(angle), weight * math.sin(angle), is_in_tangent, change)
+
+    def set_handle(self, index, x, y, is_in_tangent, change=None):
+        old_tangent = self.curve.tangents[index]
+        new_tangent = list(old_tangent)
+        new_tangent[0 if is_in_tangent else 2:(0 if is_in_tangent else 2) + 2] = [x, y]
+        self.curve.tangents[index] = new_tangent
+        if change is not None:
+            change.edits.append((self.curve.tangents, index, old_tangent, new_tangent))
+
+
+class FakeMessage(object):
+    """
+    Stands in for the API message classes. Callbacks are accepted but never called.
+    """
+
+    next_id = 0
+
+    @classmethod
+    def add_callback(cls, *args, **kwargs):
+        cls.next_id += 1
+        return cls.next_id
+
+    addEventCallback = add_callback
+    addConnectionCallback = add_callback
+    addAttributeChangedCallback = add_callback
+
+    @staticmethod
+    def removeCallback(*args):
+        pass
+
+    @staticmethod
+    def removeCallbacks(*args):
+        pass
+
+
+class MGlobal(object):
+
+    @staticmethod
+    def displayInfo(message):
+        print(message)
+
+    displayWarning = displayInfo
+    displayError = displayInfo
+
+
+def create_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install(cmds):
+    """
+    Puts the fake in place of maya.cmds, maya.mel, the Maya API and the Qt modules, so the re-timer can be imported
+    and run in a plain Python.
+    :param cmds: The FakeCmds to use.
+    """
+    global active_cmds
+    active_cmds = cmds
+
+    api_open_maya = create_module("maya.api.OpenMaya", MTime=MTime, MObject=MObject, MObjectHandle=MObjectHandle,
+                                  MSelectionList=MSelectionList, MEventMessage=FakeMessage, MDGMessage=FakeMessage,
+                                  MNodeMessage=FakeMessage, MMessage=FakeMessage, MGlobal=MGlobal)
+    api_open_maya_anim = create_module("maya.api.OpenMayaAnim", MFnAnimCurve=MFnAnimCurve,
+                                       MAnimCurveChange=MAnimCurveChange)
+    api = create_module("maya.api", OpenMaya=api_open_maya, OpenMayaAnim=api_open_maya_anim)
+    open_maya = create_module("maya.OpenMaya", MGlobal=MGlobal)
+    open_maya_ui = create_module("maya.OpenMayaUI", MQtUtil=object)
+    utils = create_module("maya.utils", executeDeferred=execute_deferred)
+    maya = create_module("maya", cmds=cmds, mel=FakeMel(), api=api, OpenMaya=open_maya, OpenMayaUI=open_maya_ui,
+                         utils=utils)
+
+    # The dialog classes are only subclassed when the module is imported, never shown.
+    qt_widgets = create_module("PySide2.QtWidgets", QDialog=object)
+    qt_core = create_module("PySide2.QtCore")
+    pyside = create_module("PySide2", QtWidgets=qt_widgets, QtCore=qt_core)
+    shiboken = create_module("shiboken2", wrapInstance=None)
+
+    sys.modules.update({
+        "maya": maya,
+        "maya.cmds": cmds,
+        "maya.mel": maya.mel,
+        "maya.utils": utils,
+        "maya.api": api,
+        "maya.api.OpenMaya": api_open_maya,
+        "maya.api.OpenMayaAnim": api_open_maya_anim,
+        "maya.OpenMaya": open_maya,
+        "maya.OpenMayaUI": open_maya_ui,
+        "PySide2": pyside,
+        "PySide2.QtWidgets": qt_widgets,
+        "PySide2.QtCore": qt_core,
+        "shiboken2": shiboken,
+    })
@@ -0,0 +1,59 @@
+import unittest
+
+from Tests import FakeMaya
+from Tests.FakeMaya import FakeAnimCurve
+
+# Installing the fake before the re-timer modules are imported, so they use it in place of Maya.
+cmds = FakeMaya.get_installed_cmds()
+
+from Scripts.ReTimerHelperMethods import ReTimerHelperMethods
+from Scripts.Retiming import KeyMover
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimePreview import RetimePreview
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+The base of the tests that runs the re-timer on FakeMaya. Every test starts on an empty scene, with nothing cached,
+previewed or logged by the tests before it.
+"""
+
+
+class FakeMayaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = cmds
+        cmds.reset()
+        cmds.reset_calls()
+
+        KeyTimeCache.remove_callbacks()
+        KeyTimeCache.reset_stats()
+        KeyTimeCache.ignore_changes = False
+        RetimePreview.reset()
+        KeyMover.pending_changes[:] = []
+        ReTimerHelperMethods.operation_log.clear()
+        ReTimerHelperMethods.snap_grid = None
+
+    def set_curves(self, curve_key_times, **kwargs):
+        """
+        Replaces the scene with a curve for each entry, every curve on its own node.
+        :param curve_key_times: Dictionary of curve name to the list of its key times.
+        :param kwargs: Passed on to every FakeAnimCurve, like locked or weighted.
+        :return: Dictionary of curve name to the FakeAnimCurve.
+        """
+        curves = [FakeAnimCurve(curve_name, "{0}_node".format(curve_name), "tx", times, **kwargs)
+                  for curve_name, times in sorted(curve_key_times.items())]
+        cmds.set_curves(curves)
+        return dict((curve.name, curve) for curve in curves)
+
+    def get_curve_key_times(self):
+        """
+        :return: Dictionary of curve name to the list of its key times, in the scene.
+        """
+        return dict((curve_name, list(curve.times)) for curve_name, curve in cmds.curves.items())
+
+    def select_range(self, start_time, end_time):
+        """
+        Selects a range on the playback slider.
+        """
+        cmds.selected_range = [start_time, end_time]
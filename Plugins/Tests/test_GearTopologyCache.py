@@ -0,0 +1,52 @@
+import unittest
+
+from Scripts.Modeling.GearTopologyCache import FaceRange, GearTopologyCache
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the cache of the teeth faces of the polyPipe gears.
+"""
+
+
+class GearTopologyCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        GearTopologyCache.clear()
+        GearTopologyCache.reset_stats()
+
+    def tearDown(self):
+        GearTopologyCache.clear()
+        GearTopologyCache.reset_stats()
+
+    def test_faces(self):
+        # The teeth are every second face of the polyPipe, from spans * 2 to spans * 3.
+        faces = GearTopologyCache.get_faces(3)
+        self.assertEqual(list(faces), [12, 14, 16])
+        self.assertEqual(GearTopologyCache.get_face_names(3), ("f[12]", "f[14]", "f[16]"))
+        self.assertEqual(FaceRange(4, 8).get_components("pPipe1"), ["pPipe1.f[4:7]"])
+
+    def test_hits_and_misses(self):
+        GearTopologyCache.get_faces(10)
+        GearTopologyCache.get_face_names(10)
+        GearTopologyCache.get_faces(12)
+
+        stats = GearTopologyCache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["cached_teeth"]), (1, 2, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 1.0 / 3)
+
+    def test_least_recently_used_is_evicted(self):
+        for teeth in range(GearTopologyCache.MAX_SIZE):
+            GearTopologyCache.get_faces(teeth + 2)
+        # Using the first tooth count again, so the second one is the least recently used.
+        GearTopologyCache.get_faces(2)
+        GearTopologyCache.get_faces(100)
+
+        self.assertEqual(GearTopologyCache.get_stats()["evictions"], 1)
+        self.assertIn(2, GearTopologyCache.entries)
+        self.assertNotIn(3, GearTopologyCache.entries)
+        self.assertEqual(len(GearTopologyCache.entries), GearTopologyCache.MAX_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
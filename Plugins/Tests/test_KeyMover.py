@@ -0,0 +1,94 @@
+import math
+import unittest
+
+from Tests.FakeMayaTestCase import FakeMayaTestCase, ReTimerHelperMethods
+
+from Scripts.Retiming import KeyMover
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimePlan import RetimePlan
+from Tests.FakeMaya import MAnimCurveChange, MFnAnimCurve
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of moving the keys of a planned re-time, on FakeMaya.
+"""
+
+
+class KeyMoverTest(FakeMayaTestCase):
+
+    CURVE_KEY_TIMES = {"curveA": [0, 2, 4, 6, 8], "curveB": [0, 4, 8]}
+
+    def get_plan(self):
+        curve_key_times = KeyTimeCache.get_curve_key_times(sorted(self.CURVE_KEY_TIMES), KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+        return RetimePlan.from_curve_key_times(curve_key_times, (2, 6), 3, False)
+
+    def test_move_plan_keys(self):
+        self.set_curves(self.CURVE_KEY_TIMES)
+        change = MAnimCurveChange()
+
+        keys_moved = KeyMover.move_plan_keys(self.get_plan(), change)
+
+        new_curve_key_times = {"curveA": [0, 2, 5, 8, 10], "curveB": [0, 5, 10]}
+        self.assertEqual(keys_moved, 5)
+        self.assertEqual(self.get_curve_key_times(), new_curve_key_times)
+        # The cache is patched with the new times, instead of being read again.
+        self.assertEqual(KeyTimeCache.curve_key_times, new_curve_key_times)
+
+        change.undoIt()
+        self.assertEqual(self.get_curve_key_times(), self.CURVE_KEY_TIMES)
+
+    def test_rolls_back_on_locked_curve(self):
+        curves = self.set_curves(self.CURVE_KEY_TIMES)
+        plan = self.get_plan()
+        # The curves are moved in the order of their names, so curveA is moved before curveB fails.
+        curves["curveB"].locked = True
+
+        with self.assertRaises(RuntimeError):
+            KeyMover.move_plan_keys(plan, MAnimCurveChange())
+
+        self.assertEqual(self.get_curve_key_times(), self.CURVE_KEY_TIMES)
+        # The curves are read again on the next re-time, and the cache listens to changes again.
+        self.assertEqual(KeyTimeCache.curve_key_times, {})
+        self.assertFalse(KeyTimeCache.ignore_changes)
+
+    def test_failed_re_time_is_not_committed_or_logged(self):
+        curves = self.set_curves(self.CURVE_KEY_TIMES)
+        curves["curveB"].locked = True
+
+        with self.assertRaises(RuntimeError):
+            ReTimerHelperMethods.re_time(["curveA", "curveB"], (2, 6), 3, False)
+
+        self.assertEqual(self.get_curve_key_times(), self.CURVE_KEY_TIMES)
+        self.assertEqual(self.cmds.call_counts.get("reTimerCommitChange", 0), 0)
+        self.assertEqual(len(ReTimerHelperMethods.operation_log), 0)
+
+    def test_scale_weighted_tangents(self):
+        curves = self.set_curves({"curveA": [0, 2, 4]}, weighted=True,
+                                 tangent_types=[[MFnAnimCurve.kTangentAuto] * 2] * 3,
+                                 tangents=[[1.0, 1.0, 1.0, 1.0]] * 3)
+        # Locked tangents gets the average stretch of both sides, unlocked each side gets the stretch of its segment.
+        curves["curveA"].tangents_locked = set()
+        change = MAnimCurveChange()
+
+        # The segment from 2 to 4 is stretched to twice its length.
+        KeyMover.move_keys("curveA", [0, 2, 4], [0, 2, 6], change, scale_tangents=True)
+
+        # The weight of the out handle of the key at 2, and the in handle of the key moved to 6, is doubled at the same
+        # angle.
+        in_x, in_y, out_x, out_y = curves["curveA"].tangents[1]
+        self.assertAlmostEqual(math.hypot(out_x, out_y), 2 * math.sqrt(2))
+        self.assertAlmostEqual(math.atan2(out_y, out_x), math.pi / 4)
+        self.assertAlmostEqual(math.hypot(*curves["curveA"].tangents[2][:2]), 2 * math.sqrt(2))
+        # The handles of the segment that isn't stretched are left as they are.
+        self.assertEqual(curves["curveA"].tangents[0], [1.0, 1.0, 1.0, 1.0])
+        self.assertEqual((in_x, in_y), (1.0, 1.0))
+
+        change.undoIt()
+        self.assertEqual(curves["curveA"].times, [0, 2, 4])
+        self.assertEqual(curves["curveA"].tangents, [[1.0, 1.0, 1.0, 1.0]] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
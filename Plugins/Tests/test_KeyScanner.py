@@ -0,0 +1,89 @@
+import unittest
+
+from Scripts.Retiming import KeyScanner
+from Tests.FakeMaya import FakeAnimCurve, FakeCmds
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the key scanner, on the key times alone and on scenes of FakeMaya.
+"""
+
+
+class KeyScannerTest(unittest.TestCase):
+
+    def get_scene(self):
+        """
+        :return: List of FakeAnimCurve with one of each problem.
+        """
+        return [
+            FakeAnimCurve("clean", "node", "tx", [1, 2, 3]),
+            FakeAnimCurve("duplicate", "node", "ty", [1, 2, 2.00005, 3]),
+            FakeAnimCurve("subFrame", "node", "tz", [1, 1.5, 2.25, 3]),
+            FakeAnimCurve("outside", "node", "rx", [-5, 1, 130]),
+            FakeAnimCurve("locked", "node", "ry", [1, 2], locked=True),
+            FakeAnimCurve("referenced", "node", "rz", [1, 2, 3], referenced=True),
+        ]
+
+    def test_check_key_times(self):
+        # Float noise within the tolerance of a whole frame is on the frame, but is a duplicate of a key on it.
+        self.assertEqual(KeyScanner.check_key_times([1, 2, 2.00005, 3]), [1, 0, 0])
+        self.assertEqual(KeyScanner.check_key_times([1, 1.5, 2.99995]), [0, 1, 0])
+        self.assertEqual(KeyScanner.check_key_times([-5, 1, 130], (1, 120)), [0, 0, 2])
+        # Without a playback range, nothing is outside of it.
+        self.assertEqual(KeyScanner.check_key_times([-5, 1, 130]), [0, 0, 0])
+        self.assertEqual(KeyScanner.check_key_times([]), [0, 0, 0])
+
+    def test_scan_curve_key_times(self):
+        curve_key_times = dict((curve.name, curve.times) for curve in self.get_scene())
+        report = KeyScanner.scan_curve_key_times(curve_key_times, (1, 120), ["locked", "missing"], ["referenced"])
+
+        self.assertEqual(report["curves"], 6)
+        self.assertEqual(report["keys"], 19)
+        self.assertEqual(report["playback_range"], [1, 120])
+        self.assertEqual(list(report["issues"]), KeyScanner.ISSUES)
+        self.assertEqual(report["issues"]["duplicate_keys"], {"duplicate": 1})
+        self.assertEqual(report["issues"]["sub_frame_keys"], {"subFrame": 2})
+        self.assertEqual(report["issues"]["outside_playback_range"], {"outside": 2})
+        # Every key of a locked or referenced curve has the issue, curves that weren't scanned are left out.
+        self.assertEqual(report["issues"]["locked"], {"locked": 2})
+        self.assertEqual(report["issues"]["referenced"], {"referenced": 3})
+
+    def test_scan_scene(self):
+        cmds = FakeCmds({"shot.ma": self.get_scene()})
+        cmds.playback_range = [1.0, 120.0]
+
+        report = KeyScanner.scan_scene("shot.ma", cmds)
+
+        self.assertIsNone(report["error"])
+        self.assertEqual(report["file"], "shot.ma")
+        self.assertEqual(report["curves"], 6)
+        self.assertEqual(report["issues"]["locked"], {"locked": 2})
+        self.assertEqual(report["issues"]["referenced"], {"referenced": 3})
+        self.assertEqual(report["issues"]["outside_playback_range"], {"outside": 2})
+
+    def test_run_scan(self):
+        cmds = FakeCmds({"clean.ma": [FakeAnimCurve("clean", "node", "tx", [1, 2, 3])]})
+
+        reports = KeyScanner.run_scan(["clean.ma", "missing.ma"], cmds=cmds)
+
+        self.assertEqual([report["file"] for report in reports], ["clean.ma", "missing.ma"])
+        self.assertIsNone(reports[0]["error"])
+        self.assertFalse(any(reports[0]["issues"].values()))
+        # A scene that fails to open is reported, instead of stopping the scan.
+        self.assertIn("File not found", reports[1]["error"])
+
+    def test_report_text(self):
+        curve_key_times = dict((curve.name, curve.times) for curve in self.get_scene())
+        text = KeyScanner.get_report_text(KeyScanner.scan_curve_key_times(curve_key_times, (1, 120)))
+
+        self.assertIn("Scanned 6 curves, 19 keys", text)
+        self.assertIn("sub_frame_keys: 1 curves, 2 keys (subFrame)", text)
+        self.assertNotIn("locked", text)
+
+        text = KeyScanner.get_report_text(KeyScanner.scan_curve_key_times({"clean": [1, 2]}))
+        self.assertIn("No problems found.", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
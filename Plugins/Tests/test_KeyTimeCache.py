@@ -0,0 +1,79 @@
+import unittest
+
+from Tests.FakeMayaTestCase import FakeMayaTestCase
+
+from Scripts.Retiming import KeyMover
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Tests.FakeMaya import FakeAnimCurve
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the cache of the key times between re-times, on FakeMaya.
+"""
+
+
+class KeyTimeCacheTest(FakeMayaTestCase):
+
+    def setUp(self):
+        super(KeyTimeCacheTest, self).setUp()
+        # The curves read by each call of read_curve_key_times.
+        self.reads = []
+
+    def read_curve_key_times(self, curve_names):
+        self.reads.append(sorted(curve_names))
+        return KeyMover.get_curve_key_times(curve_names)
+
+    def test_curves_are_read_once(self):
+        self.set_curves({"curveA": [0, 1], "curveB": [2, 3]})
+
+        KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times)
+        curve_key_times = KeyTimeCache.get_curve_key_times(["curveA", "curveB"], self.read_curve_key_times)
+
+        self.assertEqual(curve_key_times, {"curveA": [0, 1], "curveB": [2, 3]})
+        # Only the curve that wasn't cached is read the second time.
+        self.assertEqual(self.reads, [["curveA"], ["curveB"]])
+        self.assertEqual(KeyTimeCache.get_stats()["hits"], 1)
+
+    def test_patch(self):
+        self.set_curves({"curveA": [0, 1]})
+        KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times)
+
+        KeyTimeCache.patch({"curveA": [0, 3], "curveB": [5]})
+
+        self.assertEqual(KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times), {"curveA": [0, 3]})
+        # Curves that aren't cached are not added by a patch.
+        self.assertNotIn("curveB", KeyTimeCache.curve_key_times)
+        self.assertEqual(len(self.reads), 1)
+
+    def test_stale_handle_is_read_again(self):
+        self.set_curves({"curveA": [0, 1, 2]})
+        KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times)
+
+        # The curve is deleted and created again under the same name, like after a reference reload. No callback of
+        # the old node tells the cache, its handle is no longer valid.
+        self.cmds.delete("curveA")
+        self.cmds.curves["curveA"] = FakeAnimCurve("curveA", "curveA_node", "tx", [5, 6])
+
+        curve_key_times = KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times)
+        self.assertEqual(curve_key_times, {"curveA": [5, 6]})
+        self.assertEqual(self.reads, [["curveA"], ["curveA"]])
+
+        # The new node is cached with its own handle.
+        KeyTimeCache.get_curve_key_times(["curveA"], self.read_curve_key_times)
+        self.assertEqual(len(self.reads), 2)
+
+    def test_invalidate_curve(self):
+        self.set_curves({"curveA": [0, 1], "curveB": [2, 3]})
+        KeyTimeCache.get_curve_key_times(["curveA", "curveB"], self.read_curve_key_times)
+        generation = KeyTimeCache.generation
+
+        KeyTimeCache.invalidate_curve("curveA")
+
+        self.assertGreater(KeyTimeCache.generation, generation)
+        self.assertEqual(sorted(KeyTimeCache.curve_key_times), ["curveB"])
+        self.assertNotIn("curveA", KeyTimeCache.curve_handles)
+
+
+if __name__ == "__main__":
+    unittest.main()
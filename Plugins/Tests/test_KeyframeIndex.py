@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from Scripts.Retiming.KeyframeIndex import KeyframeIndex
+from Tests.FakeMaya import FakeAnimCurve, FakeCmds
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the keyframe index, checked against the findKeyframe of FakeMaya, which answers like cmds.findKeyframe.
+"""
+
+
+class KeyframeIndexTest(unittest.TestCase):
+
+    WHICH = ["first", "last", "next", "previous"]
+
+    def build(self, curve_key_times):
+        """
+        :return: Tuple of the KeyframeIndex of the curves, and a FakeCmds with the curves.
+        """
+        cmds = FakeCmds()
+        cmds.set_curves([FakeAnimCurve(curve_name, curve_name, "tx", times)
+                         for curve_name, times in curve_key_times.items()])
+        return KeyframeIndex.from_curve_key_times(curve_key_times), cmds
+
+    def assert_same_as_find_keyframe(self, index, cmds, times, curve_names=None):
+        for time in times:
+            for which in self.WHICH:
+                if curve_names is None:
+                    expected = cmds.findKeyframe(which=which, time=(time, time))
+                else:
+                    expected = cmds.findKeyframe(curve_names, which=which, time=(time, time))
+                self.assertEqual(index.find(which, time, curve_names), expected,
+                                 "{0} of {1} on {2}".format(which, time, curve_names))
+
+    def test_find(self):
+        index, cmds = self.build({"curveA": [1, 5, 9], "curveB": [3, 5, 12]})
+
+        self.assertEqual(len(index), 5)
+        # On, between, before the first and after the last keyframe, where next and previous wraps around.
+        self.assert_same_as_find_keyframe(index, cmds, [0, 1, 2, 5, 6, 12, 13])
+        self.assert_same_as_find_keyframe(index, cmds, [0, 1, 2, 5, 6, 12, 13], ["curveA"])
+        self.assert_same_as_find_keyframe(index, cmds, [0, 1, 2, 5, 6, 12, 13], ["curveB"])
+
+    def test_has_key(self):
+        index = KeyframeIndex.from_curve_key_times({"curveA": [1, 5], "curveB": [3]})
+
+        self.assertTrue(index.has_key(3))
+        self.assertFalse(index.has_key(4))
+        self.assertFalse(index.has_key(3, ["curveA"]))
+        self.assertTrue(index.has_key(5, ["curveA", "curveB"]))
+
+    def test_no_keys(self):
+        index = KeyframeIndex.from_curve_key_times({"curveA": []})
+
+        self.assertIsNone(index.first())
+        self.assertIsNone(index.next(3, ["curveA"]))
+        self.assertIsNone(index.previous(3, ["curveB"]))
+
+    def test_random_curves(self):
+        randomizer = random.Random(0)
+        for _ in range(30):
+            # Enough keys for the bits of a curve to take more than one machine word.
+            curve_key_times = dict(("curve{0}".format(curve), sorted(randomizer.sample(range(300), 40)))
+                                   for curve in range(4))
+            index, cmds = self.build(curve_key_times)
+            times = [randomizer.uniform(-10, 310) for _ in range(10)] + [randomizer.randint(0, 299) for _ in range(10)]
+
+            self.assert_same_as_find_keyframe(index, cmds, times)
+            curve_names = randomizer.sample(sorted(curve_key_times), randomizer.randint(1, 3))
+            self.assert_same_as_find_keyframe(index, cmds, times, curve_names)
+
+    def test_unknown_which(self):
+        index = KeyframeIndex.from_curve_key_times({"curveA": [1]})
+        with self.assertRaises(ValueError):
+            index.find("middle", 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
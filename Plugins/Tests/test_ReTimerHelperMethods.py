@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Tests.FakeMayaTestCase import FakeMayaTestCase, ReTimerHelperMethods
+
+from Scripts.Retiming.RetimeLog import RetimeLog
+from Scripts.Retiming.RetimePreview import RetimePreview
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the re-timer on FakeMaya, that previewing or replaying a re-time moves the keys the same as clicking it.
+"""
+
+
+class ReTimerHelperMethodsTest(FakeMayaTestCase):
+
+    # Curve b has a key that is only float noise away from a key of curve a, and a key between the keys of curve a.
+    CURVE_KEY_TIMES = {"curveA": [1, 3, 5, 7, 9, 11], "curveB": [1, 4, 5.00005, 10]}
+    # The (range, value, incremental) of every click.
+    CLICKS = [((3, 7), 3, False), ((1, 9), 1, True), ((5, 12), -1, True), ((4, 8), 2, False)]
+
+    def click(self, clicks):
+        """
+        Clicks the re-time buttons, each on its range of the playback slider.
+        :return: The key times of the scene after the clicks.
+        """
+        for time_range, re_time_value, incremental in clicks:
+            self.select_range(*time_range)
+            ReTimerHelperMethods.re_time_keys(re_time_value, incremental, False)
+        return self.get_curve_key_times()
+
+    def assert_same_keys(self, curve_key_times, expected_curve_key_times):
+        self.assertEqual(sorted(curve_key_times), sorted(expected_curve_key_times))
+        for curve_name, times in expected_curve_key_times.items():
+            self.assertEqual(len(curve_key_times[curve_name]), len(times))
+            for time, expected_time in zip(curve_key_times[curve_name], times):
+                self.assertAlmostEqual(time, expected_time, msg="{0}: {1}".format(curve_name, curve_key_times))
+
+    def get_clicked_key_times(self, snap_grid=None):
+        """
+        :return: The key times after clicking CLICKS on a new scene.
+        """
+        self.setUp()
+        ReTimerHelperMethods.snap_grid = snap_grid
+        self.set_curves(self.CURVE_KEY_TIMES)
+        return self.click(self.CLICKS)
+
+    def test_preview_then_apply_same_as_clicks(self):
+        for snap_grid in [None, 1.0]:
+            clicked_key_times = self.get_clicked_key_times(snap_grid)
+
+            self.setUp()
+            ReTimerHelperMethods.snap_grid = snap_grid
+            self.set_curves(self.CURVE_KEY_TIMES)
+            for time_range, re_time_value, incremental in self.CLICKS:
+                self.select_range(*time_range)
+                ReTimerHelperMethods.preview_re_time_keys(re_time_value, incremental, False)
+            # Nothing is moved while previewing.
+            self.assertEqual(self.get_curve_key_times(), self.CURVE_KEY_TIMES)
+
+            keys_moved = ReTimerHelperMethods.apply_preview()
+
+            self.assertGreater(keys_moved, 0)
+            self.assert_same_keys(self.get_curve_key_times(), clicked_key_times)
+            self.assertFalse(RetimePreview.is_active())
+            # Every click is logged, like when they are clicked without the preview.
+            self.assertEqual(len(ReTimerHelperMethods.operation_log), len(self.CLICKS))
+
+    def test_preview_keeps_undo_state(self):
+        self.set_curves(self.CURVE_KEY_TIMES)
+
+        for undo_state in [True, False]:
+            self.cmds.undo_state = undo_state
+            ReTimerHelperMethods.preview_re_time_keys(2, True, False)
+            self.assertEqual(self.cmds.undo_state, undo_state)
+            ReTimerHelperMethods.cancel_preview()
+            self.assertEqual(self.cmds.undo_state, undo_state)
+
+        self.assertEqual(self.get_curve_key_times(), self.CURVE_KEY_TIMES)
+
+    def test_replay_log_same_as_clicks(self):
+        for snap_grid in [None, 1.0]:
+            clicked_key_times = self.get_clicked_key_times(snap_grid)
+            self.assertEqual(len(ReTimerHelperMethods.operation_log), len(self.CLICKS))
+
+            # The log goes through a file, like when it is replayed on another shot.
+            folder = tempfile.mkdtemp()
+            try:
+                log_path = os.path.join(folder, "log.json")
+                ReTimerHelperMethods.operation_log.save(log_path)
+                log = RetimeLog.load(log_path)
+            finally:
+                shutil.rmtree(folder)
+
+            self.setUp()
+            self.set_curves(self.CURVE_KEY_TIMES)
+            ReTimerHelperMethods.replay_log(log, ["curveA_node", "curveB_node"])
+
+            self.assert_same_keys(self.get_curve_key_times(), clicked_key_times)
+            # The replay is one undo.
+            self.assertEqual(self.cmds.call_counts.get("reTimerCommitChange"), 1)
+
+    def test_no_op_is_not_logged(self):
+        self.set_curves({"curveA": [1, 3, 5]})
+
+        # The keys already are 2 frames apart.
+        plan = ReTimerHelperMethods.re_time(["curveA"], (1, 5), 2, False)
+
+        self.assertFalse(plan.is_empty())
+        self.assertEqual(self.get_curve_key_times(), {"curveA": [1, 3, 5]})
+        self.assertEqual(len(ReTimerHelperMethods.operation_log), 0)
+        self.assertEqual(self.cmds.call_counts.get("reTimerCommitChange", 0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
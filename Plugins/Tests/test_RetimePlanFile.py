@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+
+from Scripts.Retiming.RetimePlan import RetimePlan
+from Scripts.Retiming.RetimePlanFile import RetimePlanFile, read_npy, write_npy
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of writing re-time plans to .npy plan files and reading them back.
+"""
+
+
+class RetimePlanFileTest(unittest.TestCase):
+
+    # Curve b has keys within the tolerance of the keys of curve a, so they are mapped between the anchors.
+    CURVE_KEY_TIMES = {"a": [0, 2, 4, 6, 8], "b": [0, 2.00005, 3, 5, 8.00003]}
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def get_curve_key_values(self):
+        return dict((curve_name, [float(index) for index in range(len(times))])
+                    for curve_name, times in self.CURVE_KEY_TIMES.items())
+
+    def write_and_read(self, plan):
+        RetimePlanFile.from_plan(plan, self.get_curve_key_values()).write(self.path)
+        return RetimePlanFile.read(self.path)
+
+    def test_npy_round_trip(self):
+        for values in [array("d", [0.5, -1.25, 1e9]), array("i", [3, -7, 0]), array("d")]:
+            npy_path = os.path.join(self.path, "column.npy")
+            write_npy(npy_path, values)
+            self.assertEqual(read_npy(npy_path), values)
+
+    def test_columns_round_trip(self):
+        plan = RetimePlan.from_curve_key_times(self.CURVE_KEY_TIMES, (2, 6), 3, False)
+        plan_file = self.write_and_read(plan)
+
+        self.assertEqual(plan_file.curve_names, ["a", "b"])
+        self.assertEqual(plan_file.time_range, (2, 6))
+        self.assertEqual(list(plan_file.times), list(plan.get_curve_key_array().times))
+        self.assertEqual(list(plan_file.new_times), list(plan.get_new_curve_key_array().times))
+        self.assertEqual(list(plan_file.values), [0.0, 1.0, 2.0, 3.0, 4.0] * 2)
+        self.assertEqual(list(plan_file.anchor_times), plan.key_times)
+        self.assertEqual(list(plan_file.new_anchor_times), plan.new_key_times)
+
+    def test_to_plan_gives_the_same_keys(self):
+        for snap_grid in [None, 1.0]:
+            plan = RetimePlan.from_curve_key_times(self.CURVE_KEY_TIMES, (2, 6), 2.5, False, snap_grid)
+            plan_file = self.write_and_read(plan)
+
+            self.assertEqual(plan_file.snap_grid, snap_grid)
+            # The keys between the anchors are snapped again when the file is applied, like when it was written.
+            new_curve_key_times = plan_file.to_plan(self.CURVE_KEY_TIMES).get_new_curve_key_times()
+            self.assertEqual(new_curve_key_times, plan.get_new_curve_key_times())
+            self.assertEqual(list(plan_file.get_new_curve_key_array().times),
+                             list(plan.get_new_curve_key_array().times))
+
+    def test_columns_must_match(self):
+        plan = RetimePlan.from_curve_key_times(self.CURVE_KEY_TIMES, (2, 6), 3, False)
+        RetimePlanFile.from_plan(plan, self.get_curve_key_values()).write(self.path)
+        write_npy(os.path.join(self.path, "values.npy"), array("d", [0.0]))
+
+        with self.assertRaises(ValueError):
+            RetimePlanFile.read(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
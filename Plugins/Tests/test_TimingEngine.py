@@ -0,0 +1,172 @@
+import random
+import unittest
+
+from Scripts.Retiming import TimingEngine
+
+"""
+Using: Pure Python, Python 2.7.11
+Author: Timothy Stoltzner Rasmussen
+Tests of the timing engine, it has no dependency on Maya so they run with a plain python.
+Run from the Plugins folder:
+    python -m pytest Tests
+    python -m unittest discover -s Tests -t .
+"""
+
+
+class ComputeNewKeyTimesTest(unittest.TestCase):
+
+    def test_absolute(self):
+        # The keys in the range gets exactly 3 frames between them, the keys after it keeps their spacing.
+        new_times = TimingEngine.compute_new_key_times([0, 2, 4, 6, 8], 2, 6, 3, False)
+        self.assertEqual(new_times, [0, 2, 5, 8, 10])
+
+    def test_incremental(self):
+        new_times = TimingEngine.compute_new_key_times([0, 2, 4, 6, 8], 2, 6, -1, True)
+        self.assertEqual(new_times, [0, 2, 3, 4, 6])
+
+    def test_incremental_keeps_one_frame(self):
+        # Keys can't be moved closer than 1 frame, or past one another.
+        new_times = TimingEngine.compute_new_key_times([0, 2, 4, 6, 8], 2, 6, -5, True)
+        self.assertEqual(new_times, [0, 2, 3, 4, 6])
+
+    def test_range_start_between_keys(self):
+        # The key before the range start is the anchor, like when the range starts on it.
+        new_times = TimingEngine.compute_new_key_times([0, 2, 4, 6, 8], 3, 6, 3, False)
+        self.assertEqual(new_times, [0, 2, 5, 8, 10])
+
+    def test_range_before_first_key(self):
+        # Without a key on or before the range start, the previous keyframe wraps around to the last one like
+        # cmds.findKeyframe, so no key moves, even when the range ends after some of the keys.
+        self.assertEqual(TimingEngine.get_anchor_index([10, 12, 14], 0), 2)
+
+        new_times = TimingEngine.compute_new_key_times([10, 12, 14], 0, 5, 3, False)
+        self.assertEqual(new_times, [10, 12, 14])
+
+        new_times = TimingEngine.compute_new_key_times([10, 12, 14], 0, 13, 3, False)
+        self.assertEqual(new_times, [10, 12, 14])
+
+    def test_tolerance(self):
+        # A key within the tolerance of the range start is on it, and is the anchor.
+        key_times = [0, 2.00005, 4]
+        new_times = TimingEngine.compute_new_key_times(key_times, 2, 4, 3, False)
+        self.assertEqual(new_times[:2], [0, 2.00005])
+        self.assertAlmostEqual(new_times[2], 5.00005)
+
+        new_times = TimingEngine.compute_new_key_times(key_times, 2, 4, 3, False, tolerance=0)
+        self.assertEqual(new_times, [0, 3, 6])
+
+    def test_no_keys(self):
+        self.assertEqual(TimingEngine.compute_new_key_times([], 0, 10, 2, False), [])
+
+    def test_keeps_order(self):
+        randomizer = random.Random(0)
+        for _ in range(200):
+            key_times = sorted(randomizer.sample(range(100), randomizer.randint(1, 20)))
+            start_time = randomizer.randint(-10, 100)
+            end_time = start_time + randomizer.randint(1, 50)
+            new_times = TimingEngine.compute_new_key_times(key_times, start_time, end_time,
+                                                           randomizer.randint(-5, 5), True)
+            self.assertEqual(len(new_times), len(key_times))
+            self.assertTrue(all(new_times[index] < new_times[index + 1] for index in range(len(new_times) - 1)))
+
+
+class PlanMoveOrderTest(unittest.TestCase):
+
+    def move_keys(self, old_times, new_times):
+        """
+        Moves the keys one at a time in the planned order, checking no key is moved onto or past another key.
+        :return: The key times after every key is moved.
+        """
+        times = list(old_times)
+        for index in TimingEngine.plan_move_order(old_times, new_times):
+            times[index] = new_times[index]
+            self.assertTrue(all(times[key] < times[key + 1] for key in range(len(times) - 1)),
+                            "Key {0} moved onto or past another key: {1}".format(index, times))
+        return times
+
+    def test_order(self):
+        # The keys moving right are moved from the last to the first, then the keys moving left.
+        order = TimingEngine.plan_move_order([0, 2, 4, 6, 8], [-1, 2, 5, 7, 7.5])
+        self.assertEqual(order, [3, 2, 0, 4])
+
+    def test_keys_not_moving_are_left_out(self):
+        self.assertEqual(TimingEngine.plan_move_order([0, 1, 2], [0, 1, 2]), [])
+
+    def test_moves_never_collide(self):
+        randomizer = random.Random(1)
+        for _ in range(200):
+            key_times = sorted(randomizer.sample(range(100), randomizer.randint(1, 20)))
+            start_time = randomizer.choice(key_times)
+            new_times = TimingEngine.compute_new_key_times(key_times, start_time, start_time + 20,
+                                                           randomizer.randint(-5, 5), True)
+            self.assertEqual(self.move_keys(key_times, new_times), new_times)
+
+
+class MapTimesTest(unittest.TestCase):
+
+    def test_map_times(self):
+        anchor_times = [0, 10, 20]
+        new_anchor_times = [0, 20, 25]
+        # Before the first anchor and after the last the offset of the nearest anchor is kept, between them the times
+        # are interpolated.
+        mapped_times = TimingEngine.map_times([25, -5, 5, 10, 15], anchor_times, new_anchor_times)
+        self.assertEqual(mapped_times, [30, -5, 10, 20, 22.5])
+
+    def test_anchors_stay_exact(self):
+        anchor_times = [0, 3, 7]
+        new_anchor_times = [0, 10, 11]
+        self.assertEqual(TimingEngine.map_times(anchor_times, anchor_times, new_anchor_times), new_anchor_times)
+
+    def test_no_anchors(self):
+        self.assertEqual(TimingEngine.map_times((3, 1, 2), [], []), [3, 1, 2])
+
+
+class MergeCloseTimesTest(unittest.TestCase):
+
+    def test_merge(self):
+        merged_times = TimingEngine.merge_close_times([3, 1, 1.00005, 2, 2.0002])
+        self.assertEqual(merged_times, [1, 2, 2.0002, 3])
+
+    def test_compares_with_kept_time(self):
+        # A time is compared with the last time kept, so a run of close times doesn't merge into one.
+        merged_times = TimingEngine.merge_close_times([1, 1.00008, 1.00016])
+        self.assertEqual(merged_times, [1, 1.00016])
+
+    def test_tolerance(self):
+        self.assertEqual(TimingEngine.merge_close_times([1, 1.4, 2], tolerance=0.5), [1, 2])
+
+
+class SnapKeyTimesTest(unittest.TestCase):
+
+    def test_whole_frames(self):
+        snapped_times = TimingEngine.snap_key_times([0, 1, 2, 3], [0, 1.4, 1.6, 3.2], 0, 1.0)
+        self.assertEqual(snapped_times, [0, 1, 2, 3])
+
+    def test_collisions_are_pushed_forward(self):
+        # The keys snapping onto the key before them are pushed to the next free frame.
+        snapped_times = TimingEngine.snap_key_times([0, 1, 2, 3], [0, 1.2, 1.4, 1.45], 0, 1.0)
+        self.assertEqual(snapped_times, [0, 1, 2, 3])
+
+    def test_sub_frame_grid(self):
+        snapped_times = TimingEngine.snap_key_times([0, 1, 2], [0, 1.2, 1.3], 0, 0.5)
+        self.assertEqual(snapped_times, [0, 1.0, 1.5])
+
+    def test_keys_up_to_anchor_keep_their_time(self):
+        snapped_times = TimingEngine.snap_key_times([0, 5, 10, 15], [0.3, 5, 12.4, 17.6], 5, 1.0)
+        self.assertEqual(snapped_times, [0.3, 5, 12, 18])
+
+        # A key within the tolerance of the start time is the anchor.
+        snapped_times = TimingEngine.snap_key_times([0, 5.00005, 10], [0, 5.00005, 12.4], 5, 1.0)
+        self.assertEqual(snapped_times, [0, 5.00005, 12])
+
+    def test_first_key_after_anchor_is_pushed(self):
+        # The anchor isn't on the grid, the first snapped key must still come after it.
+        snapped_times = TimingEngine.snap_key_times([0, 4.7, 6], [0, 4.7, 4.9], 4.7, 1.0)
+        self.assertEqual(snapped_times, [0, 4.7, 5])
+
+        snapped_times = TimingEngine.snap_key_times([0, 5.3, 6], [0, 5.3, 5.4], 5.3, 1.0)
+        self.assertEqual(snapped_times, [0, 5.3, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+
+from Scripts.Modeling import GearLibrary, GearMeshBuilder
+
+# The procedural gear plugin, build on the empty_plugin.py template.
+
+
+def maya_useNewAPI():
+    pass
+
+
+class GearNode(om.MPxNode):
+    """
+    Computes a gear mesh in one pass from its parameters, instead of a polyPipe and extrude history.
+    The output mesh is kept between computes. The faces only depend on the tooth count, so changing any of the sizes
+    only sets the vertex positions of the kept mesh, and a new mesh is only created when the tooth count changes.
+
+    Example:
+        gear = cmds.createNode("gearNode")
+        mesh = cmds.createNode("mesh")
+        cmds.connectAttr(gear + ".outMesh", mesh + ".inMesh")
+    """
+
+    TYPE_NAME = "gearNode"
+    # From the range of ids that is reserved for local development.
+    TYPE_ID = om.MTypeId(0x0007F100)
+
+    teeth = None
+    length = None
+    inner_radius = None
+    outer_radius = None
+    height = None
+    out_mesh = None
+
+    def __init__(self):
+        super(GearNode, self).__init__()
+        # The tooth count of the kept mesh, and the mesh data handed to the output the last compute.
+        self.topology_teeth = None
+        self.mesh_data = None
+
+    @classmethod
+    def creator(cls):
+        return GearNode()
+
+    @classmethod
+    def initialize(cls):
+        numeric_fn = om.MFnNumericAttribute()
+
+        cls.teeth = numeric_fn.create("teeth", "te", om.MFnNumericData.kInt, 10)
+        numeric_fn.setMin(2)
+        numeric_fn.keyable = True
+
+        cls.length = numeric_fn.create("length", "len", om.MFnNumericData.kDouble, 0.3)
+        numeric_fn.keyable = True
+
+        # The defaults are the sizes of the default polyPipe, like the gears of the Gear class.
+        cls.inner_radius = numeric_fn.create("innerRadius", "ir", om.MFnNumericData.kDouble,
+                                             GearMeshBuilder.PIPE_INNER_RADIUS)
+        numeric_fn.setMin(0.0)
+        numeric_fn.keyable = True
+
+        cls.outer_radius = numeric_fn.create("outerRadius", "or", om.MFnNumericData.kDouble, 1.0)
+        numeric_fn.setMin(0.0)
+        numeric_fn.keyable = True
+
+        # The height of the pipe along its axis, the height of a polyPipe, not the thickness of its wall. The wall is the
+        # outer radius minus the inner radius.
+        cls.height = numeric_fn.create("height", "hgt", om.MFnNumericData.kDouble, GearMeshBuilder.PIPE_HEIGHT)
+        numeric_fn.setMin(0.0)
+        numeric_fn.keyable = True
+
+        typed_fn = om.MFnTypedAttribute()
+        cls.out_mesh = typed_fn.create("outMesh", "om", om.MFnData.kMesh)
+        typed_fn.writable = False
+        typed_fn.storable = False
+
+        inputs = [cls.teeth, cls.length, cls.inner_radius, cls.outer_radius, cls.height]
+        for attribute in inputs + [cls.out_mesh]:
+            cls.addAttribute(attribute)
+        # Any of the inputs dirties the mesh, it is only computed again when it is asked for.
+        for attribute in inputs:
+            cls.attributeAffects(attribute, cls.out_mesh)
+
+    def compute(self, plug, data_block):
+        if plug != self.out_mesh:
+            return None
+
+        teeth = data_block.inputValue(self.teeth).asInt()
+        length = data_block.inputValue(self.length).asDouble()
+        inner_radius = data_block.inputValue(self.inner_radius).asDouble()
+        outer_radius = data_block.inputValue(self.outer_radius).asDouble()
+        height = data_block.inputValue(self.height).asDouble()
+
+        # With the inner radius outside the outer one, the faces would point into the gear.
+        if inner_radius >= outer_radius:
+            raise RuntimeError("The innerRadius ({0}) must be smaller than the outerRadius ({1})".format(
+                inner_radius, outer_radius))
+
+        points = GearMeshBuilder.get_points(teeth, length, outer_radius, inner_radius, height)
+        points = om.MPointArray(GearMeshBuilder.get_point_tuples(points))
+
+        if teeth != self.topology_teeth or self.mesh_data is None:
+            # Only a new tooth count creates a new mesh with new faces.
+            polygon_counts, polygon_connects = GearMeshBuilder.get_topology(teeth)
+            self.mesh_data = om.MFnMeshData().create()
+            om.MFnMesh().create(points, om.MIntArray(polygon_counts), om.MIntArray(polygon_connects),
+                                parent=self.mesh_data)
+            self.topology_teeth = teeth
+        else:
+            # Scrubbing the sizes only moves the vertices of the kept mesh.
+            om.MFnMesh(self.mesh_data).setPoints(points)
+
+        out_handle = data_block.outputValue(self.out_mesh)
+        out_handle.setMObject(self.mesh_data)
+        data_block.setClean(plug)
+
+
+class GearLibraryBuildCmd(om.MPxCommand):
+    """
+    Builds a GearLibrary as a single undoable step. GearLibrary.build queues the library and calls this command right
+    after. Undo deletes everything the library created, and redo creates it again.
+    """
+
+    COMMAND_NAME = "gearLibraryBuild"
+
+    def __init__(self):
+        super(GearLibraryBuildCmd, self).__init__()
+        self.library = None
+
+    @classmethod
+    def creator(cls):
+        return GearLibraryBuildCmd()
+
+    def doIt(self, args):
+        if not GearLibrary.pending_libraries:
+            return
+
+        library = GearLibrary.pending_libraries.pop(0)
+        try:
+            self.setResult(library.create_nodes())
+        except Exception:
+            # Nothing is left half built, the nodes created before the error are deleted again.
+            library.delete_nodes()
+            raise
+        self.library = library
+
+    def undoIt(self):
+        self.library.delete_nodes()
+
+    def redoIt(self):
+        self.setResult(self.library.create_nodes())
+
+    def isUndoable(self):
+        return self.library is not None
+
+
+def initializePlugin(plugin):
+    vendor = "Timothy Stoltzner Rasmussen"
+    version = "1.0.0"
+
+    plugin_fn = om.MFnPlugin(plugin, vendor, version)
+    plugin_fn.registerNode(GearNode.TYPE_NAME, GearNode.TYPE_ID, GearNode.creator, GearNode.initialize)
+    plugin_fn.registerCommand(GearLibraryBuildCmd.COMMAND_NAME, GearLibraryBuildCmd.creator)
+
+
+def uninitializePlugin(plugin):
+    plugin_fn = om.MFnPlugin(plugin)
+    plugin_fn.deregisterNode(GearNode.TYPE_ID)
+    plugin_fn.deregisterCommand(GearLibraryBuildCmd.COMMAND_NAME)
+
+
+if __name__ == "__main__":
+    plugin_name = "gear_plugin.py"
+    cmds.evalDeferred('if cmds.pluginInfo("{0}", q=True, loaded=True): cmds.unloadPlugin("{0}")'.format(plugin_name))
+    cmds.evalDeferred('if not cmds.pluginInfo("{0}", q=True, loaded=True): cmds.loadPlugin("{0}")'.format(plugin_name))
@@ -0,0 +1,186 @@
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import maya.cmds as cmds
+
+from Scripts.Retiming import KeyMover
+from Scripts.Retiming.KeyTimeCache import KeyTimeCache
+from Scripts.Retiming.RetimePlan import RetimePlan
+
+# The retimer plugin, build on the empty_plugin.py template.
+
+
+def maya_useNewAPI():
+    pass
+
+
+class ReTimerCommitChangeCmd(om.MPxCommand):
+    """
+    Hands the key edits the retimer did through the API to Maya's undo queue.
+    The retimer applies its edits with a MAnimCurveChange and calls this command right after, so a single undo
+    reverts every curve the retime touched.
+    """
+
+    COMMAND_NAME = "reTimerCommitChange"
+
+    def __init__(self):
+        super(ReTimerCommitChangeCmd, self).__init__()
+        self.change = None
+
+    @classmethod
+    def creator(cls):
+        return ReTimerCommitChangeCmd()
+
+    def doIt(self, args):
+        # The edits are already applied, so the command only takes ownership of the change.
+        if KeyMover.pending_changes:
+            self.change = KeyMover.pending_changes.pop(0)
+
+    def undoIt(self):
+        if self.change:
+            self.change.undoIt()
+
+    def redoIt(self):
+        if self.change:
+            self.change.redoIt()
+
+    def isUndoable(self):
+        return self.change is not None
+
+
+class RetimeKeysCmd(om.MPxCommand):
+    """
+    Re-times the keys of the given or selected nodes as a single undoable command.
+
+    Example:
+        retimeKeys -value 2 -incremental -range 10 40 pCube1;
+        cmds.retimeKeys("pCube1", value=3, range=(10, 40), scaleTangents=True)
+
+    Without -incremental the value is the exact number of frames between the keyframes in the range, with it the value
+    is added to the frames between them. Without -range the frame at the current time is re-timed, like the playback
+    slider does when nothing is selected on it. -snap 1 snaps the re-timed keys to whole frames, -snap 0.5 to half
+    frames.
+    """
+
+    COMMAND_NAME = "retimeKeys"
+
+    VALUE_FLAG = ["-v", "-value"]
+    INCREMENTAL_FLAG = ["-inc", "-incremental"]
+    RANGE_FLAG = ["-r", "-range"]
+    SCALE_TANGENTS_FLAG = ["-st", "-scaleTangents"]
+    SNAP_FLAG = ["-sn", "-snap"]
+
+    def __init__(self):
+        super(RetimeKeysCmd, self).__init__()
+        self.change = None
+
+    @classmethod
+    def creator(cls):
+        return RetimeKeysCmd()
+
+    @classmethod
+    def create_syntax(cls):
+        syntax = om.MSyntax()
+        syntax.addFlag(cls.VALUE_FLAG[0], cls.VALUE_FLAG[1], om.MSyntax.kDouble)
+        syntax.addFlag(cls.INCREMENTAL_FLAG[0], cls.INCREMENTAL_FLAG[1])
+        syntax.addFlag(cls.RANGE_FLAG[0], cls.RANGE_FLAG[1], om.MSyntax.kDouble, om.MSyntax.kDouble)
+        syntax.addFlag(cls.SCALE_TANGENTS_FLAG[0], cls.SCALE_TANGENTS_FLAG[1], om.MSyntax.kBoolean)
+        syntax.addFlag(cls.SNAP_FLAG[0], cls.SNAP_FLAG[1], om.MSyntax.kDouble)
+
+        # The nodes or animation curves to re-time, using the selection when none are given.
+        syntax.setObjectType(om.MSyntax.kSelectionList)
+        syntax.useSelectionAsDefault(True)
+        return syntax
+
+    @staticmethod
+    def get_anim_curves(selection_list):
+        """
+        :param selection_list: MSelectionList of nodes or animation curves.
+        :return: The names of the animation curves of the nodes.
+        """
+        curves = []
+
+        for index in range(selection_list.length()):
+            node = selection_list.getDependNode(index)
+            if node.hasFn(om.MFn.kAnimCurve):
+                curve_objects = [node]
+            else:
+                curve_objects = oma.MAnimUtil.findAnimation(node)
+
+            for curve_object in curve_objects:
+                curve_name = om.MFnDependencyNode(curve_object).name()
+                if curve_name not in curves:
+                    curves.append(curve_name)
+
+        return curves
+
+    def doIt(self, args):
+        arg_data = om.MArgDatabase(self.syntax(), args)
+
+        if not arg_data.isFlagSet(self.VALUE_FLAG[0]):
+            raise RuntimeError("The {0} flag is required".format(self.VALUE_FLAG[1]))
+
+        re_time_value = arg_data.flagArgumentDouble(self.VALUE_FLAG[0], 0)
+        incremental = arg_data.isFlagSet(self.INCREMENTAL_FLAG[0])
+        # Keyframes can't be on top of each other.
+        if not incremental and re_time_value < 1:
+            raise RuntimeError("Without {0}, the {1} flag must be at least 1 frame".format(
+                self.INCREMENTAL_FLAG[1], self.VALUE_FLAG[1]))
+        scale_tangents = (arg_data.isFlagSet(self.SCALE_TANGENTS_FLAG[0]) and
+                          arg_data.flagArgumentBool(self.SCALE_TANGENTS_FLAG[0], 0))
+        # The step of the grid the re-timed keys are snapped to, 1.0 for whole frames.
+        snap_grid = arg_data.flagArgumentDouble(self.SNAP_FLAG[0], 0) if arg_data.isFlagSet(self.SNAP_FLAG[0]) else None
+        if snap_grid is not None and snap_grid <= 0:
+            raise RuntimeError("The {0} flag must be a positive number of frames".format(self.SNAP_FLAG[1]))
+
+        if arg_data.isFlagSet(self.RANGE_FLAG[0]):
+            time_range = (arg_data.flagArgumentDouble(self.RANGE_FLAG[0], 0),
+                          arg_data.flagArgumentDouble(self.RANGE_FLAG[0], 1))
+        else:
+            current_time = oma.MAnimControl.currentTime().asUnits(om.MTime.uiUnit())
+            time_range = (current_time, current_time + 1)
+
+        curves = self.get_anim_curves(arg_data.getObjectList())
+
+        # Copying the cached key times, as the cache is patched when the keys are moved.
+        curve_key_times = KeyTimeCache.get_curve_key_times(curves, KeyMover.get_curve_key_times)
+        curve_key_times = dict((curve_name, list(times)) for curve_name, times in curve_key_times.items())
+
+        plan = RetimePlan.from_curve_key_times(curve_key_times, time_range, re_time_value, incremental, snap_grid)
+
+        # Every edit goes into the one change, so undo and redo is a single call no matter the number of keys.
+        change = oma.MAnimCurveChange()
+        # If a curve fails, the keys already moved are put back by move_plan_keys, and the command is left without a
+        # change, so there is nothing for Maya to undo.
+        keys_moved = KeyMover.move_plan_keys(plan, change, scale_tangents)
+        self.change = change
+        self.setResult(keys_moved)
+
+    def undoIt(self):
+        self.change.undoIt()
+
+    def redoIt(self):
+        self.change.redoIt()
+
+    def isUndoable(self):
+        return self.change is not None
+
+
+def initializePlugin(plugin):
+    vendor = "Timothy Stoltzner Rasmussen"
+    version = "1.0.0"
+
+    plugin_fn = om.MFnPlugin(plugin, vendor, version)
+    plugin_fn.registerCommand(ReTimerCommitChangeCmd.COMMAND_NAME, ReTimerCommitChangeCmd.creator)
+    plugin_fn.registerCommand(RetimeKeysCmd.COMMAND_NAME, RetimeKeysCmd.creator, RetimeKeysCmd.create_syntax)
+
+
+def uninitializePlugin(plugin):
+    plugin_fn = om.MFnPlugin(plugin)
+    plugin_fn.deregisterCommand(ReTimerCommitChangeCmd.COMMAND_NAME)
+    plugin_fn.deregisterCommand(RetimeKeysCmd.COMMAND_NAME)
+
+
+if __name__ == "__main__":
+    plugin_name = "retimer_plugin.py"
+    cmds.evalDeferred('if cmds.pluginInfo("{0}", q=True, loaded=True): cmds.unloadPlugin("{0}")'.format(plugin_name))
+    cmds.evalDeferred('if not cmds.pluginInfo("{0}", q=True, loaded=True): cmds.loadPlugin("{0}")'.format(plugin_name))